@@ -7,12 +7,25 @@ This module must be in a folder with the following files and subfolders:
     level.py    (the subcontroller for each level)
     lanes.py    (the mini-controllers for each lane)
     models.py   (the model classes)
+    animation.py (the clocks and frame tables of the animations)
+    view.py     (the view classes that draw each level)
+    loader.py   (the background loader for the levels)
+    compiler.py (the level compiler and its cache)
+    sounds.py   (the sound effects and their voices)
+    hud.py      (the performance overlay)
+    replay.py   (the input recorder and headless replay)
+    inputs.py   (the input queue and the input latency meter)
+    env.py      (the environments for agents that play without a window)
+    raster.py   (the occupancy grids of the board)
+    sprites.py  (the texture cache for the sprites)
     consts.py   (the application constants)
 
     Fonts         (fonts for the game)
     Sounds        (sound effects for the game)
     Images        (image files for the the game)
     JSON          (json files for the game)
+    Cache         (compiled levels, made when the game runs)
+    Recordings    (recorded play of each level, made when the game runs)
 
 Author: Lucy Beck
 Date: January 2, 2021
@@ -34,6 +47,12 @@ class FroggoApp(App):
         Clock.schedule_interval(game._refresh, 1.0 / 60.0)
         return game
 
+    def on_stop(self):
+        """
+        Stops the game's background work when the window closes.
+        """
+        self.root.shutdown()
+
 
 if __name__ == '__main__':
     FroggoApp().run()
@@ -0,0 +1,228 @@
+"""
+Animation module for Froggo
+
+The turtles dive and a dead frog fades on a clock instead of running a
+coroutine each. A Clock counts the updates of a lane (or of the level), and
+every object it animates remembers the count when it started, its phase. An
+Animation is a table of the frame after each update of one run, made once for
+each update time and shared by every object. So the frame of an object is one
+lookup in the table, and ticking a lane costs the same however many turtles
+it has.
+
+The table holds exactly the frames that the coroutines made: the time is
+added up one update at a time, the first update of each run only starts it
+(keeping the frame of the run before), and the frames are numbered from 1.
+
+This module does not import kivy.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+import numpy
+
+
+class Clock(object):
+    """
+    A class that counts the updates of the objects it animates.
+    """
+    # Attribute _steps: The number of updates so far
+    # Invariant: _steps is an int >= 0
+    #
+    # Attribute _dt: The time of each update
+    # Invariant: _dt is a number (int or float) > 0, or None before the first update
+    #
+
+    def getSteps(self):
+        """
+        Returns the number of updates so far
+        """
+        return self._steps
+
+    def getDt(self):
+        """
+        Returns the time of each update, or None before the first update
+        """
+        return self._dt
+
+    def __init__(self):
+        """
+        Initializes a clock with no updates.
+        """
+        self._steps = 0
+        self._dt = None
+
+    def tick(self,dt):
+        """
+        Counts one update.
+
+        Parameter dt: The time in seconds of the update
+        Precondition: dt is a number (int or float) > 0
+        """
+        self._steps += 1
+        self._dt = dt
+
+    def advance(self,dt,steps):
+        """
+        Counts several updates at once.
+
+        Parameter dt: The time in seconds of each update
+        Precondition: dt is a number (int or float) > 0
+
+        Parameter steps: The number of updates
+        Precondition: steps is an int >= 0
+        """
+        if steps > 0:
+            self._steps += steps
+            self._dt = dt
+
+
+class Animation(object):
+    """
+    A class that holds the frames of an animation after each update.
+
+    An object is at frame 1 until the second update after it started. A
+    repeating animation then runs again and again, and the first update of
+    each new run keeps the last frame of the run before.
+    """
+    # Attribute _duration: The number of seconds of one run
+    # Invariant: _duration is a number (int or float) > 0
+    #
+    # Attribute _count: The number of frames that one run reaches
+    # Invariant: _count is an int > 0
+    #
+    # Attribute _tables: The frames for each update time, as lists: 1, then
+    #                    the frame after each update of a run but the first,
+    #                    then the last frame again (for the first update of
+    #                    the next run)
+    # Invariant: _tables is a dictionary mapping numbers to lists of ints
+    #
+    # Attribute _arrays: The same frames as numpy arrays
+    # Invariant: _arrays is a dictionary mapping numbers to numpy arrays of ints
+    #
+
+    def getDuration(self):
+        """
+        Returns the number of seconds of one run
+        """
+        return self._duration
+
+    def getCount(self):
+        """
+        Returns the number of frames that one run reaches
+        """
+        return self._count
+
+    def __init__(self,duration,count):
+        """
+        Initializes an animation. The tables are made the first time they are
+        needed for each update time.
+
+        Parameter duration: The number of seconds of one run
+        Precondition: duration is a number (int or float) > 0
+
+        Parameter count: The number of frames that one run reaches
+        Precondition: count is an int > 0
+        """
+        self._duration = duration
+        self._count = count
+        self._tables = {}
+        self._arrays = {}
+
+    def getSteps(self,dt):
+        """
+        Returns the number of updates in one run.
+
+        Parameter dt: The time in seconds of each update
+        Precondition: dt is a number (int or float) > 0
+        """
+        if not dt in self._tables:
+            self._build(dt)
+        return len(self._tables[dt])-1
+
+    def frameAt(self,steps,dt):
+        """
+        Returns the frame of an object after the given number of updates
+        since it started.
+
+        Parameter steps: The number of updates since the object started
+        Precondition: steps is an int >= 0
+
+        Parameter dt: The time in seconds of each update
+        Precondition: dt is a number (int or float) > 0, or None if steps is 0
+        """
+        if steps < 2:
+            return 1
+        if not dt in self._tables:
+            self._build(dt)
+        table = self._tables[dt]
+        return table[1+(steps-2) % (len(table)-1)]
+
+    def isOver(self,steps,dt):
+        """
+        Returns True if an animation that is run once has finished after the
+        given number of updates since it started, and False otherwise.
+
+        Parameter steps: The number of updates since the object started
+        Precondition: steps is an int >= 0
+
+        Parameter dt: The time in seconds of each update
+        Precondition: dt is a number (int or float) > 0, or None if steps is 0
+        """
+        return steps > 0 and steps >= self.getSteps(dt)
+
+    def getFrames(self,steps,dt,out=None):
+        """
+        Returns the frames of many objects at once, as in frameAt.
+
+        With out given nothing is allocated: the table index is worked out
+        in out, and then replaced by the frame.
+
+        Parameter steps: The number of updates since each object started
+        Precondition: steps is a numpy array of ints >= 0
+
+        Parameter dt: The time in seconds of each update
+        Precondition: dt is a number (int or float) > 0
+
+        Parameter out: The array to put the frames in, or None for a new one
+        Precondition: out is None or a numpy array of ints the shape of steps
+        """
+        if out is None:
+            out = numpy.empty(numpy.shape(steps),dtype=int)
+        cycle = self.getSteps(dt)
+        # The index is 1+(steps-2) % cycle, or 0 before the second update
+        numpy.subtract(steps,2,out=out)
+        numpy.floor_divide(out,cycle,out=out)
+        numpy.maximum(out,0,out=out)
+        numpy.multiply(out,-cycle,out=out)
+        numpy.add(out,steps,out=out)
+        numpy.subtract(out,1,out=out)
+        numpy.maximum(out,0,out=out)
+        # The index is already in the table, and clip (unlike the default
+        # raise) does not copy out first
+        numpy.take(self._arrays[dt],out,out=out,mode='clip')
+        return out
+
+    def _build(self,dt):
+        """
+        Makes the table of frames for an update time.
+
+        The time is added up one update at a time, as the coroutines did, so
+        the frames are exactly the same.
+
+        Parameter dt: The time in seconds of each update
+        Precondition: dt is a number (int or float) > 0
+        """
+        table = [1]
+        time = 0
+        animating = True
+        while animating:
+            if time >= self._duration:
+                animating = False
+            time += dt
+            frame = round(time/self._duration*self._count)
+            if frame == 0:
+                frame = 1
+            table.append(frame)
+        table.append(table[-1])
+        self._tables[dt] = table
+        self._arrays[dt] = numpy.array(table,dtype=int)
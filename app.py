@@ -6,17 +6,22 @@ Date: January 2, 2021
 """
 from kivy.app import App
 from kivy.core.window import Window
-from kivy.core.audio import SoundLoader
 from kivy.uix.floatlayout import FloatLayout
-from kivy.uix.label import Label
 from kivy.clock import Clock
 from kivy.graphics import *
 import kivy.resources
-import json
 import os
+import time
 import inspect
 
 from level  import *
+from loader import *
+from sounds import *
+from hud import *
+from replay import *
+from inputs import *
+from view import *
+from sprites import *
 from lanes  import *
 from constants import *
 
@@ -39,19 +44,37 @@ class Froggo(FloatLayout):
 
     Attribute sounds: The path to the Sounds folder
     Invariant: sounds is a valid path
+
+    Attribute cache: The path to the Cache folder for compiled levels
+    Invariant: cache is a string
+
+    Attribute recordings: The path to the Recordings folder
+    Invariant: recordings is a string
     """
     # HIDDEN ATTRIBUTES
-    # Attribute _keydict: A dictionary containing keyboard keys
+    # Attribute _keydict: The keys held in the current simulation step
     # Invariant: _keydict is a dictionary
     #
+    # Attribute _input: The key events that have not been simulated yet
+    # Invariant: _input is an InputQueue object
+    #
+    # Attribute _latency: The time from a move key to the frame showing the move
+    # Invariant: _latency is a LatencyMeter object
+    #
     # Attribute _keyboard: A reference to the keyboard
     # Invariant: _keyboard is a kivy.core.window.Keyboard
     #
     # Attribute _leveldict: A dictionary containing level information
-    # Invariant: _leveldict is a dictionary
+    # Invariant: _leveldict is a dictionary or None (before the first level)
+    #
+    # Attribute _loader: The loader that builds levels in the background
+    # Invariant: _loader is a LevelLoader object
+    #
+    # Attribute _sounds: The sound effects, loaded once at startup
+    # Invariant: _sounds is a SoundBank object
     #
     # Attribute _sounddict: A dictionary of sounds to play
-    # Invariant: _sounddict is a dictionary
+    # Invariant: _sounddict is a dictionary mapping names to VoicePool objects
     #
     # Attribute _state: The current state of the game
     # Invariant: _state is one of STATE_INACTIVE, STATE_LOADING, STATE_PAUSED,
@@ -60,17 +83,56 @@ class Froggo(FloatLayout):
     # Attribute _level: The subcontroller for a level
     # Invariant: _level is a Level object or None
     #
+    # Attribute _view: The view that draws the current level
+    # Invariant: _view is a LevelView object or None
+    #
     # Attribute _levelNum: The number of the current level
     # Invariant: _levelNum is an int
     #
     # Attribute _title: The title of the game
-    # Invariant: _title is a Label or None
+    # Invariant: _title is a string or None
     #
     # Attribute _text: A message to display to the player
-    # Invariant: _text is a Label or None
+    # Invariant: _text is a string or None
+    #
+    # Attribute _prompt: True if _text is the prompt of the title screen
+    # Invariant: _prompt is a bool
+    #
+    # Attribute _livesText: The text indicating the number of lives
+    # Invariant: _livesText is a string or None (before the first level)
+    #
+    # Attribute _levelGroup: The instructions used to draw the current level
+    # Invariant: _levelGroup is a kivy.graphics InstructionGroup
+    #
+    # Attribute _drawnView: The level view that is currently in _levelGroup
+    # Invariant: _drawnView is a LevelView object or None
+    #
+    # Attribute _overlay: The instructions drawn behind the labels
+    # Invariant: _overlay is a kivy.graphics InstructionGroup
+    #
+    # Attribute _overlayKey: The state and size that _overlay was last built for
+    # Invariant: _overlayKey is a tuple or None
+    #
+    # Attribute _textGroup: The instructions that draw the title, lives and message
+    # Invariant: _textGroup is a kivy.graphics InstructionGroup
+    #
+    # Attribute _textKey: The texts and size that _textGroup was last built for
+    # Invariant: _textKey is a tuple or None
+    #
+    # Attribute _hudLabel: The HUD label that is currently shown
+    # Invariant: _hudLabel is a Label or None
+    #
+    # Attribute _accumulator: The frame time not yet simulated
+    # Invariant: _accumulator is a number (int or float) >= 0
     #
-    # Attribute _livesLabel: The label indicating the number of lives
-    # Invariant: _livesLabel is a Label or None
+    # Attribute _hud: The performance overlay, toggled with HUD_KEY
+    # Invariant: _hud is a PerfHud object
+    #
+    # Attribute _tick: The number of simulation steps run so far
+    # Invariant: _tick is an int >= 0
+    #
+    # Attribute _recorder: The recording of the level being played
+    # Invariant: _recorder is a Recorder object or None
     #
 
     def __init__(self,**kwargs):
@@ -81,22 +143,40 @@ class Froggo(FloatLayout):
         """
         super(Froggo, self).__init__(**kwargs)
         self._keydict = {}
+        self._input = InputQueue()
+        self._latency = LatencyMeter()
         self._keyboard = Window.request_keyboard(self._keyboard_closed, self)
         self._keyboard.bind(on_key_down=self._key_down)
         self._keyboard.bind(on_key_up=self._key_up)
         self._setpaths()
-        self._leveldict = self._loadjson(LEVEL_1)
-        self._sounddict = {}
+        loadSprites()
+        self._leveldict = None
+        self._loader = LevelLoader(self.json,self.images,self.cache)
+        self._sounds = SoundBank()
+        self._sounddict = self._sounds.getSounds()
         self._state = STATE_INACTIVE
         self._level = None
+        self._view = None
         self._levelNum = 1
-        self._title = Label(text="Froggo", color=(0,120/255,0,1), pos=(0,50),\
-            halign='center', strip=True, font_size=LARGE_FONT, font_name=OFFICIAL_FONT)
-        self.add_widget(self._title)
-        self._text = Label(text="Press 's' to start", color=(0,0,0,1), pos=(0,-50),\
-            halign='center', strip=True, font_size=MEDIUM_FONT, font_name=OFFICIAL_FONT)
-        self.add_widget(self._text)
-        self._livesLabel = None
+        self._title = "Froggo"
+        self._text = "Press 's' to start"
+        self._prompt = True
+        self._livesText = None
+        self._hudLabel = None
+        self._levelGroup = InstructionGroup()
+        self._drawnView = None
+        self._overlay = InstructionGroup()
+        self._overlayKey = None
+        self._textGroup = InstructionGroup()
+        self._textKey = None
+        self._accumulator = 0
+        self._hud = PerfHud(self._latency,self._sounds)
+        self._tick = 0
+        self._recorder = None
+        self.canvas.before.add(self._levelGroup)
+        self.canvas.before.add(self._overlay)
+        self.canvas.before.add(self._textGroup)
+        self.bind(size=self._resize)
 
     def update(self,dt):
         """
@@ -114,32 +194,21 @@ class Froggo(FloatLayout):
             self._state = STATE_LOADING
 
         if self._state == STATE_LOADING:
-            self._level = Level(self.width,self.height,self._leveldict,self.images)
-            self._livesLabel = Label(text="Lives:", color=(0,120/255,0,1), pos=(64,290),\
-                halign='center', font_size=SMALL_FONT, font_name=OFFICIAL_FONT)
-            self.add_widget(self._livesLabel)
-            self._sounddict['ribbit'] =  SoundLoader.load(RIBBIT_SOUND)
-            self._sounddict['squish'] =  SoundLoader.load(SQUISH_SOUND)
-            self._sounddict['activation'] =  SoundLoader.load(ACTIVATION_SOUND)
-            self._state = STATE_ACTIVE
-
-        if self._state == STATE_ACTIVE:
-            self._level.update(dt,self._keydict,self._leveldict,self._sounddict)
-            if len(self._level.getLives()) == 0 or self._level.getWon():
-                self._state = STATE_COMPLETE
-            elif self._level.getFrog() is None:
-                self._state = STATE_PAUSED
+            self._loadLevel()
+
+        if self._state in [STATE_ACTIVE,STATE_PAUSED,STATE_CONTINUE]:
+            lives = self._level.getLives()
+            self._state = self._level.play(self._state,dt,self._keydict,self._leveldict,self._sounddict)
+            if self._state == STATE_COMPLETE:
+                self._saveRecording()
+                if not self._level.getWon():
+                    # Build the level again now, so that 'p' is instant
+                    self._loader.request(LEVELS[self._levelNum-1],self.width,self.height)
+            elif self._level.getLives() < lives:
+                self._saveRecording()
 
         if self._state == STATE_PAUSED:
-            self._text = Label(text="Press 'c' to continue", color=(0,120/255,0,1),\
-                halign='center', strip=True, font_size=SMALL_FONT, font_name=OFFICIAL_FONT,\
-                pos_hint={'top': .95})
-            if 'c' in self._keydict and self._keydict['c']:
-                self._state = STATE_CONTINUE
-
-        if self._state == STATE_CONTINUE:
-            self._level.update(dt,self._keydict,self._leveldict,self._sounddict,True)
-            self._state = STATE_ACTIVE
+            self._setText("Press 'c' to continue")
 
         if self._state == STATE_COMPLETE:
             if self._level.getWon() and self._levelNum == 7:
@@ -153,65 +222,241 @@ class Froggo(FloatLayout):
                 text = "Level Failed\nPress 'p' to play again\nor press 'q' to quit"
                 if 'p' in self._keydict and self._keydict['p']:
                     self._state = STATE_LOADING
-            self._text = Label(text=text, color=(0,120/255,0,1),\
-                halign='center', strip=True, font_size=SMALL_FONT, font_name=OFFICIAL_FONT,\
-                pos_hint={'top': .95})
+            self._setText(text)
             if 'q' in self._keydict and self._keydict['q']:
+                self._saveRecording()
                 FroggoApp.get_running_app().stop()
 
+    def _setText(self,text):
+        """
+        Sets the message to display to the player.
+
+        Only the text is kept here. The message is rendered to a texture the
+        first time it is shown (see textTexture), so it is not laid out again
+        every frame or every time it comes back.
+
+        Parameter text: The message to display
+        Precondition: text is a string
+        """
+        self._text = text
+        self._prompt = False
+
+    def _loadLevel(self):
+        """
+        Starts the current level if the loader has finished building it.
+
+        Until then a loading message is shown and the game keeps drawing.
+        Once the level starts, the next level is built in the background
+        while this one is played.
+        """
+        loaded = self._loader.take(LEVELS[self._levelNum-1],self.width,self.height)
+        if loaded is None:
+            self._setText("Loading...")
+            return
+        self._leveldict = loaded[0]
+        self._level = loaded[1]
+        self._view = LevelView(self._level,self._leveldict,self.images)
+        self._recorder = Recorder(LEVELS[self._levelNum-1],self.width,self.height,\
+            self._keydict,self._tick,INPUT_BUFFER)
+        self._livesText = "Lives:"
+        if self._levelNum < len(LEVELS):
+            self._loader.request(LEVELS[self._levelNum],self.width,self.height)
+        self._state = STATE_ACTIVE
+
+    def _saveRecording(self):
+        """
+        Saves the recording of the level being played in the Recordings folder.
+
+        The same file is written again each time, so it always holds the
+        whole level so far. Only the bytes are made here; the file is written
+        by the loader on its thread, so that the frame does not wait for the
+        disk. A recording that cannot be written is skipped.
+        """
+        if self._recorder is None:
+            return
+        path = os.path.join(self.recordings,self._recorder.getName())
+        # This step has been played, but _tick only counts it once it ends
+        self._loader.write(path,self._recorder.getBytes(self._tick+1))
+
     def _nextLevel(self):
         """
         Changes the level to the next level.
+
+        The level itself is taken from the loader in the loading state.
         """
         self._levelNum += 1
-        if self._levelNum == 2:
-            self._leveldict = self._loadjson(LEVEL_2)
-        elif self._levelNum == 3:
-            self._leveldict = self._loadjson(LEVEL_3)
-        elif self._levelNum == 4:
-            self._leveldict = self._loadjson(LEVEL_4)
-        elif self._levelNum == 5:
-            self._leveldict = self._loadjson(LEVEL_5)
-        elif self._levelNum == 6:
-            self._leveldict = self._loadjson(LEVEL_6)
-        elif self._levelNum == 7:
-            self._leveldict = self._loadjson(LEVEL_7)
-
-    def draw(self):
+
+    def draw(self,alpha=1.0):
         """
         Draws the game objects to the canvas.
+
+        The level, the overlay and the texts live in persistent instruction
+        groups in canvas.before, so the HUD label (a child widget) is always
+        drawn on top of them. Nothing is rebuilt unless it has changed.
+
+        Parameter alpha: How far the drawing is between the last two steps
+        Precondition: alpha is a number (int or float) >= 0 and <= 1
         """
-        if self._state != STATE_INACTIVE:
-            self._level.draw(self.canvas)
-            self.remove_widget(self._livesLabel)
-            self.add_widget(self._livesLabel)
-        if not self._text is None:
-            if self._state == STATE_INACTIVE:
-                self.canvas.before.add(Rectangle(size=(self.width, self.height)))
-            elif self._state == STATE_PAUSED:
-                y=len(self._leveldict['lanes'])/2*GRID_SIZE - 1/2*GRID_SIZE
-                self.canvas.add(Rectangle(size=(self.width, GRID_SIZE),pos=(0,y)))
-                #add text last so that it is on top
-                self.remove_widget(self._text)
-                self.add_widget(self._text)
-            elif self._state == STATE_COMPLETE:
-                y=len(self._leveldict['lanes'])/2*GRID_SIZE - 1/2*GRID_SIZE
-                self.canvas.add(Rectangle(size=(self.width, 3*GRID_SIZE),pos=(0,y-GRID_SIZE)))
-                #add text last so that it is on top
-                self.remove_widget(self._text)
-                self.add_widget(self._text)
+        if self._state != STATE_INACTIVE and not self._view is None:
+            if not self._view is self._drawnView:
+                self._levelGroup.clear()
+                self._drawnView = self._view
+            self._view.draw(self._levelGroup,alpha)
+        if self._text is None:
+            self._drawOverlay(None)
+        else:
+            self._drawOverlay(self._state)
+        self._drawTexts()
+        self._drawWidgets()
+        self._hud.draw(self)
+
+    def _drawOverlay(self,state):
+        """
+        Rebuilds the rectangle drawn behind the message if the state or the
+        window size changed.
+
+        Parameter state: The state to draw the overlay for
+        Precondition: state is one of the STATE constants or None
+        """
+        key = (state,self.width,self.height)
+        if key == self._overlayKey:
+            return
+        self._overlayKey = key
+        self._overlay.clear()
+        if state == STATE_INACTIVE or state == STATE_LOADING:
+            self._overlay.add(Rectangle(size=(self.width, self.height)))
+            return
+        # A level taller than the window scrolls, so the middle of the window is used
+        rows = min(len(self._leveldict['lanes']),self.height//GRID_SIZE - 1)
+        y=rows/2*GRID_SIZE - 1/2*GRID_SIZE
+        if state == STATE_PAUSED:
+            self._overlay.add(Rectangle(size=(self.width, GRID_SIZE),pos=(0,y)))
+        elif state == STATE_COMPLETE:
+            self._overlay.add(Rectangle(size=(self.width, 3*GRID_SIZE),pos=(0,y-GRID_SIZE)))
+
+    def _drawTexts(self):
+        """
+        Rebuilds the rectangles that draw the title, lives and message if one
+        of them or the window size changed.
+
+        Each text is drawn from the texture returned by textTexture, so a
+        message is only rendered once, however often it is shown.
+        """
+        green = (0,120/255,0,1)
+        texts = []
+        if not self._title is None:
+            texts.append((self._title,LARGE_FONT,green,0,50))
+        if not self._livesText is None:
+            texts.append((self._livesText,SMALL_FONT,green,64,290))
+        if not self._text is None and self._prompt:
+            texts.append((self._text,MEDIUM_FONT,(0,0,0,1),0,-50))
+        elif not self._text is None:
+            texts.append((self._text,SMALL_FONT,green,0,-0.05*self.height))
+        key = (tuple(texts),self.width,self.height)
+        if key == self._textKey:
+            return
+        self._textKey = key
+        self._textGroup.clear()
+        self._textGroup.add(Color(1,1,1,1))
+        for text, size, color, dx, dy in texts:
+            texture = textTexture(text,size,color)
+            # Each text is centered on the point (dx, dy) from the middle of the window
+            x = self.width/2 + dx - texture.width/2
+            y = self.height/2 + dy - texture.height/2
+            self._textGroup.add(Rectangle(texture=texture, size=texture.size, pos=(x,y)))
+
+    def _drawWidgets(self):
+        """
+        Shows the HUD label if it is set.
+
+        The label is only removed or added when it changed.
+        """
+        label = self._hud.getLabel()
+        if not label is self._hudLabel:
+            if not self._hudLabel is None:
+                self.remove_widget(self._hudLabel)
+            if not label is None:
+                self.add_widget(label)
+            self._hudLabel = label
+
+    def shutdown(self):
+        """
+        Stops the background loader when the application stops, so that the
+        levels it was going to build do not hold up the exit.
+        """
+        self._loader.shutdown()
+
+    def _resize(self,instance,size):
+        """
+        Bakes the background of the current level again for the new size.
+
+        Before the game starts, the first level is built in the background
+        for the new size. The level is taken with the size of this widget,
+        which is only the size of the window once the widget is laid out, so
+        it is not requested any earlier.
+
+        Parameter instance: The widget that was resized
+        Precondition: instance is this Froggo object
+
+        Parameter size: The new size of the widget
+        Precondition: size is a 2-element list of numbers
+        """
+        if not self._view is None:
+            self._view.bakeBackground()
+        if self._state == STATE_INACTIVE:
+            self._loader.request(LEVELS[0],self.width,self.height)
 
     def _refresh(self,dt):
         """
         Processes a single animation frame.
 
+        The game is simulated in fixed steps of SIM_STEP seconds, so the result
+        does not depend on the frame rate. The time left over is carried to
+        the next frame and used to draw between the last two steps. After a
+        stall at most MAX_STEPS steps are run and the rest of the time is
+        dropped, so that the game does not spiral trying to catch up.
+
+        The key events since the last step are applied before each step
+        (see InputQueue). Once the frame is drawn, the latency of every key
+        press that moved the frog in this frame is recorded.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        if self._text is None:
-            self.canvas.clear()
-        self.update(dt)
-        self.draw()
+        start = time.perf_counter()
+        self._accumulator += dt
+        steps = 0
+        while self._accumulator >= SIM_STEP and steps < MAX_STEPS:
+            if not self._view is None:
+                self._view.snapshot()
+            self._applyInput()
+            level = self._level
+            moves = 0 if level is None else level.getMoves()
+            self.update(SIM_STEP)
+            if not level is None and level is self._level and level.getMoves() > moves:
+                self._latency.moved()
+            self._tick += 1
+            self._accumulator -= SIM_STEP
+            steps += 1
+        if self._accumulator >= SIM_STEP:
+            self._accumulator = 0
+        middle = time.perf_counter()
+        self.draw(self._accumulator/SIM_STEP)
+        end = time.perf_counter()
+        self._latency.drawn(end)
+        self._hud.record(dt,middle-start,end-middle)
+
+    def _applyInput(self):
+        """
+        Applies the key events since the last step to the keys held in the
+        next step, and records the keys that changed.
+        """
+        for key, stamp in self._input.step(self._keydict):
+            if key in MOVE_KEYS:
+                self._latency.press(stamp)
+        if not self._recorder is None:
+            for key in RECORD_KEYS:
+                self._recorder.record(self._tick,key,key in self._keydict and self._keydict[key])
 
     def _keyboard_closed(self):
         """
@@ -223,7 +468,7 @@ class Froggo(FloatLayout):
 
     def _key_down(self, keyboard, keycode, text, modifiers):
         """
-        Detects when a key is down and adds it to the key dictionary.
+        Detects when a key is down and adds the event to the input queue.
 
         Parameter keyboard: reference to the keyboard
         Precondition: keyboard is a kivy.core.window.Keyboard
@@ -237,12 +482,14 @@ class Froggo(FloatLayout):
         Parameter modifiers: the modifiers associated with the press
         Precondition: modifiers is list of key codes
         """
-        self._keydict[keycode[1]] = True
+        self._input.push(keycode[1],True,time.perf_counter())
+        if keycode[1] == HUD_KEY:
+            self._hud.toggle()
         return True
 
     def _key_up(self, keyboard, keycode):
         """
-        Detects when a key is released and adds it to the key dictionary.
+        Detects when a key is released and adds the event to the input queue.
 
         Parameter keyboard: reference to the keyboard
         Precondition: keyboard is a kivy.core.window.Keyboard
@@ -250,7 +497,7 @@ class Froggo(FloatLayout):
         Parameter keycode: the key pressed
         Precondition: keycode is a tuple with first element int and second element string
         """
-        self._keydict[keycode[1]] = False
+        self._input.push(keycode[1],False,time.perf_counter())
         return True
 
     def _setpaths(self):
@@ -268,23 +515,10 @@ class Froggo(FloatLayout):
         self.fonts  = str(os.path.join(path, 'Fonts'))
         self.images = str(os.path.join(path, 'Images'))
         self.sounds = str(os.path.join(path, 'Sounds'))
+        self.cache  = str(os.path.join(path, 'Cache'))
+        self.recordings = str(os.path.join(path, 'Recordings'))
 
         # kivy.resources.resource_add_path() adds a custom path to search in
         kivy.resources.resource_add_path(self.fonts)
         kivy.resources.resource_add_path(self.images)
         kivy.resources.resource_add_path(self.sounds)
-
-    def _loadjson(self,name):
-        """
-        Returns the JSON for the given file name.
-
-        Parameter name: The file name
-        Precondition: name is a valid file name
-        """
-        # open() returns a file object
-        file = open(os.path.join(self.json,name))
-        # file.read() returns the whole text of the file
-        data = file.read()
-        # json.loads() parses the text
-        data = json.loads(data)
-        return data
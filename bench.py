@@ -0,0 +1,479 @@
+"""
+Benchmark script for Froggo
+
+This script plays every shipped level, and a few synthetic ones, for a fixed
+number of simulation steps with scripted input. It prints the timings as
+JSON, so that the output of two branches can be compared:
+
+    python bench.py --frames 6000 --output before.json
+
+For each level it reports the mean and 99th percentile time per step of
+Level.update, of all the Lane.update calls, and of the collision checks, as
+well as the memory allocated and the garbage collections while stepping.
+With --draw it also opens a kivy window and times LevelView.draw, and counts
+the canvas instructions and Rectangles of the level.
+
+With --scaling it instead reports how the cost of a step grows with the
+number of objects, on generated levels with 100 to 100,000 objects.
+
+With --env it also reports how many environment steps per second an agent
+gets from FroggoEnv and from VecFroggoEnv with ENV_GAMES games.
+
+With --scrolling it also times generated levels of SCROLLING_LANES lanes,
+played in a window of GAME_HEIGHT (so only the lanes near the window are
+updated every step) and in a window tall enough for every lane.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from compiler import loadjson
+from generator import *
+from env import *
+from level import *
+from constants import *
+import argparse
+import platform
+import random
+import time
+import json
+import gc
+import os
+import tracemalloc
+
+
+# The folder that this script is in
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# The keys chosen by the scripted input, weighted towards moving up
+KEYS = ['up', 'up', 'up', 'left', 'right', 'down', None]
+
+# The number of steps that each scripted key is held for
+KEY_STEPS = 10
+
+# The number of objects in the generated levels of the scaling report
+SCALING_ENTITIES = [100, 1000, 10000, 100000]
+
+# The numbers of games stepped at once in the environment report
+ENV_GAMES = [1, 256, 1024]
+
+# The numbers of lanes in the generated levels of the scrolling report
+SCROLLING_LANES = [9, 50, 500]
+
+
+def benchLevels(seed):
+    """
+    Returns a list of (name, leveldict) pairs for every level to benchmark.
+
+    Parameter seed: The seed for the synthetic levels
+    Precondition: seed is an int
+    """
+    levels = []
+    for name in LEVELS:
+        levels.append((name,loadjson(os.path.join(ROOT,'JSON',name))))
+    levels.append(('synthetic-20x11',generateLevel(20,11,0.4,seed=seed)))
+    levels.append(('synthetic-60x40',generateLevel(60,40,0.4,seed=seed)))
+    return levels
+
+
+def summarize(samples):
+    """
+    Returns a dictionary with the mean and 99th percentile of the samples,
+    in microseconds.
+
+    Parameter samples: The time of each step in seconds
+    Precondition: samples is a nonempty list of numbers
+    """
+    ordered = sorted(samples)
+    p99 = ordered[int(0.99*(len(ordered)-1))]
+    return {'mean_us': sum(ordered)/len(ordered)*1e6, 'p99_us': p99*1e6}
+
+
+class Runner(object):
+    """
+    A class that steps a level with scripted input, restarting it when the
+    frog is killed or the level ends.
+    """
+    # Attribute _leveldict: The level being played
+    # Invariant: _leveldict is a dictionary
+    #
+    # Attribute _imagespath: The path to the Images folder
+    # Invariant: _imagespath is a valid path
+    #
+    # Attribute _rnd: The random choices of the scripted input
+    # Invariant: _rnd is a random.Random object
+    #
+    # Attribute _keydict: The keys currently held
+    # Invariant: _keydict is a dictionary
+    #
+    # Attribute _steps: The number of steps run so far
+    # Invariant: _steps is an int >= 0
+    #
+    # Attribute _height: The height of the window, or None for a window
+    #                    tall enough for every lane
+    # Invariant: _height is an int > 0 or None
+    #
+    # Attribute level: The level being stepped (replaced when it ends)
+    # Invariant: level is a Level object
+    #
+
+    def __init__(self,leveldict,imagespath,seed,height=None):
+        """
+        Initializes the runner with a new level.
+
+        Parameter leveldict: A dictionary containing level information
+        Precondition: leveldict is a dictionary
+
+        Parameter imagespath: The path to the Images folder
+        Precondition: imagespath is a valid path
+
+        Parameter seed: The seed for the scripted input
+        Precondition: seed is an int
+
+        Parameter height: The height of the window, or None for a window
+        tall enough for every lane
+        Precondition: height is an int > 0 or None
+        """
+        self._leveldict = leveldict
+        self._imagespath = imagespath
+        self._rnd = random.Random(seed)
+        self._keydict = {}
+        self._steps = 0
+        self._height = height
+        self.level = self.newLevel()
+
+    def newLevel(self):
+        """
+        Returns a new Level for the level dictionary.
+        """
+        size = self._leveldict['size']
+        height = self._height
+        if height is None:
+            height = (size[1]+1)*GRID_SIZE
+        return Level(size[0]*GRID_SIZE,height,self._leveldict,self._imagespath)
+
+    def step(self):
+        """
+        Runs one simulation step and returns the time it took in seconds.
+
+        The time to restart the level or the frog is not included.
+        """
+        if self._steps % KEY_STEPS == 0:
+            key = self._rnd.choice(KEYS)
+            self._keydict = {} if key is None else {key: True}
+        self._steps += 1
+        start = time.perf_counter()
+        self.level.update(SIM_STEP,self._keydict,self._leveldict,{})
+        elapsed = time.perf_counter() - start
+        if self.level.getFrog() is None:
+            if self.level.getLives() == 0 or self.level.getWon():
+                self.level = self.newLevel()
+            else:
+                self.level.update(SIM_STEP,self._keydict,self._leveldict,{},True)
+        return elapsed
+
+
+def timed(func,bucket,totals):
+    """
+    Returns a function that calls func and adds the time it took to
+    totals[bucket].
+
+    Parameter func: The function to time
+    Precondition: func is callable
+
+    Parameter bucket: The key to add the time to
+    Precondition: bucket is a key of totals
+
+    Parameter totals: The times so far in this step
+    Precondition: totals is a dictionary of numbers
+    """
+    def wrapper(*args):
+        start = time.perf_counter()
+        result = func(*args)
+        totals[bucket] += time.perf_counter() - start
+        return result
+    return wrapper
+
+
+def instrument(level,totals):
+    """
+    Replaces the lane updates and the collision checks of the level with
+    timed versions.
+
+    Parameter level: The level to instrument
+    Precondition: level is a Level object
+
+    Parameter totals: The times so far in this step
+    Precondition: totals is a dictionary with keys 'lanes' and 'collisions'
+    """
+    for lane in level.getLanes():
+        lane.update = timed(lane.update,'lanes',totals)
+    level._collideLane = timed(level._collideLane,'collisions',totals)
+
+
+def benchUpdate(leveldict,imagespath,frames,seed,height=None):
+    """
+    Returns the timings of Level.update, Lane.update and the collisions.
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+
+    Parameter imagespath: The path to the Images folder
+    Precondition: imagespath is a valid path
+
+    Parameter frames: The number of steps to run
+    Precondition: frames is an int > 0
+
+    Parameter seed: The seed for the scripted input
+    Precondition: seed is an int
+
+    Parameter height: The height of the window, or None for a window tall
+    enough for every lane
+    Precondition: height is an int > 0 or None
+    """
+    runner = Runner(leveldict,imagespath,seed,height)
+    totals = {'lanes': 0.0, 'collisions': 0.0}
+    instrumented = None
+    update = []
+    lanes = []
+    collisions = []
+    for i in range(frames):
+        if not runner.level is instrumented:
+            instrument(runner.level,totals)
+            instrumented = runner.level
+        totals['lanes'] = 0.0
+        totals['collisions'] = 0.0
+        update.append(runner.step())
+        lanes.append(totals['lanes'])
+        collisions.append(totals['collisions'])
+    return {'update': summarize(update), 'lane_update': summarize(lanes),
+        'collisions': summarize(collisions)}
+
+
+def benchMemory(leveldict,imagespath,frames,seed):
+    """
+    Returns the memory allocated and the garbage collections while stepping.
+
+    This is a separate run, since tracing allocations slows every step down.
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+
+    Parameter imagespath: The path to the Images folder
+    Precondition: imagespath is a valid path
+
+    Parameter frames: The number of steps to run
+    Precondition: frames is an int > 0
+
+    Parameter seed: The seed for the scripted input
+    Precondition: seed is an int
+    """
+    runner = Runner(leveldict,imagespath,seed)
+    collections = sum(stat['collections'] for stat in gc.get_stats())
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for i in range(frames):
+        runner.step()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = sum(stat['collections'] for stat in gc.get_stats()) - collections
+    return {'net_bytes': current-start, 'peak_bytes': peak-start,
+        'gc_collections': collections}
+
+
+def benchDraw(leveldict,imagespath,frames,seed):
+    """
+    Returns the timings of LevelView.draw and the size of the canvas.
+
+    This opens a kivy window, since textures need a graphics context.
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+
+    Parameter imagespath: The path to the Images folder
+    Precondition: imagespath is a valid path
+
+    Parameter frames: The number of steps to run
+    Precondition: frames is an int > 0
+
+    Parameter seed: The seed for the scripted input
+    Precondition: seed is an int
+    """
+    from kivy.core.window import Window
+    from kivy.graphics import InstructionGroup
+    import kivy.resources
+    from sprites import loadSprites
+    from view import LevelView
+    from hud import countInstructions
+    kivy.resources.resource_add_path(imagespath)
+    loadSprites()
+    runner = Runner(leveldict,imagespath,seed)
+    view = None
+    group = InstructionGroup()
+    draw = []
+    for i in range(frames):
+        if view is None or not view.getLevel() is runner.level:
+            group.clear()
+            view = LevelView(runner.level,leveldict,imagespath)
+            view.bakeBackground()
+        view.snapshot()
+        runner.step()
+        start = time.perf_counter()
+        view.draw(group,0.5)
+        draw.append(time.perf_counter() - start)
+    count, rects = countInstructions(group)
+    return {'draw': summarize(draw), 'instructions': count, 'rectangles': rects}
+
+
+def countEntities(leveldict):
+    """
+    Returns the number of objects in the level, not counting tiles.
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+    """
+    return sum(len(lane.get('objects',[])) for lane in leveldict['lanes'])
+
+
+def benchScaling(frames,seed,draw):
+    """
+    Returns the timings of generated levels with 100 to 100,000 objects.
+
+    Parameter frames: The number of steps to run each level for
+    Precondition: frames is an int > 0
+
+    Parameter seed: The seed for the levels and the scripted input
+    Precondition: seed is an int
+
+    Parameter draw: Whether to also time drawing
+    Precondition: draw is a bool
+    """
+    imagespath = os.path.join(ROOT,'Images')
+    results = []
+    for entities in SCALING_ENTITIES:
+        leveldict = generateEntities(entities,seed)
+        start = time.perf_counter()
+        Runner(leveldict,imagespath,seed)
+        build = time.perf_counter() - start
+        result = {'entities': countEntities(leveldict), 'lanes': len(leveldict['lanes']),
+            'cols': leveldict['size'][0], 'build_ms': build*1e3}
+        result.update(benchUpdate(leveldict,imagespath,frames,seed))
+        if draw:
+            result.update(benchDraw(leveldict,imagespath,frames,seed))
+        results.append(result)
+    return results
+
+
+def benchScrolling(frames,seed):
+    """
+    Returns the timings of generated levels with each number of lanes in
+    SCROLLING_LANES, in a window of GAME_HEIGHT and in one tall enough for
+    every lane.
+
+    Parameter frames: The number of steps to run each level for
+    Precondition: frames is an int > 0
+
+    Parameter seed: The seed for the levels and the scripted input
+    Precondition: seed is an int
+    """
+    imagespath = os.path.join(ROOT,'Images')
+    results = []
+    for lanes in SCROLLING_LANES:
+        leveldict = generateLevel(lanes,11,0.4,seed=seed)
+        for height in [GAME_HEIGHT, None]:
+            result = {'lanes': lanes, 'window': 'full' if height is None else 'game'}
+            result.update(benchUpdate(leveldict,imagespath,frames,seed,height))
+            results.append(result)
+    return results
+
+
+def benchEnv(level,frames,seed):
+    """
+    Returns the environment steps per second of FroggoEnv and of
+    VecFroggoEnv with each number of games in ENV_GAMES, taking random
+    actions.
+
+    Parameter level: The JSON file of the level
+    Precondition: level is a string naming a file in the JSON folder
+
+    Parameter frames: The number of steps to run each environment for
+    Precondition: frames is an int > 0
+
+    Parameter seed: The seed for the random actions
+    Precondition: seed is an int
+    """
+    jsonpath = os.path.join(ROOT,'JSON')
+    imagespath = os.path.join(ROOT,'Images')
+    rnd = random.Random(seed)
+    env = FroggoEnv(jsonpath,imagespath)
+    env.reset(level)
+    start = time.perf_counter()
+    for frame in range(frames):
+        if env.step(rnd.randrange(len(ENV_ACTIONS)))[2]:
+            env.reset(level)
+    result = {'env_steps_per_s': frames/(time.perf_counter()-start)}
+    for games in ENV_GAMES:
+        env = VecFroggoEnv(games,jsonpath,imagespath)
+        env.reset(level)
+        actions = [[rnd.randrange(len(ENV_ACTIONS)) for game in range(games)] for i in range(KEY_STEPS)]
+        steps = max(KEY_STEPS,frames//games)
+        start = time.perf_counter()
+        for step in range(steps):
+            env.step(actions[step % KEY_STEPS])
+        result['vec_%d_steps_per_s' % games] = steps*games/(time.perf_counter()-start)
+    return result
+
+
+def main(argv=None):
+    """
+    Runs the benchmarks and prints (or writes) the results as JSON.
+
+    Parameter argv: The command line arguments, or None for sys.argv
+    Precondition: argv is a list of strings or None
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the Froggo simulation.')
+    parser.add_argument('--frames', type=int, default=6000, help='steps to run each level for')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the scripted input')
+    parser.add_argument('--draw', action='store_true', help='also time drawing (opens a window)')
+    parser.add_argument('--scaling', action='store_true', help='time generated levels of growing size instead')
+    parser.add_argument('--env', action='store_true', help='also time the agent environments')
+    parser.add_argument('--scrolling', action='store_true', help='also time levels taller than the window')
+    parser.add_argument('--output', help='file to write the JSON to (default: print it)')
+    args = parser.parse_args(argv)
+
+    imagespath = os.path.join(ROOT,'Images')
+    results = []
+    if args.scaling:
+        levels = []
+    else:
+        levels = benchLevels(args.seed)
+    for name, leveldict in levels:
+        result = {'name': name, 'lanes': len(leveldict['lanes']),
+            'entities': countEntities(leveldict)}
+        result.update(benchUpdate(leveldict,imagespath,args.frames,args.seed))
+        result['alloc'] = benchMemory(leveldict,imagespath,args.frames,args.seed)
+        if args.draw:
+            result.update(benchDraw(leveldict,imagespath,args.frames,args.seed))
+        else:
+            result.update({'draw': None, 'instructions': None, 'rectangles': None})
+        if args.env and name in LEVELS:
+            result.update(benchEnv(name,args.frames,args.seed))
+        results.append(result)
+
+    import numpy
+    report = {'python': platform.python_version(), 'numpy': numpy.__version__,
+        'machine': platform.machine(), 'frames': args.frames, 'step': SIM_STEP,
+        'seed': args.seed, 'levels': results}
+    if args.scaling:
+        report['scaling'] = benchScaling(args.frames,args.seed,args.draw)
+    if args.scrolling:
+        report['scrolling'] = benchScrolling(args.frames,args.seed)
+    text = json.dumps(report,indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output,'w') as file:
+            file.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Level compiler module for Froggo
+
+A level is compiled by checking its JSON and working out the width in
+pixels of every object from its image. The result is saved as JSON in the
+Cache folder, so a level that has not changed is loaded without opening the
+level file or any image. The cache is JSON rather than pickle so that a
+cache file can never run code when it is read. This module does not import
+kivy.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from lanes import imageSize
+from constants import *
+import hashlib
+import json
+import os
+
+
+# The version of the cache files; change it when the compiled format changes
+CACHE_VERSION = 2
+
+# The lane types that a level may use
+LANE_TYPES = ['grass', 'road', 'water', 'hedge']
+
+
+def loadjson(path):
+    """
+    Returns the JSON in the given file.
+
+    Parameter path: The path to the file
+    Precondition: path is a valid path to a JSON file
+    """
+    with open(path) as file:
+        return json.loads(file.read())
+
+
+def validateLevel(leveldict,name,imagespath=None):
+    """
+    Raises a ValueError if the level is not well formed.
+
+    If imagespath is given, every object must also have an image there, so
+    that an unknown type is reported here and not when its image is opened.
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+
+    Parameter name: The name of the level, used in the error message
+    Precondition: name is a string
+
+    Parameter imagespath: The path to the Images folder, or None to skip the images
+    Precondition: imagespath is None or a string
+    """
+    for key in ['size', 'start', 'offscreen', 'lanes']:
+        if not key in leveldict:
+            raise ValueError(name + ': missing ' + repr(key))
+    size = leveldict['size']
+    if not _isPair(size) or size[0] <= 0 or size[1] <= 0:
+        raise ValueError(name + ': size must be two ints > 0')
+    start = leveldict['start']
+    if not _isPair(start) or not (0 <= start[0] < size[0] and 0 <= start[1] < size[1]):
+        raise ValueError(name + ': start must be two ints inside the level')
+    if type(leveldict['offscreen']) != int or leveldict['offscreen'] < 0:
+        raise ValueError(name + ': offscreen must be an int >= 0')
+    lanes = leveldict['lanes']
+    if type(lanes) != list or len(lanes) != size[1]:
+        raise ValueError(name + ': lanes must be a list with one lane per row')
+    images = set()
+    for pos in range(len(lanes)):
+        lane = lanes[pos]
+        where = name + ': lane ' + str(pos)
+        if type(lane) != dict or not lane.get('type') in LANE_TYPES:
+            raise ValueError(where + ' must have a type in ' + repr(LANE_TYPES))
+        if (lane['type'] == 'road' or lane['type'] == 'water') and \
+            type(lane.get('speed')) not in [int, float]:
+            raise ValueError(where + ' must have a speed')
+        for obj in lane.get('objects',[]):
+            if type(obj) != dict or type(obj.get('type')) != str or \
+                type(obj.get('position')) not in [int, float]:
+                raise ValueError(where + ' has an object without a type and position')
+            if not imagespath is None and not obj['type'] in images:
+                if not os.path.isfile(os.path.join(imagespath,obj['type'] + '.png')):
+                    raise ValueError(where + ' has an object of unknown type ' +
+                        repr(obj['type']))
+                images.add(obj['type'])
+
+
+def compileLevel(path,imagespath):
+    """
+    Returns the compiled level in the given JSON file.
+
+    The compiled level is the JSON dictionary where every object that is not
+    a turtle also has a 'width', its width in pixels when drawn GRID_SIZE
+    pixels high.
+
+    Parameter path: The path to the JSON file
+    Precondition: path is a valid path to a level file
+
+    Parameter imagespath: The path to the Images folder
+    Precondition: imagespath is a valid path
+    """
+    leveldict = loadjson(path)
+    validateLevel(leveldict,os.path.basename(path),imagespath)
+    for lane in leveldict['lanes']:
+        for obj in lane.get('objects',[]):
+            if obj['type'] != 'turtle_east' and obj['type'] != 'turtle_west':
+                size = imageSize(os.path.join(imagespath,obj['type'] + '.png'))
+                obj['width'] = size[0] * (GRID_SIZE / size[1])
+    return leveldict
+
+
+def loadLevel(path,imagespath,cachepath):
+    """
+    Returns the compiled level in the given JSON file, using the cache.
+
+    The cache is used if the JSON file has the same modification time and
+    size as when it was compiled, or otherwise the same SHA-1 hash, and no
+    image it uses has changed. Otherwise the level is compiled again and the
+    cache is rewritten. If the cache cannot be written (for example, on a
+    read-only install) the level is still returned.
+
+    Parameter path: The path to the JSON file
+    Precondition: path is a valid path to a level file
+
+    Parameter imagespath: The path to the Images folder
+    Precondition: imagespath is a valid path
+
+    Parameter cachepath: The path to the Cache folder
+    Precondition: cachepath is a string
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    cachefile = os.path.join(cachepath,name + '.cache')
+    stat = os.stat(path)
+    cached = _readCache(cachefile)
+    digest = None
+    if not cached is None and _imagesCurrent(cached['images'],imagespath):
+        if cached['mtime'] == stat.st_mtime_ns and cached['bytes'] == stat.st_size:
+            return cached['level']
+        digest = _hashFile(path)
+        if cached['hash'] == digest:
+            cached['mtime'] = stat.st_mtime_ns
+            cached['bytes'] = stat.st_size
+            _writeCache(cachefile,cached)
+            return cached['level']
+    leveldict = compileLevel(path,imagespath)
+    if digest is None:
+        digest = _hashFile(path)
+    images = {}
+    for lane in leveldict['lanes']:
+        for obj in lane.get('objects',[]):
+            if 'width' in obj:
+                image = obj['type'] + '.png'
+                images[image] = os.stat(os.path.join(imagespath,image)).st_mtime_ns
+    cached = {'version': CACHE_VERSION, 'grid': GRID_SIZE, 'mtime': stat.st_mtime_ns,
+        'bytes': stat.st_size, 'hash': digest, 'images': images, 'level': leveldict}
+    _writeCache(cachefile,cached)
+    return leveldict
+
+
+def _isPair(value):
+    """
+    Returns True if value is a list of two ints and False otherwise.
+
+    Parameter value: The value to check
+    Precondition: None
+    """
+    return type(value) == list and len(value) == 2 and \
+        type(value[0]) == int and type(value[1]) == int
+
+
+def _hashFile(path):
+    """
+    Returns the SHA-1 hash of the given file as a hex string.
+
+    Parameter path: The path to the file
+    Precondition: path is a valid path to a file
+    """
+    with open(path,'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def _imagesCurrent(images,imagespath):
+    """
+    Returns True if no image has changed since the level was compiled.
+
+    Parameter images: The modification time of each image used by the level
+    Precondition: images is a dictionary mapping image files to ints
+
+    Parameter imagespath: The path to the Images folder
+    Precondition: imagespath is a valid path
+    """
+    for image in images:
+        try:
+            if os.stat(os.path.join(imagespath,image)).st_mtime_ns != images[image]:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _readCache(cachefile):
+    """
+    Returns the contents of the cache file, or None if it is missing, cannot
+    be read, or was written by another version or grid size.
+
+    Parameter cachefile: The path to the cache file
+    Precondition: cachefile is a string
+    """
+    try:
+        with open(cachefile) as file:
+            cached = json.loads(file.read())
+    except (OSError, ValueError):
+        return None
+    if type(cached) != dict or cached.get('version') != CACHE_VERSION or \
+        cached.get('grid') != GRID_SIZE:
+        return None
+    return cached
+
+
+def _writeCache(cachefile,cached):
+    """
+    Writes the cache file, if possible.
+
+    The file is written under a temporary name and then renamed, so another
+    copy of the game never reads half a file.
+
+    Parameter cachefile: The path to the cache file
+    Precondition: cachefile is a string
+
+    Parameter cached: The contents of the cache file
+    Precondition: cached is a dictionary
+    """
+    temp = cachefile + '.' + str(os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cachefile),exist_ok=True)
+        with open(temp,'w') as file:
+            file.write(json.dumps(cached,separators=(',',':')))
+        os.replace(temp,cachefile)
+    except OSError:
+        pass
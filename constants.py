@@ -13,6 +13,8 @@ GAME_WIDTH  = 704
 GAME_HEIGHT = 640
 # The size in pixels of a single grid square
 GRID_SIZE    = 64
+# The number of lanes above and below the window that are still updated every step
+CAMERA_MARGIN = 2
 
 
 ### IMAGE CONSTANTS ###
@@ -37,6 +39,49 @@ FROG_SPEED  = 0.25
 DEATH_SPEED  = 0.5
 # The number of seconds for a turtle animation
 TURTLE_SPEED = 3
+# The number of frames that a death animation reaches
+DEATH_FRAMES = 7
+# The number of frames that a turtle animation reaches (from 8 on it is under water)
+TURTLE_FRAMES = 8
+
+
+### OBJECT CONSTANTS ###
+
+# The tag for a car or truck
+TAG_CAR    = 0
+# The tag for a log
+TAG_LOG    = 1
+# The tag for a turtle
+TAG_TURTLE = 2
+# The tag for a fly
+TAG_FLY    = 3
+# The tag for an exit in a hedge
+TAG_EXIT   = 4
+# The tag for an opening in a hedge
+TAG_OPEN   = 5
+# The tag for a safe frog
+TAG_SAFE   = 6
+# The tag for a lane tile
+TAG_TILE   = 7
+
+# A column of a hedge that blocks the frog
+SLOT_HEDGE    = 0
+# A column of a hedge with a free exit
+SLOT_EXIT     = 1
+# A column of a hedge with an opening
+SLOT_OPEN     = 2
+# A column of a hedge with an exit taken by a safe frog
+SLOT_OCCUPIED = 3
+
+
+### CLOCK CONSTANTS ###
+
+# The number of simulation steps per second
+SIM_RATE = 120
+# The number of seconds in a single simulation step
+SIM_STEP = 1.0/SIM_RATE
+# The most simulation steps to run in one frame before dropping time after a stall
+MAX_STEPS = 8
 
 
 ### GAME CONSTANTS ###
@@ -54,6 +99,18 @@ STATE_CONTINUE = 4
 # The state when the game is complete (won or lost)
 STATE_COMPLETE = 5
 
+# The name of each state, indexed by the state
+STATE_NAMES = ['inactive', 'loading', 'active', 'paused', 'continue', 'complete']
+
+# The frog was hit on the road
+CAUSE_ROAD      = 'road'
+# The frog fell in the water
+CAUSE_WATER     = 'water'
+# The frog was carried off the screen by a log or turtle
+CAUSE_OFFSCREEN = 'offscreen'
+# The frog was on a turtle when it dived
+CAUSE_TURTLE    = 'turtle'
+
 
 ### FONT CONSTANTS ###
 
@@ -69,6 +126,9 @@ RIBBIT_SOUND = 'ribbit.wav'
 SQUISH_SOUND = 'squish.wav'
 ACTIVATION_SOUND = 'activation.wav'
 
+# The number of voices for each sound, so that a sound can overlap itself
+SOUND_VOICES = 3
+
 
 ### JSON FILES ###
 
@@ -79,3 +139,86 @@ LEVEL_4 = 'level4.json'
 LEVEL_5 = 'level5.json'
 LEVEL_6 = 'level6.json'
 LEVEL_7 = 'level7.json'
+
+# The JSON files of the levels, in the order they are played
+LEVELS = [LEVEL_1,LEVEL_2,LEVEL_3,LEVEL_4,LEVEL_5,LEVEL_6,LEVEL_7]
+
+
+### HUD CONSTANTS ###
+
+# The key that shows and hides the performance HUD
+HUD_KEY = 'f3'
+
+# The time in seconds between changes to the HUD text
+HUD_INTERVAL = 0.25
+
+# The number of frame times shown in the HUD graph
+HUD_SAMPLES = 120
+
+# The size of the HUD in pixels
+HUD_WIDTH  = 240
+HUD_HEIGHT = 200
+
+# The frame time in seconds at the top of the HUD graph
+HUD_GRAPH_MAX = 0.05
+
+# The font size of the HUD text
+HUD_FONT = 16
+
+
+### INPUT CONSTANTS ###
+
+# The keys that move the frog, in the order they are checked
+MOVE_KEYS = ['up', 'down', 'right', 'left']
+# Whether a move pressed while the frog cannot move yet is made as soon as it can
+INPUT_BUFFER = True
+# The number of input latencies kept for the HUD
+LATENCY_SAMPLES = 256
+
+
+### RECORDING CONSTANTS ###
+
+# The bytes at the start of every recording file
+RECORD_MAGIC = b'FRR2'
+# The bytes at the start of a recording made before moves could be buffered
+RECORD_MAGIC_V1 = b'FRR1'
+# The flag in the header of a recording made with INPUT_BUFFER on
+RECORD_BUFFERED = 1
+
+# The keys that are recorded (the order is part of the file format)
+RECORD_KEYS = ['up', 'down', 'left', 'right', 'c']
+
+
+### ENVIRONMENT CONSTANTS ###
+
+# The keys pressed by each action of an agent (action 0 presses nothing)
+ENV_ACTIONS = [None, 'up', 'down', 'right', 'left']
+
+# The reward for each frog that reaches an exit
+REWARD_EXIT  = 1.0
+# The reward for each life lost
+REWARD_DEATH = -1.0
+# The reward for each row a frog reaches that it had not reached before
+REWARD_ROW   = 0.1
+
+# The most steps in an episode before it is stopped (two minutes of play)
+ENV_MAX_STEPS = 120*SIM_RATE
+
+
+### RASTER CONSTANTS ###
+
+# The channels of an occupancy grid, one per kind of thing on the board
+CHANNEL_CAR       = 0
+CHANNEL_LOG       = 1
+CHANNEL_TURTLE    = 2
+CHANNEL_SUBMERGED = 3
+CHANNEL_WATER     = 4
+CHANNEL_HEDGE     = 5
+CHANNEL_EXIT      = 6
+CHANNEL_OCCUPIED  = 7
+CHANNEL_FLY       = 8
+CHANNEL_FROG      = 9
+
+# The name of each channel, indexed by the channel
+RASTER_CHANNELS = ['car', 'log', 'turtle', 'submerged', 'water', 'hedge', 'exit',
+    'occupied', 'fly', 'frog']
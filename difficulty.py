@@ -0,0 +1,456 @@
+"""
+Difficulty estimation script for Froggo
+
+This script plays each level many times without a window, steered by a
+random or a careful input policy, and reports how often the level is cleared,
+what kills the frog, and how long a clear takes. The play-throughs are split
+into batches that run on a pool of processes, one per core by default:
+
+    python difficulty.py --runs 2000 --policy careful --seed 1
+
+Every play-through has its own random seed, made from --seed, the level and
+the number of the play-through, so the results do not depend on the number of
+processes and are the same every time for the same seed.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from concurrent.futures import ProcessPoolExecutor
+from compiler import compileLevel
+from level import *
+from constants import *
+import argparse
+import random
+import json
+import os
+
+
+# The number of play-throughs in each batch sent to a process
+BATCH_SIZE = 25
+
+# The keys the random policy chooses from, weighted towards moving up
+RANDOM_KEYS = ['up', 'up', 'up', 'up', 'left', 'right', 'down', None]
+
+# The chance in each step that the careful policy makes a random move instead
+CAREFUL_NOISE = 0.002
+
+# The number of seconds that a square must look safe for the careful policy
+CAREFUL_AHEAD = 2*FROG_SPEED
+
+# The number of seconds that a log or turtle must look safe for the careful
+# policy to keep riding it
+CAREFUL_DRIFT = 10*FROG_SPEED
+
+# The longest time in seconds that the careful policy looks ahead
+CAREFUL_HORIZON = 16*FROG_SPEED
+
+# The death causes that are counted
+CAUSES = [CAUSE_ROAD, CAUSE_WATER, CAUSE_OFFSCREEN, CAUSE_TURTLE]
+
+
+def randomPolicy(level,leveldict,rnd):
+    """
+    Returns the keys to hold for the next step, chosen at random.
+
+    Parameter level: The level being played
+    Precondition: level is a Level object
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+
+    Parameter rnd: The random choices of this play-through
+    Precondition: rnd is a random.Random object
+    """
+    key = rnd.choice(RANDOM_KEYS)
+    if key is None:
+        return {}
+    return {key: True}
+
+
+def carefulPolicy(level,leveldict,rnd):
+    """
+    Returns the keys to hold for the next step, only moving up when the
+    square above looks safe for the next CAREFUL_AHEAD seconds.
+
+    The frog moves sideways towards the nearest free exit of the next hedge
+    up, first over solid ground and then below the hedge. It waits on a
+    square while that looks safe (on water, for CAREFUL_DRIFT seconds, since
+    it drifts towards the edge), and otherwise makes the move that keeps it
+    alive the longest. Now and then it makes a random move instead, but
+    never onto a square that does not look safe. No key is held while the
+    frog cannot move, so no move is buffered for later.
+
+    Parameter level: The level being played
+    Precondition: level is a Level object
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+
+    Parameter rnd: The random choices of this play-through
+    Precondition: rnd is a random.Random object
+    """
+    frog = level.getFrog()
+    if not isinstance(frog,Frog) or frog.dead or level.getCoolDown() > 0:
+        return {}
+    if rnd.random() < CAREFUL_NOISE:
+        keydict = randomPolicy(level,leveldict,rnd)
+        if len(keydict) == 0 or _safeMove(level,leveldict,list(keydict)[0]):
+            return keydict
+    lanes = level.getLanes()
+    row = int(frog.y // GRID_SIZE)
+    # Head for the next hedge up
+    hedge = None
+    side = None
+    for pos in range(len(lanes)-1,row,-1):
+        if isinstance(lanes[pos],Hedge):
+            hedge = pos
+    if not hedge is None:
+        side = _towardsExit(lanes[hedge],frog)
+    if side is None and hedge == row+1 and not lanes[row+1].hedgeCollision(frog):
+        return {'up': True}
+    # Over solid ground, walk under the exit first
+    if not side is None and not isinstance(lanes[row],Water) and _safeMove(level,leveldict,side,False):
+        return {side: True}
+    if hedge != row+1 and _safeMove(level,leveldict,'up',False):
+        return {'up': True}
+    if not side is None and _safeMove(level,leveldict,side,False):
+        return {side: True}
+    here = _lasts(lanes[row],frog.x,frog.y,leveldict)
+    middle = 'right' if frog.x < level.getWidth()/2 else 'left'
+    if here >= (CAREFUL_DRIFT if isinstance(lanes[row],Water) else CAREFUL_AHEAD):
+        return {}
+    # Prefer the way to the exit, then the way towards the middle
+    best = None
+    for key in [side, middle, 'left', 'right', 'up', 'down']:
+        target = None if key is None else _target(level,key)
+        if not target is None:
+            lasts = _lasts(target[0],target[1],target[2],leveldict)
+            if lasts > here:
+                best = key
+                here = lasts
+    if best is None:
+        return {}
+    return {best: True}
+
+
+# The policies that can be chosen on the command line
+POLICIES = {'random': randomPolicy, 'careful': carefulPolicy}
+
+
+def _towardsExit(hedge,frog):
+    """
+    Returns 'left' or 'right', the way to the nearest free exit in the hedge
+    (or the nearest opening if every exit is taken), or None if the frog is
+    under it or there is none.
+
+    Parameter hedge: The hedge above the frog
+    Precondition: hedge is a Hedge object
+
+    Parameter frog: The frog
+    Precondition: frog is a Frog object
+    """
+    slots = hedge.getSlots()
+    col = int((frog.x + GRID_SIZE/2) // GRID_SIZE)
+    best = None
+    for slot in [SLOT_EXIT, SLOT_OPEN]:
+        for pos in range(len(slots)):
+            if slots[pos] == slot and (best is None or abs(pos-col) < abs(best-col)):
+                best = pos
+        if not best is None:
+            break
+    if best is None or best == col:
+        return None
+    return 'right' if best > col else 'left'
+
+
+def _target(level,key):
+    """
+    Returns the tuple (lane, x, y) of the square that the move puts the frog
+    on, or None if the level does not move the frog there.
+
+    The level does not move the frog out of the level, and a move into a
+    hedge either is blocked or reaches an exit.
+
+    Parameter level: The level being played
+    Precondition: level is a Level object with a live frog
+
+    Parameter key: The move
+    Precondition: key is one of MOVE_KEYS
+    """
+    frog = level.getFrog()
+    lanes = level.getLanes()
+    x = frog.x + {'left': -GRID_SIZE, 'right': GRID_SIZE}.get(key,0)
+    y = frog.y + {'down': -GRID_SIZE, 'up': GRID_SIZE}.get(key,0)
+    row = int(y // GRID_SIZE)
+    if row < 0 or row >= len(lanes) or x < 0 or x+GRID_SIZE > level.getWidth():
+        return None
+    if isinstance(lanes[row],Hedge):
+        return None
+    return (lanes[row],x,y)
+
+
+def _safeMove(level,leveldict,key,stay=True):
+    """
+    Returns True if the move puts the frog on a square that looks safe for
+    the next CAREFUL_AHEAD seconds.
+
+    Parameter level: The level being played
+    Precondition: level is a Level object with a live frog
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+
+    Parameter key: The move
+    Precondition: key is one of MOVE_KEYS
+
+    Parameter stay: What to return for a move that the level does not make
+    Precondition: stay is a bool
+    """
+    target = _target(level,key)
+    if target is None:
+        return stay
+    return _safe(target[0],target[1],target[2],leveldict)
+
+
+def _safe(lane,x,y,leveldict):
+    """
+    Returns True if a frog at (x, y) in the lane would survive the next
+    CAREFUL_AHEAD seconds, assuming the lane keeps moving as it does now.
+
+    Parameter lane: The lane to check
+    Precondition: lane is a Lane object whose y-coordinate is y
+
+    Parameter x: The x-coordinate of the frog
+    Precondition: x is a number (int or float)
+
+    Parameter y: The y-coordinate of the frog
+    Precondition: y is a number (int or float)
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+    """
+    return _lasts(lane,x,y,leveldict) >= CAREFUL_AHEAD
+
+
+def _lasts(lane,x,y,leveldict):
+    """
+    Returns how many seconds (up to CAREFUL_HORIZON) a frog at (x, y) in the
+    lane would survive without moving, assuming the lane keeps moving as it
+    does now.
+
+    On a road this is the time until a car reaches the frog. On water the
+    frog rides whatever it is on, so this is the time until that log or
+    turtle carries it out of the window, wraps around to the other side of
+    the lane (even if part of it can still be seen) or dives.
+
+    Parameter lane: The lane to check
+    Precondition: lane is a Lane object whose y-coordinate is y
+
+    Parameter x: The x-coordinate of the frog
+    Precondition: x is a number (int or float)
+
+    Parameter y: The y-coordinate of the frog
+    Precondition: y is a number (int or float)
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+    """
+    probe = Frog(leveldict)
+    probe.x = x
+    probe.y = y
+    speed = lane.getSpeed()
+    lasts = CAREFUL_HORIZON
+    if isinstance(lane,Road):
+        for obj in lane.getObjs():
+            if obj.x < probe.right and obj.x+obj.w > probe.left:
+                return 0
+            if speed > 0 and obj.x+obj.w <= probe.left:
+                lasts = min(lasts,(probe.left-obj.x-obj.w)/speed)
+            elif speed < 0 and obj.x >= probe.right:
+                lasts = min(lasts,(obj.x-probe.right)/-speed)
+    elif isinstance(lane,Water):
+        under = None
+        for obj in lane.getObjs():
+            if under is None and lane.contains(obj,probe):
+                under = obj
+        if under is None or (under.tag == TAG_TURTLE and under.frame >= TURTLE_FRAMES):
+            return 0
+        center = x + GRID_SIZE/2
+        if speed > 0:
+            lasts = min(lasts,(lane.getWidth()-center)/speed,(lane.getWidth()-under.x)/speed)
+        elif speed < 0:
+            edge = -leveldict['offscreen']*GRID_SIZE
+            lasts = min(lasts,center/-speed,(under.x-edge)/-speed)
+        if under.tag == TAG_TURTLE:
+            age = lane.getClock().getSteps()-under.phase
+            for step in range(int(lasts/SIM_STEP)+1):
+                if TURTLE_DIVE.frameAt(age+step,SIM_STEP) >= TURTLE_FRAMES:
+                    return step*SIM_STEP
+    return max(0,lasts)
+
+
+def playLevel(leveldict,policy,rnd,maxTicks):
+    """
+    Returns the result of one play-through of the level as the tuple
+    (won, ticks, deaths, over), where deaths maps each death cause to a count
+    and over is False if the play-through ran out of time.
+
+    The play-through ends when the level is over or after maxTicks steps.
+    Whenever the game waits for 'c' the policy presses it.
+
+    Parameter leveldict: A compiled level dictionary
+    Precondition: leveldict is a dictionary with the width of every object
+
+    Parameter policy: The input policy
+    Precondition: policy is one of the functions in POLICIES
+
+    Parameter rnd: The random choices of this play-through
+    Precondition: rnd is a random.Random object
+
+    Parameter maxTicks: The largest number of steps to play
+    Precondition: maxTicks is an int > 0
+    """
+    size = leveldict['size']
+    level = Level(size[0]*GRID_SIZE,(size[1]+1)*GRID_SIZE,leveldict,'',INPUT_BUFFER)
+    deaths = {}
+    for cause in CAUSES:
+        deaths[cause] = 0
+    state = STATE_ACTIVE
+    tick = 0
+    while state != STATE_COMPLETE and tick < maxTicks:
+        if state == STATE_PAUSED:
+            keydict = {'c': True}
+        else:
+            keydict = policy(level,leveldict,rnd)
+        frog = level.getFrog()
+        alive = isinstance(frog,Frog) and not frog.dead
+        state = level.play(state,SIM_STEP,keydict,leveldict,{})
+        frog = level.getFrog()
+        if alive and isinstance(frog,Frog) and frog.dead:
+            deaths[level.getCause()] += 1
+        tick += 1
+    return (level.getWon(),tick,deaths,state == STATE_COMPLETE)
+
+
+def runBatch(task):
+    """
+    Returns the results of a batch of play-throughs of one level.
+
+    This runs in a worker process.
+
+    Parameter task: The tuple (number, leveldict, policy, seed, first, count,
+    maxTicks): the number of the level, the compiled level, the name of the
+    policy, the seed, the number of the first play-through, the number of
+    play-throughs and the largest number of steps in each
+    Precondition: task is a tuple as described
+    """
+    number, leveldict, policy, seed, first, count, maxTicks = task
+    results = []
+    for run in range(first,first+count):
+        rnd = random.Random(runSeed(seed,number,run))
+        results.append(playLevel(leveldict,POLICIES[policy],rnd,maxTicks))
+    return results
+
+
+def runSeed(seed,number,run):
+    """
+    Returns the seed for one play-through.
+
+    Parameter seed: The seed given on the command line
+    Precondition: seed is an int
+
+    Parameter number: The number of the level
+    Precondition: number is an int >= 0
+
+    Parameter run: The number of the play-through
+    Precondition: run is an int >= 0
+    """
+    return (seed*1000003 + number)*1000003 + run
+
+
+def summarize(name,results):
+    """
+    Returns a dictionary describing the play-throughs of a level.
+
+    Parameter name: The JSON file of the level
+    Precondition: name is a string
+
+    Parameter results: The results of playLevel, in order
+    Precondition: results is a nonempty list of tuples
+    """
+    clears = []
+    deaths = {}
+    for cause in CAUSES:
+        deaths[cause] = 0
+    timeouts = 0
+    for won, ticks, counts, over in results:
+        if won:
+            clears.append(ticks*SIM_STEP)
+        if not over:
+            timeouts += 1
+        for cause in counts:
+            deaths[cause] += counts[cause]
+    total = sum(deaths.values())
+    causes = {}
+    for cause in CAUSES:
+        causes[cause] = {'deaths': deaths[cause],
+            'share': deaths[cause]/total if total > 0 else 0.0}
+    result = {'level': name, 'runs': len(results), 'clears': len(clears),
+        'clear_rate': len(clears)/len(results), 'timeouts': timeouts,
+        'deaths_per_run': total/len(results),
+        'causes': causes, 'time_to_clear': None}
+    if len(clears) > 0:
+        clears.sort()
+        result['time_to_clear'] = {'mean': sum(clears)/len(clears),
+            'median': clears[len(clears)//2], 'p90': clears[int(0.9*(len(clears)-1))]}
+    return result
+
+
+def main(argv=None):
+    """
+    Estimates the difficulty of the levels and prints the results as JSON.
+
+    Parameter argv: The command line arguments, or None for sys.argv
+    Precondition: argv is a list of strings or None
+    """
+    parser = argparse.ArgumentParser(description='Estimate the difficulty of the Froggo levels.')
+    parser.add_argument('--runs', type=int, default=1000, help='play-throughs of each level')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='careful', help='input policy')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: one per core)')
+    parser.add_argument('--max-seconds', type=float, default=120, help='longest play-through, in game seconds')
+    parser.add_argument('--levels', nargs='*', default=LEVELS, help='JSON files of the levels')
+    parser.add_argument('--output', help='file to write the JSON to (default: print it)')
+    args = parser.parse_args(argv)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    maxTicks = int(args.max_seconds/SIM_STEP)
+    tasks = []
+    for number in range(len(args.levels)):
+        path = os.path.join(root,'JSON',args.levels[number])
+        leveldict = compileLevel(path,os.path.join(root,'Images'))
+        for first in range(0,args.runs,BATCH_SIZE):
+            count = min(BATCH_SIZE,args.runs-first)
+            tasks.append((number,leveldict,args.policy,args.seed,first,count,maxTicks))
+
+    results = []
+    for number in range(len(args.levels)):
+        results.append([])
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for task, batch in zip(tasks,pool.map(runBatch,tasks)):
+            results[task[0]].extend(batch)
+
+    report = {'policy': args.policy, 'seed': args.seed, 'runs': args.runs,
+        'max_seconds': args.max_seconds, 'levels': []}
+    for number in range(len(args.levels)):
+        report['levels'].append(summarize(args.levels[number],results[number]))
+    text = json.dumps(report,indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output,'w') as file:
+            file.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
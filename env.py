@@ -0,0 +1,836 @@
+"""
+Agent environment module for Froggo
+
+This module lets a program play Froggo without a window, one simulation step
+at a time, through the reset/step interface used by reinforcement learning
+libraries. Each action is an index in ENV_ACTIONS. The game continues after
+a lost life or a filled exit on its own, as if 'c' were held down.
+
+FroggoEnv plays one game with a real Level. VecFroggoEnv plays many games of
+the same level at once: it keeps every game in numpy arrays (one row per
+game) and steps them all with a handful of array operations, following the
+same rules as Level.update, so a step of a thousand games costs about as
+much as a few steps of one. Both return the same observations: the frog's
+x and y, its cooldown, the lives, the safe frogs, whether the frog is dead,
+and then the x-coordinate of every object, lane by lane.
+
+Run as a script, it checks that VecFroggoEnv plays every level exactly as
+FroggoEnv does:
+
+    python env.py --games 8 --steps 3000
+
+This module does not import kivy.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from compiler import compileLevel
+from level import *
+from constants import *
+import argparse
+import random
+import numpy
+import json
+import os
+
+
+# The number of values in an observation before the objects
+OBS_FROG = 6
+
+# The directions of the frog, indexed by action-1
+DIRECTIONS = ['north', 'south', 'east', 'west']
+
+# The kinds of lane, as numbers
+LANE_GRASS = 0
+LANE_ROAD  = 1
+LANE_WATER = 2
+LANE_HEDGE = 3
+
+
+class FroggoEnv(object):
+    """
+    A class that plays one game of Froggo for an agent, with a real Level.
+    """
+    # Attribute _jsonpath: The path to the JSON folder
+    # Invariant: _jsonpath is a valid path
+    #
+    # Attribute _imagespath: The path to the Images folder
+    # Invariant: _imagespath is a valid path
+    #
+    # Attribute _maxSteps: The most steps in an episode
+    # Invariant: _maxSteps is an int > 0
+    #
+    # Attribute _levels: The compiled levels, by JSON file
+    # Invariant: _levels is a dictionary mapping strings to level dictionaries
+    #
+    # Attribute _leveldict: The level being played
+    # Invariant: _leveldict is a level dictionary or None
+    #
+    # Attribute _level: The game being played
+    # Invariant: _level is a Level object or None
+    #
+    # Attribute _state: The state of the game
+    # Invariant: _state is STATE_ACTIVE or STATE_COMPLETE
+    #
+    # Attribute _tick: The number of steps in this episode
+    # Invariant: _tick is an int >= 0
+    #
+    # Attribute _frog: The frog the best row was measured for
+    # Invariant: _frog is a Frog object or None
+    #
+    # Attribute _best: The highest row reached by _frog
+    # Invariant: _best is an int >= 0
+    #
+
+    def getLevel(self):
+        """
+        Returns the Level being played, or None before reset
+        """
+        return self._level
+
+    def __init__(self,jsonpath,imagespath,maxSteps=ENV_MAX_STEPS):
+        """
+        Initializes the environment. Call reset before step.
+
+        Parameter jsonpath: The path to the JSON folder
+        Precondition: jsonpath is a valid path
+
+        Parameter imagespath: The path to the Images folder
+        Precondition: imagespath is a valid path
+
+        Parameter maxSteps: The most steps in an episode
+        Precondition: maxSteps is an int > 0
+        """
+        self._jsonpath = jsonpath
+        self._imagespath = imagespath
+        self._maxSteps = maxSteps
+        self._levels = {}
+        self._leveldict = None
+        self._level = None
+        self._state = STATE_COMPLETE
+        self._tick = 0
+        self._frog = None
+        self._best = 0
+
+    def reset(self,level):
+        """
+        Starts a new episode of the level and returns the first observation.
+
+        Parameter level: The JSON file of the level
+        Precondition: level is a string naming a file in the JSON folder
+        """
+        if not level in self._levels:
+            path = os.path.join(self._jsonpath,level)
+            self._levels[level] = compileLevel(path,self._imagespath)
+        self._leveldict = self._levels[level]
+        size = self._leveldict['size']
+        self._level = Level(size[0]*GRID_SIZE,(size[1]+1)*GRID_SIZE,self._leveldict,'')
+        self._state = STATE_ACTIVE
+        self._tick = 0
+        self._frog = self._level.getFrog()
+        self._best = self._leveldict['start'][1]
+        return self._observe()
+
+    def step(self,action):
+        """
+        Returns the tuple (observation, reward, done, info) after one step.
+
+        info is a dictionary with whether the level was 'won', the 'lives',
+        the 'safe' frogs, the 'tick' and whether the episode hit the
+        'timeout'.
+
+        Parameter action: The action to take
+        Precondition: action is an int >= 0 and < len(ENV_ACTIONS)
+        """
+        assert self._state == STATE_ACTIVE, 'reset the environment first'
+        keydict = {'c': True}
+        if not ENV_ACTIONS[action] is None:
+            keydict[ENV_ACTIONS[action]] = True
+        lives = self._level.getLives()
+        safe = len(self._level.getSafeFrogs())
+        self._state = self._level.play(self._state,SIM_STEP,keydict,self._leveldict,{})
+        self._tick += 1
+        reward = REWARD_EXIT*(len(self._level.getSafeFrogs())-safe)
+        if self._level.getLives() < lives:
+            reward += REWARD_DEATH*(lives-self._level.getLives())
+        frog = self._level.getFrog()
+        if isinstance(frog,Frog) and not frog.dead:
+            if not frog is self._frog:
+                self._frog = frog
+                self._best = self._leveldict['start'][1]
+            row = int(frog.y // GRID_SIZE)
+            if row > self._best:
+                reward += REWARD_ROW*(row-self._best)
+                self._best = row
+        timeout = self._state != STATE_COMPLETE and self._tick >= self._maxSteps
+        done = self._state == STATE_COMPLETE or timeout
+        if timeout:
+            self._state = STATE_COMPLETE
+        info = {'won': self._level.getWon(), 'lives': self._level.getLives(),
+            'safe': len(self._level.getSafeFrogs()), 'tick': self._tick, 'timeout': timeout}
+        return (self._observe(),reward,done,info)
+
+    def _observe(self):
+        """
+        Returns the observation of the game as a numpy array of floats.
+        """
+        frog = self._level.getFrog()
+        xs = [lane.getXs() for lane in self._level.getLanes()]
+        obs = numpy.empty(OBS_FROG+sum(len(x) for x in xs))
+        if isinstance(frog,Frog):
+            obs[0:2] = (frog.x,frog.y)
+            obs[5] = frog.dead
+        else:
+            start = self._leveldict['start']
+            obs[0:2] = (start[0]*GRID_SIZE,start[1]*GRID_SIZE)
+            obs[5] = False
+        obs[2:5] = (self._level.getCoolDown(),self._level.getLives(),len(self._level.getSafeFrogs()))
+        obs[OBS_FROG:] = numpy.concatenate(xs)
+        return obs
+
+
+class VecFroggoEnv(object):
+    """
+    A class that plays many games of the same level at once for an agent.
+
+    Every game has its own row in each array. The objects of every lane are
+    kept side by side in the columns of _xs, in the order of the lanes and
+    of the objects in each lane, as in FroggoEnv. A game that ends is reset
+    in the same step, and the observation returned for it is the first of
+    the next episode.
+    """
+    # Attribute _count: The number of games
+    # Invariant: _count is an int > 0
+    #
+    # Attribute _jsonpath: The path to the JSON folder
+    # Invariant: _jsonpath is a valid path
+    #
+    # Attribute _imagespath: The path to the Images folder
+    # Invariant: _imagespath is a valid path
+    #
+    # Attribute _maxSteps: The most steps in an episode
+    # Invariant: _maxSteps is an int > 0
+    #
+    # Attribute _leveldict: The level being played
+    # Invariant: _leveldict is a level dictionary or None
+    #
+    # The level, shared by every game (set by reset):
+    #
+    # Attribute _width: The width of the window the level is built for
+    # Invariant: _width is an int > 0
+    #
+    # Attribute _height: The height of the window the level is built for
+    # Invariant: _height is an int > 0
+    #
+    # Attribute _tiles: The width of the tiles of a lane side by side
+    # Invariant: _tiles is an int > 0
+    #
+    # Attribute _start: The column and row where each frog starts
+    # Invariant: _start is a list of two ints
+    #
+    # Attribute _kinds: The kind of each lane
+    # Invariant: _kinds is a numpy array of LANE constants
+    #
+    # Attribute _moving: Whether each lane moves
+    # Invariant: _moving is a numpy array of bools, one per lane
+    #
+    # Attribute _speeds: The distance each lane moves in a step
+    # Invariant: _speeds is a numpy array of floats, one per lane
+    #
+    # Attribute _numExits: The number of exits in the level
+    # Invariant: _numExits is an int >= 0
+    #
+    # Attribute _slots0: The slot table of each lane when the level starts
+    # Invariant: _slots0 is a numpy array of SLOT constants of shape
+    #            (lanes, columns); only the rows of hedges are used
+    #
+    # Attribute _xs0: The x-coordinate of every object when the level starts
+    # Invariant: _xs0 is a numpy array of floats, one per object
+    #
+    # Attribute _lane: The lane of every object
+    # Invariant: _lane is a numpy array of ints, one per object
+    #
+    # Attribute _w: The width of every object
+    # Invariant: _w is a numpy array of floats, one per object
+    #
+    # Attribute _fly: Whether every object is a fly
+    # Invariant: _fly is a numpy array of bools, one per object
+    #
+    # Attribute _turtle: Whether every object is a turtle
+    # Invariant: _turtle is a numpy array of bools, one per object
+    #
+    # Attribute _moves: The distance every object moves in a step
+    # Invariant: _moves is a numpy array of floats, one per object
+    #
+    # Attribute _right: Whether every object moves right
+    # Invariant: _right is a numpy array of bools, one per object
+    #
+    # Attribute _left: Whether every object moves left
+    # Invariant: _left is a numpy array of bools, one per object
+    #
+    # Attribute _buffer: How far (in pixels) an object goes past the left
+    #                    edge before it wraps around
+    # Invariant: _buffer is an int >= 0
+    #
+    # Attribute _wrapRight: How far an object moving right jumps back
+    # Invariant: _wrapRight is an int > 0
+    #
+    # Attribute _wrapLeft: How far an object moving left jumps forward
+    # Invariant: _wrapLeft is an int > 0
+    #
+    # Attribute _edges: The left and right edges of the hitbox of the frog
+    #                   facing each way, from its x-coordinate
+    # Invariant: _edges is a numpy array of shape (4, 2)
+    #
+    # Attribute _deathSteps: The steps a dead frog takes to disappear
+    # Invariant: _deathSteps is an int > 0
+    #
+    # The games (one row or value per game):
+    #
+    # Attribute _xs: The x-coordinate of every object
+    # Invariant: _xs is a numpy array of floats of shape (games, objects)
+    #
+    # Attribute _eaten: Whether every object is a fly that was eaten
+    # Invariant: _eaten is a numpy array of bools of shape (games, objects)
+    #
+    # Attribute _animated: The number of times the turtles of each lane were
+    #                      updated
+    # Invariant: _animated is a numpy array of ints of shape (games, lanes)
+    #
+    # Attribute _slots: The slot table of each lane
+    # Invariant: _slots is a numpy array of shape (games, lanes, columns)
+    #
+    # Attribute _fx: The x-coordinate of the frog
+    # Invariant: _fx is a numpy array of floats
+    #
+    # Attribute _fy: The row of the frog
+    # Invariant: _fy is a numpy array of ints
+    #
+    # Attribute _dir: The direction of the frog
+    # Invariant: _dir is a numpy array of indices in DIRECTIONS
+    #
+    # Attribute _cool: The time before the frog can move again
+    # Invariant: _cool is a numpy array of floats
+    #
+    # Attribute _dead: Whether the frog is dead
+    # Invariant: _dead is a numpy array of bools
+    #
+    # Attribute _dying: The steps since the frog died
+    # Invariant: _dying is a numpy array of ints >= 0
+    #
+    # Attribute _lives: The number of lives
+    # Invariant: _lives is a numpy array of ints >= 0 and <= 3
+    #
+    # Attribute _safe: The number of safe frogs
+    # Invariant: _safe is a numpy array of ints >= 0
+    #
+    # Attribute _ticks: The number of steps in the episode
+    # Invariant: _ticks is a numpy array of ints >= 0
+    #
+    # Attribute _best: The highest row the frog has reached
+    # Invariant: _best is a numpy array of ints >= 0
+    #
+
+    def getCount(self):
+        """
+        Returns the number of games
+        """
+        return self._count
+
+    def getState(self):
+        """
+        Returns the state of every game as a dictionary of numpy arrays with
+        one row per game.
+
+        The dictionary has the x-coordinate of every object 'xs', whether it
+        is still in the lane 'present' (an eaten fly is not), whether it is
+        a turtle under the water 'submerged', the slot table of every lane
+        'slots', and the frog's 'x', 'row' and whether it is 'alive'. The
+        arrays are shared with the environment, so they change when it steps.
+        """
+        frames = self._frames(self._animated)
+        return {'xs': self._xs, 'present': ~self._eaten,
+            'submerged': self._turtle & (frames[:,self._lane] >= TURTLE_FRAMES),
+            'slots': self._slots, 'x': self._fx, 'row': self._fy, 'alive': ~self._dead}
+
+    def __init__(self,count,jsonpath,imagespath,maxSteps=ENV_MAX_STEPS):
+        """
+        Initializes the environment. Call reset before step.
+
+        Parameter count: The number of games
+        Precondition: count is an int > 0
+
+        Parameter jsonpath: The path to the JSON folder
+        Precondition: jsonpath is a valid path
+
+        Parameter imagespath: The path to the Images folder
+        Precondition: imagespath is a valid path
+
+        Parameter maxSteps: The most steps in an episode
+        Precondition: maxSteps is an int > 0
+        """
+        self._count = count
+        self._jsonpath = jsonpath
+        self._imagespath = imagespath
+        self._maxSteps = maxSteps
+        self._leveldict = None
+
+    def reset(self,level):
+        """
+        Starts a new episode of the level in every game and returns the first
+        observations, as a numpy array with one row per game.
+
+        Parameter level: The JSON file of the level
+        Precondition: level is a string naming a file in the JSON folder
+        """
+        self._load(compileLevel(os.path.join(self._jsonpath,level),self._imagespath))
+        n = self._count
+        self._xs = numpy.tile(self._xs0,(n,1))
+        self._eaten = numpy.zeros((n,len(self._xs0)),dtype=bool)
+        self._animated = numpy.zeros((n,len(self._kinds)),dtype=int)
+        self._slots = numpy.tile(self._slots0,(n,1,1))
+        self._fx = numpy.zeros(n)
+        self._fy = numpy.zeros(n,dtype=int)
+        self._dir = numpy.zeros(n,dtype=int)
+        self._cool = numpy.zeros(n)
+        self._dead = numpy.zeros(n,dtype=bool)
+        self._dying = numpy.zeros(n,dtype=int)
+        self._lives = numpy.full(n,3)
+        self._safe = numpy.zeros(n,dtype=int)
+        self._ticks = numpy.zeros(n,dtype=int)
+        self._best = numpy.zeros(n,dtype=int)
+        self._respawn(numpy.arange(n))
+        return self._observe()
+
+    def step(self,actions):
+        """
+        Returns the tuple (observations, rewards, dones, info) after one step
+        of every game.
+
+        info is a dictionary of numpy arrays, one value per game: whether the
+        level was 'won', the 'lives', the 'safe' frogs, the 'tick' and whether
+        the episode hit the 'timeout'. They describe each game before it is
+        reset.
+
+        Parameter actions: The action of each game
+        Precondition: actions is a sequence of ints >= 0 and < len(ENV_ACTIONS),
+        one per game
+        """
+        actions = numpy.asarray(actions)
+        lives = self._lives.copy()
+        safe = self._safe.copy()
+        over = numpy.zeros(self._count,dtype=bool)
+
+        # A dead frog plays its death animation, then the next one starts
+        dying = numpy.nonzero(self._dead)[0]
+        self._dying[dying] += 1
+        gone = dying[self._dying[dying] >= self._deathSteps]
+        self._lives[gone] -= 1
+        over[gone[self._lives[gone] == 0]] = True
+        again = [gone[self._lives[gone] > 0]]
+
+        # A frog that reaches an exit is followed by the next in the same step
+        alive = numpy.nonzero(~self._dead)[0]
+        alive = alive[~numpy.isin(alive,dying)]
+        landed = self._update(alive,actions)
+        won = landed[self._safe[landed] == self._numExits]
+        over[won] = True
+        again.append(landed[self._safe[landed] < self._numExits])
+        again = numpy.concatenate(again)
+        self._respawn(again)
+        self._update(again,actions)
+
+        rewards = REWARD_EXIT*(self._safe-safe) + REWARD_DEATH*numpy.maximum(lives-self._lives,0)
+        standing = ~self._dead & ~over
+        gain = numpy.where(standing,numpy.maximum(self._fy-self._best,0),0)
+        rewards = rewards + REWARD_ROW*gain
+        self._best += gain
+        self._ticks += 1
+        timeout = ~over & (self._ticks >= self._maxSteps)
+        dones = over | timeout
+        info = {'won': self._safe == self._numExits, 'lives': self._lives.copy(),
+            'safe': self._safe.copy(), 'tick': self._ticks.copy(), 'timeout': timeout}
+        finished = numpy.nonzero(dones)[0]
+        if len(finished) > 0:
+            self._restart(finished)
+        return (self._observe(),rewards,dones,info)
+
+    def _load(self,leveldict):
+        """
+        Builds the arrays that describe the level, from a Level of it.
+
+        Parameter leveldict: A compiled level dictionary
+        Precondition: leveldict is a dictionary with the width of every object
+        """
+        self._leveldict = leveldict
+        size = leveldict['size']
+        self._width = size[0]*GRID_SIZE
+        self._height = (size[1]+1)*GRID_SIZE
+        self._tiles = size[0]*GRID_SIZE
+        self._start = leveldict['start']
+        level = Level(self._width,self._height,leveldict,'')
+        lanes = level.getLanes()
+        buffer = leveldict['offscreen']*GRID_SIZE
+        self._kinds = numpy.zeros(len(lanes),dtype=int)
+        self._speeds = numpy.zeros(len(lanes))
+        self._slots0 = numpy.full((len(lanes),size[0]),SLOT_HEDGE)
+        self._numExits = 0
+        xs0 = []
+        lane = []
+        w = []
+        fly = []
+        turtle = []
+        moves = []
+        for row in range(len(lanes)):
+            objs = [None]*len(lanes[row].getXs())
+            for obj in lanes[row].getObjs():
+                objs[obj.index] = obj
+            speed = lanes[row].getSpeed()
+            moving = isinstance(lanes[row],Road) or isinstance(lanes[row],Water)
+            if isinstance(lanes[row],Road):
+                self._kinds[row] = LANE_ROAD
+            elif isinstance(lanes[row],Water):
+                self._kinds[row] = LANE_WATER
+            elif isinstance(lanes[row],Hedge):
+                self._kinds[row] = LANE_HEDGE
+                self._slots0[row] = lanes[row].getSlots()
+                self._numExits += lanes[row].getNumExits()
+            if moving:
+                self._speeds[row] = SIM_STEP*speed
+            for obj in objs:
+                xs0.append(obj.x)
+                lane.append(row)
+                w.append(obj.w)
+                fly.append(obj.tag == TAG_FLY)
+                turtle.append(obj.tag == TAG_TURTLE)
+                moves.append(SIM_STEP*speed if moving else 0.0)
+        self._xs0 = numpy.array(xs0,dtype=float)
+        self._lane = numpy.array(lane,dtype=int)
+        self._w = numpy.array(w,dtype=float)
+        self._fly = numpy.array(fly,dtype=bool)
+        self._turtle = numpy.array(turtle,dtype=bool)
+        self._moves = numpy.array(moves)
+        self._right = self._moves > 0
+        self._left = self._moves < 0
+        self._wrapRight = self._width + 3*buffer
+        self._wrapLeft = self._width + 2*buffer
+        self._buffer = buffer
+        self._moving = (self._kinds == LANE_ROAD) | (self._kinds == LANE_WATER)
+        probe = Frog(leveldict)
+        self._edges = numpy.zeros((4,2))
+        for pos in range(4):
+            probe.direction = DIRECTIONS[pos]
+            probe.x = 0
+            self._edges[pos] = (probe.left,probe.right)
+        self._deathSteps = FROG_DEATH.getSteps(SIM_STEP)
+
+    def _restart(self,games):
+        """
+        Starts a new episode in the given games.
+
+        Parameter games: The games to restart
+        Precondition: games is a numpy array of game indices
+        """
+        self._xs[games] = self._xs0
+        self._eaten[games] = False
+        self._animated[games] = 0
+        self._slots[games] = self._slots0
+        self._cool[games] = 0
+        self._dead[games] = False
+        self._lives[games] = 3
+        self._safe[games] = 0
+        self._ticks[games] = 0
+        self._respawn(games)
+
+    def _respawn(self,games):
+        """
+        Puts a new frog at the start of the given games, as Level.update
+        does on a reset. The cooldown is kept.
+
+        Parameter games: The games to put a new frog in
+        Precondition: games is a numpy array of game indices
+        """
+        self._fx[games] = self._start[0]*GRID_SIZE
+        self._fy[games] = self._start[1]
+        self._dir[games] = 0
+        self._dead[games] = False
+        self._dying[games] = 0
+        self._best[games] = self._start[1]
+
+    def _frames(self,animated):
+        """
+        Returns the turtle frames after each lane was updated the given
+        number of times, as in Lane.getTurtleFrames.
+
+        Parameter animated: The number of updates of each lane
+        Precondition: animated is a numpy array of ints >= 0
+        """
+        return TURTLE_DIVE.getFrames(animated,SIM_STEP)
+
+    def _update(self,games,actions):
+        """
+        Steps the given games with a live frog, as in Level.update, and
+        returns the games whose frog reached an exit.
+
+        Parameter games: The games to step
+        Precondition: games is a numpy array of game indices whose frog is
+        alive
+
+        Parameter actions: The action of each game
+        Precondition: actions is a numpy array of ints, one per game
+        """
+        if len(games) == 0:
+            return games
+        cool = self._cool[games]
+        waiting = cool > 0
+        self._cool[games[waiting]] = cool[waiting] - SIM_STEP
+        pressing = games[~waiting & (actions[games] > 0)]
+        for action in range(1,len(ENV_ACTIONS)):
+            self._press(pressing[actions[pressing] == action],action-1)
+
+        # Move every object, but only keep the moves of the lanes the game reaches
+        old = self._xs[games]
+        new = old + self._moves
+        numpy.subtract(new,self._wrapRight,out=new,where=self._right & (new > self._width))
+        numpy.add(new,self._wrapLeft,out=new,where=self._left & (new < -self._buffer))
+        animated = self._animated[games] + self._moving
+
+        row = self._fy[games]
+        x = self._fx[games]
+        left = x + self._edges[self._dir[games],0]
+        right = x + self._edges[self._dir[games],1]
+        kind = self._kinds[row]
+        here = (self._lane == row[:,None]) & ~self._eaten[games]
+        dead = numpy.zeros(len(games),dtype=bool)
+        safe = numpy.zeros(len(games),dtype=bool)
+        touching = here & (new < right[:,None]) & (new+self._w > left[:,None])
+
+        road = kind == LANE_ROAD
+        dead[road] = touching[road].any(axis=1)
+
+        water = numpy.nonzero(kind == LANE_WATER)[0]
+        if len(water) > 0:
+            # The first fly touched is eaten and gives back a life
+            flies = touching[water] & self._fly
+            fed = flies.any(axis=1)
+            first = flies.argmax(axis=1)
+            fedGames = games[water[fed]]
+            self._eaten[fedGames,first[fed]] = True
+            self._lives[fedGames] = numpy.where(self._lives[fedGames] < 3,
+                self._lives[fedGames]+1,self._lives[fedGames])
+            here[water[fed],first[fed]] = False
+            frames = self._frames(animated[water])
+            under = self._turtle & (frames[:,self._lane] >= TURTLE_FRAMES)
+            center = (x[water] + GRID_SIZE/2)[:,None]
+            carried = (here[water] & ~under & (center < new[water]+self._w) &
+                (center > new[water])).any(axis=1)
+            moved = x[water] + self._speeds[row[water]]
+            middle = moved + GRID_SIZE/2
+            offscreen = (middle < 0) | (middle > self._width)
+            inside = (0 < right[water]) & (self._tiles > left[water])
+            dead[water] = numpy.where(carried,offscreen,inside)
+            keep = carried & ~offscreen
+            self._fx[games[water[keep]]] = moved[keep]
+
+        hedge = numpy.nonzero(kind == LANE_HEDGE)[0]
+        if len(hedge) > 0:
+            center = x[hedge] + GRID_SIZE/2
+            col = numpy.floor(center/GRID_SIZE).astype(int)
+            inside = (col*GRID_SIZE != center) & (col >= 0) & (col < self._slots.shape[2])
+            col = numpy.clip(col,0,self._slots.shape[2]-1)
+            hedgeGames = games[hedge]
+            slot = self._slots[hedgeGames,row[hedge],col]
+            found = inside & ((slot == SLOT_EXIT) | (slot == SLOT_OCCUPIED))
+            safe[hedge] = found
+            self._slots[hedgeGames[found],row[hedge][found],col[found]] = SLOT_OCCUPIED
+            self._safe[hedgeGames[found]] += 1
+
+        # Lanes after the frog's row are not updated if it died or got to an exit
+        stopped = dead | safe
+        reached = ~stopped[:,None] | (self._lane <= row[:,None])
+        self._xs[games] = numpy.where(reached,new,old)
+        reached = ~stopped[:,None] | (numpy.arange(len(self._kinds)) <= row[:,None])
+        self._animated[games] = numpy.where(reached,animated,self._animated[games])
+        self._dead[games[dead]] = True
+        self._dying[games[dead]] = 0
+        self._fx[games[dead]] = x[dead]
+        return games[safe]
+
+    def _press(self,games,key):
+        """
+        Turns the frog of the given games, moves it if it can, and starts
+        its cooldown, as in Level._keysDown.
+
+        Parameter games: The games whose frog is pressing the key
+        Precondition: games is a numpy array of game indices
+
+        Parameter key: The key, as an index in DIRECTIONS
+        Precondition: key is an int >= 0 and < 4
+        """
+        if len(games) == 0:
+            return
+        self._dir[games] = key
+        self._cool[games] = FROG_SPEED
+        x = self._fx[games]
+        row = self._fy[games]
+        left = x + self._edges[key][0]
+        right = x + self._edges[key][1]
+        tiles = (0 < right) & (self._tiles > left)
+        count = self._slots.shape[2]
+        center = x + GRID_SIZE/2
+        col = numpy.floor(center/GRID_SIZE).astype(int)
+        inside = (col*GRID_SIZE != center) & (col >= 0) & (col < count)
+        col = numpy.clip(col,0,count-1)
+        rows = len(self._kinds)
+        if key == 0:
+            above = numpy.minimum(row+1,rows-1)
+            slots = self._slots[games,above]
+            slot = numpy.where(inside,slots[numpy.arange(len(games)),col],-1)
+            hit = numpy.zeros(len(games),dtype=bool)
+            first = numpy.floor(left/GRID_SIZE).astype(int)
+            for near in [first,first+1]:
+                valid = (near >= 0) & (near < count)
+                slot2 = numpy.where(valid,slots[numpy.arange(len(games)),numpy.clip(near,0,count-1)],-1)
+                hit |= (slot2 == SLOT_OCCUPIED) & (left < (near+1)*GRID_SIZE) & \
+                    (right > near*GRID_SIZE)
+            through = (slot == SLOT_EXIT) | (slot == SLOT_OPEN)
+            hedge = (row+1 < rows) & (self._kinds[above] == LANE_HEDGE) & (hit | (~through & tiles))
+            moves = ((row+3)*GRID_SIZE <= self._height) & ~hedge
+            self._fy[games[moves]] += 1
+        elif key == 1:
+            below = numpy.maximum(row-1,0)
+            hedge = (row-1 >= 0) & (self._kinds[below] == LANE_HEDGE) & tiles
+            moves = ((row-1)*GRID_SIZE >= 0) & ~hedge
+            self._fy[games[moves]] -= 1
+        else:
+            slot = numpy.where(inside,self._slots[games,row,col],-1)
+            hedge = (self._kinds[row] == LANE_HEDGE) & (slot == SLOT_OPEN)
+            if key == 2:
+                moves = (x + 2*GRID_SIZE <= self._width) & ~hedge
+                self._fx[games[moves]] += GRID_SIZE
+            else:
+                moves = (x - GRID_SIZE >= 0) & ~hedge
+                self._fx[games[moves]] -= GRID_SIZE
+
+    def _observe(self):
+        """
+        Returns the observations of every game as a numpy array with one row
+        per game.
+        """
+        obs = numpy.empty((self._count,OBS_FROG+len(self._xs0)))
+        obs[:,0] = self._fx
+        obs[:,1] = self._fy*GRID_SIZE
+        obs[:,2] = self._cool
+        obs[:,3] = self._lives
+        obs[:,4] = self._safe
+        obs[:,5] = self._dead
+        obs[:,OBS_FROG:] = self._xs
+        return obs
+
+
+def underWater(level):
+    """
+    Returns a numpy array of bools, True for every object of a Level that is
+    a turtle under the water, in the order of the objects in VecFroggoEnv.
+
+    Parameter level: The level
+    Precondition: level is a Level object
+    """
+    submerged = []
+    for lane in level.getLanes():
+        under = [False]*len(lane.getXs())
+        for turtle in lane.getTurtles():
+            under[turtle.index] = turtle.frame >= TURTLE_FRAMES
+        submerged.extend(under)
+    return numpy.array(submerged,dtype=bool)
+
+
+def checkLevel(level,jsonpath,imagespath,count,steps,seed):
+    """
+    Returns the number of games of a VecFroggoEnv that did not play the level
+    exactly as a FroggoEnv given the same random actions.
+
+    A game matches while the observations, the rewards and whether it is done
+    are the same, and the turtles under the water in getState are the ones
+    under the water in the real Level. A game is not compared after it ends.
+
+    Parameter level: The JSON file of the level
+    Precondition: level is a string naming a file in the JSON folder
+
+    Parameter jsonpath: The path to the JSON folder
+    Precondition: jsonpath is a valid path
+
+    Parameter imagespath: The path to the Images folder
+    Precondition: imagespath is a valid path
+
+    Parameter count: The number of games
+    Precondition: count is an int > 0
+
+    Parameter steps: The number of steps to play
+    Precondition: steps is an int > 0
+
+    Parameter seed: The seed of the random actions
+    Precondition: seed is an int
+    """
+    rand = random.Random(seed)
+    vec = VecFroggoEnv(count,jsonpath,imagespath,steps+1)
+    vec.reset(level)
+    envs = []
+    for game in range(count):
+        envs.append(FroggoEnv(jsonpath,imagespath,steps+1))
+        envs[game].reset(level)
+    playing = [True]*count
+    failed = 0
+    for step in range(steps):
+        actions = []
+        for game in range(count):
+            if rand.random() < 0.2:
+                actions.append(rand.randrange(len(ENV_ACTIONS)))
+            else:
+                actions.append(0)
+        obs, rewards, dones, info = vec.step(actions)
+        submerged = vec.getState()['submerged']
+        for game in range(count):
+            if not playing[game]:
+                continue
+            obs1, reward, done, info1 = envs[game].step(actions[game])
+            if done or dones[game]:
+                # The vectorized game has already started its next episode
+                same = (done == dones[game] and info1['won'] == info['won'][game] and
+                    info1['lives'] == info['lives'][game])
+                playing[game] = False
+            else:
+                same = (numpy.allclose(obs1,obs[game],atol=1e-9) and
+                    abs(reward-rewards[game]) <= 1e-9 and
+                    numpy.array_equal(submerged[game],underWater(envs[game].getLevel())))
+                playing[game] = same
+            if not same:
+                failed += 1
+    return failed
+
+
+def main(argv=None):
+    """
+    Checks that VecFroggoEnv plays the levels given on the command line (or
+    every level) as FroggoEnv does, and prints the number of games that did
+    not match in each as JSON.
+
+    Parameter argv: The command line arguments, or None for sys.argv
+    Precondition: argv is a list of strings or None
+    """
+    parser = argparse.ArgumentParser(description='Check the vectorized Froggo environment.')
+    parser.add_argument('levels', nargs='*', default=LEVELS, help='JSON files of the levels')
+    parser.add_argument('--games', type=int, default=8, help='games to play of each level')
+    parser.add_argument('--steps', type=int, default=3000, help='steps to play')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the random actions')
+    args = parser.parse_args(argv)
+    root = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for level in args.levels:
+        results[level] = checkLevel(level,os.path.join(root,'JSON'),os.path.join(root,'Images'),
+            args.games,args.steps,args.seed)
+    print(json.dumps(results,indent=2))
+
+
+if __name__ == '__main__':
+    main()
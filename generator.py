@@ -0,0 +1,131 @@
+"""
+Level generator module for Froggo
+
+This module makes synthetic levels in the same JSON format as the levels in
+the JSON folder, so that the game can be tested with far more lanes and
+objects than the shipped levels have. The same seed always gives the same
+level. It can also be run as a script to write a level:
+
+    python generator.py --lanes 40 --cols 20 --density 0.5 --seed 3 > big.json
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from compiler import validateLevel
+from constants import *
+import argparse
+import random
+import math
+import json
+
+
+# The images that can be used for the objects in a road lane
+ROAD_IMAGES = ['car1', 'car2', 'car3', 'truck', 'semitruck']
+
+# The images that can be used for the logs in a water lane
+LOG_IMAGES = ['log1', 'log2']
+
+
+def generateLevel(lanes,cols,density=0.3,speeds=(60,160),turtles=0.3,exits=3,seed=0):
+    """
+    Returns a new level dictionary in the format of the JSON levels.
+
+    The first lane is grass and the last is a hedge. The lanes below the
+    middle are roads, the middle lane is grass, and the lanes above it are
+    water. Each road and water lane moves left or right at a random speed.
+
+    Parameter lanes: The number of lanes
+    Precondition: lanes is an int >= 3
+
+    Parameter cols: The number of columns (the width of the level)
+    Precondition: cols is an int >= 1
+
+    Parameter density: The number of objects in a road or water lane per column
+    Precondition: density is a number (int or float) >= 0
+
+    Parameter speeds: The smallest and largest speed of a lane
+    Precondition: speeds is a tuple of two numbers 0 < speeds[0] <= speeds[1]
+
+    Parameter turtles: The fraction of the objects in water lanes that are turtles
+    Precondition: turtles is a number (int or float) >= 0 and <= 1
+
+    Parameter exits: The number of exits in the hedge
+    Precondition: exits is an int >= 1 and <= cols
+
+    Parameter seed: The seed for the random choices
+    Precondition: seed is an int
+    """
+    rnd = random.Random(seed)
+    middle = lanes//2
+    perLane = int(round(density*cols))
+    rows = [{'type': 'grass'}]
+    for row in range(1,lanes-1):
+        if row == middle:
+            rows.append({'type': 'grass'})
+            continue
+        speed = rnd.uniform(speeds[0],speeds[1])*rnd.choice([-1,1])
+        speed = round(speed)
+        objects = []
+        for i in range(perLane):
+            if row < middle:
+                image = rnd.choice(ROAD_IMAGES)
+            elif rnd.random() < turtles:
+                image = 'turtle_east' if speed > 0 else 'turtle_west'
+            else:
+                image = rnd.choice(LOG_IMAGES)
+            objects.append({'type': image, 'position': rnd.randrange(cols)})
+        kind = 'road' if row < middle else 'water'
+        rows.append({'type': kind, 'speed': speed, 'objects': objects})
+    hedge = []
+    for i in range(exits):
+        hedge.append({'type': 'exit', 'position': int((i+0.5)*cols/exits)})
+    rows.append({'type': 'hedge', 'objects': hedge})
+    leveldict = {'version': 1.0, 'size': [cols,lanes], 'start': [cols//2,0],
+        'offscreen': 2, 'lanes': rows}
+    validateLevel(leveldict,'generated level')
+    return leveldict
+
+
+def generateEntities(entities,seed=0):
+    """
+    Returns a new level with about the given number of objects.
+
+    The level is roughly square: it has about sqrt(entities) lanes, and one
+    object per column in each road and water lane.
+
+    Parameter entities: The number of objects wanted
+    Precondition: entities is an int > 0
+
+    Parameter seed: The seed for the random choices
+    Precondition: seed is an int
+    """
+    lanes = max(5,int(math.sqrt(entities)))
+    moving = lanes-3
+    cols = max(3,int(math.ceil(entities/moving)))
+    return generateLevel(lanes,cols,1.0,exits=min(3,cols),seed=seed)
+
+
+def main(argv=None):
+    """
+    Prints a generated level as JSON.
+
+    Parameter argv: The command line arguments, or None for sys.argv
+    Precondition: argv is a list of strings or None
+    """
+    parser = argparse.ArgumentParser(description='Generate a Froggo level.')
+    parser.add_argument('--lanes', type=int, default=9, help='number of lanes')
+    parser.add_argument('--cols', type=int, default=11, help='number of columns')
+    parser.add_argument('--density', type=float, default=0.3, help='objects per column in a moving lane')
+    parser.add_argument('--min-speed', type=float, default=60, help='slowest lane speed')
+    parser.add_argument('--max-speed', type=float, default=160, help='fastest lane speed')
+    parser.add_argument('--turtles', type=float, default=0.3, help='fraction of water objects that are turtles')
+    parser.add_argument('--exits', type=int, default=3, help='number of exits in the hedge')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args(argv)
+    leveldict = generateLevel(args.lanes,args.cols,args.density,(args.min_speed,args.max_speed),
+        args.turtles,args.exits,args.seed)
+    print(json.dumps(leveldict))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Performance HUD module for Froggo
+
+The HUD shows the frame rate, a graph of recent frame times, the time spent
+simulating and drawing, the size of the canvas, the garbage collections per
+second, the input latency (see LatencyMeter) and the sound effects played
+(see SoundBank). It records every frame but
+only changes its text and graph a few times a second, so it is cheap enough
+to leave on.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from kivy.uix.label import Label
+from kivy.graphics import *
+from constants import *
+import numpy
+import gc
+
+
+def countInstructions(group):
+    """
+    Returns the tuple (instructions, rectangles) in the group, counting the
+    instructions inside nested groups.
+
+    Parameter group: The instructions to count
+    Precondition: group is a kivy.graphics InstructionGroup (or Canvas)
+    """
+    count = 0
+    rects = 0
+    for child in group.children:
+        count += 1
+        if isinstance(child,Rectangle):
+            rects += 1
+        elif isinstance(child,InstructionGroup):
+            inner = countInstructions(child)
+            count += inner[0]
+            rects += inner[1]
+    return (count,rects)
+
+
+def countWidget(widget):
+    """
+    Returns the tuple (instructions, rectangles) drawn by the widget and all
+    of its children.
+
+    Parameter widget: The widget to count
+    Precondition: widget is a kivy Widget
+    """
+    count = 0
+    rects = 0
+    for canvas in [widget.canvas.before,widget.canvas,widget.canvas.after]:
+        inner = countInstructions(canvas)
+        count += inner[0]
+        rects += inner[1]
+    for child in widget.children:
+        inner = countWidget(child)
+        count += inner[0]
+        rects += inner[1]
+    return (count,rects)
+
+
+class PerfHud(object):
+    """
+    A class representing the performance overlay.
+    """
+    # Attribute _visible: Whether the HUD is shown
+    # Invariant: _visible is a bool
+    #
+    # Attribute _label: The text of the HUD
+    # Invariant: _label is a Label
+    #
+    # Attribute _back: The background of the HUD
+    # Invariant: _back is a kivy.graphics Rectangle
+    #
+    # Attribute _line: The line of the frame time graph
+    # Invariant: _line is a kivy.graphics Line
+    #
+    # Attribute _shown: Whether the text has been set since the HUD was shown
+    # Invariant: _shown is a bool
+    #
+    # Attribute _frames: The most recent frame times, in seconds
+    # Invariant: _frames is a numpy array of length HUD_SAMPLES
+    #
+    # Attribute _pos: The position in _frames of the next frame time
+    # Invariant: _pos is an int >= 0 and < HUD_SAMPLES
+    #
+    # Attribute _count: The number of frames since the text last changed
+    # Invariant: _count is an int >= 0
+    #
+    # Attribute _elapsed: The time since the text last changed
+    # Invariant: _elapsed is a float >= 0
+    #
+    # Attribute _update: The time spent simulating since the text last changed
+    # Invariant: _update is a float >= 0
+    #
+    # Attribute _draw: The time spent drawing since the text last changed
+    # Invariant: _draw is a float >= 0
+    #
+    # Attribute _collections: The garbage collections when the text last changed
+    # Invariant: _collections is an int >= 0
+    #
+    # Attribute _latency: The input latency shown in the HUD
+    # Invariant: _latency is a LatencyMeter object or None
+    #
+    # Attribute _sounds: The sound effects shown in the HUD
+    # Invariant: _sounds is a SoundBank object or None
+    #
+
+    def getLabel(self):
+        """
+        Returns the label of the HUD if it is shown and None otherwise
+        """
+        if self._visible:
+            return self._label
+        return None
+
+    def __init__(self,latency=None,sounds=None):
+        """
+        Initializes the HUD, hidden.
+
+        Parameter latency: The input latency to show, or None
+        Precondition: latency is a LatencyMeter object or None
+
+        Parameter sounds: The sound effects to show, or None
+        Precondition: sounds is a SoundBank object or None
+        """
+        self._visible = False
+        self._label = Label(text='', color=(1,1,0,1), halign='left', valign='top',\
+            font_size=HUD_FONT, size_hint=(None,None), size=(HUD_WIDTH,HUD_HEIGHT),\
+            pos_hint={'x': 0, 'top': 1})
+        self._label.bind(size=self._label.setter('text_size'))
+        # The graph is drawn by the label, behind its text
+        self._back = Rectangle(size=(HUD_WIDTH,HUD_HEIGHT))
+        self._line = Line(points=[], width=1)
+        self._label.canvas.before.add(Color(0,0,0,0.6))
+        self._label.canvas.before.add(self._back)
+        self._label.canvas.before.add(Color(1,0.5,0,1))
+        self._label.canvas.before.add(self._line)
+        self._shown = False
+        self._frames = numpy.zeros(HUD_SAMPLES)
+        self._pos = 0
+        self._count = 0
+        self._elapsed = 0.0
+        self._update = 0.0
+        self._draw = 0.0
+        self._collections = self._collected()
+        self._latency = latency
+        self._sounds = sounds
+
+    def toggle(self):
+        """
+        Shows the HUD if it is hidden and hides it if it is shown.
+        """
+        self._visible = not self._visible
+        self._shown = False
+        self._count = 0
+        self._elapsed = 0.0
+        self._update = 0.0
+        self._draw = 0.0
+        self._collections = self._collected()
+
+    def record(self,frame,update,draw):
+        """
+        Records the times of a single frame.
+
+        Parameter frame: The time in seconds since the last frame
+        Precondition: frame is a number (int or float) >= 0
+
+        Parameter update: The time in seconds spent simulating this frame
+        Precondition: update is a number (int or float) >= 0
+
+        Parameter draw: The time in seconds spent drawing this frame
+        Precondition: draw is a number (int or float) >= 0
+        """
+        self._frames[self._pos] = frame
+        self._pos = (self._pos + 1) % HUD_SAMPLES
+        self._count += 1
+        self._elapsed += frame
+        self._update += update
+        self._draw += draw
+
+    def draw(self,widget):
+        """
+        Changes the text and graph of the HUD if it is shown and HUD_INTERVAL
+        seconds have passed since they last changed.
+
+        The label itself is shown by the widget, as one of its children.
+
+        Parameter widget: The widget to count the instructions of
+        Precondition: widget is a kivy Widget
+        """
+        # No time has passed if the only frames had a dt of 0
+        if not self._visible or self._count == 0 or self._elapsed <= 0:
+            return
+        if self._shown and self._elapsed < HUD_INTERVAL:
+            return
+        self._shown = True
+        instructions, rects = countWidget(widget)
+        collections = self._collected()
+        text = 'FPS %.0f\n' % (self._count/self._elapsed)
+        text += 'update %.2f ms\n' % (self._update/self._count*1e3)
+        text += 'draw %.2f ms\n' % (self._draw/self._count*1e3)
+        text += 'instructions %d\n' % instructions
+        text += 'rectangles %d\n' % rects
+        text += 'gc %.1f/s' % ((collections-self._collections)/self._elapsed)
+        if not self._latency is None and self._latency.getCount() > 0:
+            p50, p99 = self._latency.percentiles()
+            text += '\ninput p50 %.1f p99 %.1f ms' % (p50*1e3,p99*1e3)
+        if not self._sounds is None:
+            text += self._soundText()
+        self._label.text = text
+        self._drawGraph()
+        self._count = 0
+        self._elapsed = 0.0
+        self._update = 0.0
+        self._draw = 0.0
+        self._collections = collections
+
+    def _drawGraph(self):
+        """
+        Moves the graph under the label and redraws its line.
+
+        The graph is as high as the label, which is HUD_GRAPH_MAX seconds of
+        frame time.
+        """
+        left = self._label.x
+        bottom = self._label.y
+        self._back.pos = (left,bottom)
+        frames = numpy.roll(self._frames,-self._pos)
+        xs = left + numpy.linspace(0,HUD_WIDTH,HUD_SAMPLES)
+        ys = bottom + numpy.minimum(frames/HUD_GRAPH_MAX,1.0)*HUD_HEIGHT
+        points = numpy.empty(2*HUD_SAMPLES)
+        points[0::2] = xs
+        points[1::2] = ys
+        self._line.points = points.tolist()
+
+    def _soundText(self):
+        """
+        Returns the lines of the HUD about the sound effects: the plays, the
+        plays that stopped a playing voice, the worst time spent starting a
+        sound and the time spent loading them all.
+        """
+        plays = 0
+        stolen = 0
+        worst = 0.0
+        load = 0.0
+        stats = self._sounds.getStats()
+        for name in stats:
+            plays += stats[name]['plays']
+            stolen += stats[name]['stolen']
+            worst = max(worst,stats[name]['worst'])
+            load += stats[name]['load']
+        text = '\nsound %d plays %d stolen' % (plays,stolen)
+        text += '\nsound worst %.2f load %.1f ms' % (worst*1e3,load*1e3)
+        return text
+
+    def _collected(self):
+        """
+        Returns the number of garbage collections so far, in every generation.
+        """
+        total = 0
+        for stat in gc.get_stats():
+            total += stat['collections']
+        return total
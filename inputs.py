@@ -0,0 +1,189 @@
+"""
+Input module for Froggo
+
+The keyboard sends key events whenever they happen, but the level is
+simulated in fixed steps. An InputQueue keeps the events, with the time each
+one came in, until the next step, and then turns them into the keys held
+for that step. A key that is pressed and released between two steps still
+counts as held for one step, so a quick tap is never lost.
+
+A LatencyMeter measures how long it takes from pressing a key to the first
+frame that draws the frog where the key moved it.
+
+This module does not import kivy.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from constants import *
+import collections
+import numpy
+
+
+class InputQueue(object):
+    """
+    A class that turns timestamped key events into the keys held in each
+    simulation step.
+    """
+    # Attribute _events: The key events since the last step, oldest first,
+    #                    as (time, key, down) tuples
+    # Invariant: _events is a collections.deque of tuples
+    #
+    # Attribute _tapped: The keys that went down and up again before the
+    #                    last step, to be released in the next one
+    # Invariant: _tapped is a list of strings
+    #
+
+    def __init__(self):
+        """
+        Initializes an empty queue.
+        """
+        self._events = collections.deque()
+        self._tapped = []
+
+    def push(self,key,down,stamp):
+        """
+        Adds a key event to the queue.
+
+        Parameter key: The name of the key
+        Precondition: key is a string
+
+        Parameter down: True if the key went down and False if it went up
+        Precondition: down is a bool
+
+        Parameter stamp: The time of the event, from time.perf_counter()
+        Precondition: stamp is a float
+        """
+        self._events.append((stamp,key,down))
+
+    def step(self,keydict):
+        """
+        Applies the events since the last step to keydict, the keys held in
+        the next step, and returns the keys that went down as a list of
+        (key, time) pairs.
+
+        A key that went down since the last step is held in this step even
+        if it went up again. It is then released in the step after. A key
+        down event for a key that is already held (the keyboard repeating
+        it) is not a press, so it is not returned.
+
+        Parameter keydict: The keys held in the last step, changed in place
+        Precondition: keydict is a dictionary mapping key names to bools
+        """
+        for key in self._tapped:
+            keydict[key] = False
+        self._tapped = []
+        presses = []
+        while len(self._events) > 0:
+            stamp, key, down = self._events.popleft()
+            if down:
+                if not (key in keydict and keydict[key]):
+                    presses.append((key,stamp))
+                keydict[key] = True
+                if key in self._tapped:
+                    self._tapped.remove(key)
+            elif self._pressedIn(key,presses):
+                self._tapped.append(key)
+            else:
+                keydict[key] = False
+        return presses
+
+    def _pressedIn(self,key,presses):
+        """
+        Returns True if the key is one of the presses and False otherwise.
+
+        Parameter key: The name of the key
+        Precondition: key is a string
+
+        Parameter presses: The keys that went down in this step
+        Precondition: presses is a list of (key, time) pairs
+        """
+        for press in presses:
+            if press[0] == key:
+                return True
+        return False
+
+
+class LatencyMeter(object):
+    """
+    A class that measures the time from pressing a move key to the first
+    frame that draws the frog after it moved.
+
+    The times end when the frame has been drawn to the canvas. The window
+    shows it on the next buffer swap, which is not measured.
+    """
+    # Attribute _pending: The time of the latest move key press that has not
+    #                     moved the frog yet
+    # Invariant: _pending is a float or None
+    #
+    # Attribute _moved: The times of the presses that moved the frog since
+    #                   the last frame was drawn
+    # Invariant: _moved is a list of floats
+    #
+    # Attribute _samples: The most recent latencies, in seconds
+    # Invariant: _samples is a numpy array of length LATENCY_SAMPLES
+    #
+    # Attribute _count: The number of latencies measured so far
+    # Invariant: _count is an int >= 0
+    #
+
+    def getCount(self):
+        """
+        Returns the number of latencies measured so far
+        """
+        return self._count
+
+    def __init__(self):
+        """
+        Initializes a meter with no latencies.
+        """
+        self._pending = None
+        self._moved = []
+        self._samples = numpy.zeros(LATENCY_SAMPLES)
+        self._count = 0
+
+    def press(self,stamp):
+        """
+        Records that a move key went down.
+
+        Only the latest press is kept: one that did not move the frog
+        before another key was pressed (because it was blocked, or lost in
+        the cooldown) is not measured.
+
+        Parameter stamp: The time of the key event, from time.perf_counter()
+        Precondition: stamp is a float
+        """
+        self._pending = stamp
+
+    def moved(self):
+        """
+        Records that the frog moved in the last simulation step.
+
+        A move without a press (a key that is held down) is not measured.
+        """
+        if not self._pending is None:
+            self._moved.append(self._pending)
+            self._pending = None
+
+    def drawn(self,stamp):
+        """
+        Records that a frame was drawn, ending the latency of every press
+        that moved the frog since the last frame.
+
+        Parameter stamp: The time the frame was drawn, from time.perf_counter()
+        Precondition: stamp is a float
+        """
+        for pressed in self._moved:
+            self._samples[self._count % LATENCY_SAMPLES] = stamp - pressed
+            self._count += 1
+        self._moved = []
+
+    def percentiles(self):
+        """
+        Returns the median and the 99th percentile of the recent latencies,
+        in seconds, as a tuple, or None if there are none.
+        """
+        if self._count == 0:
+            return None
+        samples = self._samples[:min(self._count,LATENCY_SAMPLES)]
+        return (numpy.percentile(samples,50),numpy.percentile(samples,99))
@@ -1,16 +1,37 @@
 """
 Lanes module for Froggo
 
+The lanes only hold the simulation state for each lane and do not import
+kivy. The view module mirrors them on the canvas.
+
 Author: Lucy Beck
 Date: January 2, 2021
 """
-from kivy.graphics import *
+from animation import *
 from models import *
 from constants import *
 from PIL import Image
+import numpy
 import os
 
 
+# A dictionary mapping image paths to their sizes, so each image is opened once
+_sizes = {}
+
+
+def imageSize(path):
+    """
+    Returns the size (width, height) in pixels of the given image.
+
+    Parameter path: The path to the image
+    Precondition: path is a valid path to an image file
+    """
+    if not path in _sizes:
+        with Image.open(path) as im:
+            _sizes[path] = im.size
+    return _sizes[path]
+
+
 class Lane(object):
     """
     Parent class for a lane.
@@ -18,11 +39,34 @@ class Lane(object):
     # Attribute _width: the width of the window to animate in
     # Invariant: _width is a float > 0
     #
+    # Attribute _kind: the kind of lane (the name of its tile image without .png)
+    # Invariant: _kind is one of 'grass', 'road', 'water' or 'hedge'
+    #
     # Attribute _tiles: a list of tiles for each lane
-    # Invariant: _tile is a list of kivy.graphics Rectangles
+    # Invariant: _tile is a list of Obstacle objects
+    #
+    # Attribute _y: the y-coordinate of the lane
+    # Invariant: _y is a number (int or float) >= 0
+    #
+    # Attribute _tilesWidth: the width of all of the tiles side by side
+    # Invariant: _tilesWidth is a number (int or float) > 0
     #
     # Attribute _objs: a list of all of the objects in the lanes
-    # Invariant: _objs is a list of kivy.graphics Rectangles
+    # Invariant: _objs is a list of Obstacle or Turtle objects
+    #
+    # Attribute _xs: the x-coordinates of every object created for the lane
+    #                (objects removed from _objs keep their slot)
+    # Invariant: _xs is a 1-dimensional numpy array of floats
+    #
+    # Attribute _turtles: the turtles in the lane
+    # Invariant: _turtles is a list of Turtle objects
+    #
+    # Attribute _flies: the flies in the lane that have not been eaten
+    # Invariant: _flies is a list of Obstacle objects with tag TAG_FLY
+    #
+    # Attribute _present: whether every object created for the lane is still
+    #                     in it (only an eaten fly is not)
+    # Invariant: _present is a numpy array of bools, the same length as _xs
     #
     # Attribute _speed: the speed of the objects in the lanes
     # Invariant: _speed is a number (int or float)
@@ -31,9 +75,80 @@ class Lane(object):
     #                    offscreen before it is time to wrap it back around
     # Invariant: _buffer is an int
     #
-    # Attribute _animator: A coroutine for performing an animation
-    # Invariant: _animator is a generator-based coroutine (or None)
+    # Attribute _clock: The clock that animates every turtle in the lane
+    # Invariant: _clock is a Clock object
+    #
+    # Attribute _phases: The steps of _clock when each turtle started diving
+    # Invariant: _phases is a numpy array of ints, the same length as _turtles
     #
+    # Attribute _ages: The steps since each turtle started diving (worked out
+    #                  by getTurtleFrames)
+    # Invariant: _ages is a numpy array of ints, the same length as _turtles
+    #
+    # Attribute _frames: The frame of each turtle (worked out by getTurtleFrames)
+    # Invariant: _frames is a numpy array of ints, the same length as _turtles
+    #
+
+    def getKind(self):
+        """
+        Returns the kind of lane (the name of its tile image without .png)
+        """
+        return self._kind
+
+    def getWidth(self):
+        """
+        Returns the width of the window to animate in
+        """
+        return self._width
+
+    def getTiles(self):
+        """
+        Returns the list of tiles
+        """
+        return self._tiles
+
+    def getObjs(self):
+        """
+        Returns the list of objects in the lane
+        """
+        return self._objs
+
+    def getXs(self):
+        """
+        Returns the array of x-coordinates for the objects in the lane
+        """
+        return self._xs
+
+    def getSpeed(self):
+        """
+        Returns the speed of the objects in the lane or None
+        """
+        return self._speed
+
+    def getTurtles(self):
+        """
+        Returns the list of turtles in the lane
+        """
+        return self._turtles
+
+    def getFlies(self):
+        """
+        Returns the list of flies in the lane that have not been eaten
+        """
+        return self._flies
+
+    def getPresent(self):
+        """
+        Returns the array of whether each object is still in the lane, in
+        the order of getXs()
+        """
+        return self._present
+
+    def getClock(self):
+        """
+        Returns the clock that animates every turtle in the lane
+        """
+        return self._clock
 
     def __init__(self,width,leveldict,imagespath,pos):
         """
@@ -53,12 +168,14 @@ class Lane(object):
         """
         self._width = width
         dict = leveldict['lanes'][pos]
-        image = dict['type'] + '.png'
+        self._kind = dict['type']
+        self._y = pos*GRID_SIZE
+        self._tilesWidth = leveldict['size'][0]*GRID_SIZE
         self._tiles = []
         for col in range(leveldict['size'][0]):
             x = col*GRID_SIZE
             y = pos*GRID_SIZE
-            tile = Rectangle(source=image, size=(GRID_SIZE, GRID_SIZE), pos=(x,y))
+            tile = Obstacle(self._kind, TAG_TILE, x, y, GRID_SIZE, GRID_SIZE)
             self._tiles.append(tile)
         self._objs = []
         if 'objects' in dict:
@@ -70,117 +187,178 @@ class Lane(object):
                 elif dict2['type'] == 'turtle_west':
                     obstacle = Turtle('west',x,y)
                 else:
-                    image = dict2['type'] + '.png'
-                    im = Image.open(os.path.join(imagespath,image))
-                    multiplier = GRID_SIZE / im.size[1]
-                    width = im.size[0] * multiplier
-                    if 'speed' in dict and dict['speed']<0:
-                        rotated = im.rotate(180)
-                        rotated.save(imagespath+'/temp'+image)
-                        image = 'temp'+image
-                    obstacle = Rectangle(source=image, size=(width,GRID_SIZE), pos=(x,y))
+                    if 'width' in dict2:
+                        # A compiled level already has the width
+                        width = dict2['width']
+                    else:
+                        image = dict2['type'] + '.png'
+                        size = imageSize(os.path.join(imagespath,image))
+                        multiplier = GRID_SIZE / size[1]
+                        width = size[0] * multiplier
+                    tag = self._tagFor(dict2['type'])
+                    obstacle = Obstacle(dict2['type'], tag, x, y, width, GRID_SIZE)
                 self._objs.append(obstacle)
+        self._xs = numpy.zeros(len(self._objs))
+        self._present = numpy.ones(len(self._objs),dtype=bool)
+        self._clock = Clock()
+        self._turtles = []
+        self._flies = []
+        for index in range(len(self._objs)):
+            obj = self._objs[index]
+            obj.attach(self._xs,index)
+            if obj.tag == TAG_TURTLE:
+                obj.animate(self._clock)
+                self._turtles.append(obj)
+            elif obj.tag == TAG_FLY:
+                self._flies.append(obj)
+        self._phases = numpy.array([turtle.phase for turtle in self._turtles],dtype=int)
+        self._ages = numpy.zeros(len(self._turtles),dtype=int)
+        self._frames = numpy.ones(len(self._turtles),dtype=int)
         if 'speed' in dict:
             self._speed = dict['speed']
         else:
             self._speed = None
         self._buffer = leveldict['offscreen']
-        self._animator = None
+
+    def _tagFor(self,kind):
+        """
+        Returns the tag for an object of the given kind in this lane.
+
+        Parameter kind: the kind of object (the name of its image without .png)
+        Precondition: kind is a nonempty string that is not a turtle
+        """
+        if kind == 'fly':
+            return TAG_FLY
+        elif kind == 'exit':
+            return TAG_EXIT
+        elif kind == 'open':
+            return TAG_OPEN
+        elif self._kind == 'water':
+            return TAG_LOG
+        return TAG_CAR
 
     def update(self,dt):
         """
         Updates the game objects each frame.
 
+        Every object is moved and wrapped around with one array operation
+        each. An object moving right that passes the right edge reappears
+        at -_buffer grid squares (less the distance it passed the far side
+        of the buffer), and one moving left that passes -_buffer grid
+        squares reappears at the same distance past the right edge plus
+        the buffer. The turtles all dive on the clock of the lane, so it is
+        ticked once for all of them.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        for obj in self._objs:
-            if isinstance(obj,Turtle):
-                obj.x += dt*self._speed
-                if self._speed > 0 and obj.x > self._width:
-                    d = obj.x - (self._width + self._buffer*2*GRID_SIZE)
-                    obj.x = -self._buffer*GRID_SIZE + d
-                elif self._speed < 0 and obj.x < -self._buffer*GRID_SIZE:
-                    d = obj.x - (-self._buffer*GRID_SIZE)
-                    obj.x = self._width + self._buffer*GRID_SIZE + d
-                obj.update(dt)
-            else:
-                obj.pos = (obj.pos[0]+dt*self._speed, obj.pos[1])
-                if self._speed > 0 and obj.pos[0] > self._width:
-                    d = obj.pos[0] - (self._width+(self._buffer*2)*GRID_SIZE)
-                    obj.pos = (-self._buffer*GRID_SIZE + d, obj.pos[1])
-                elif self._speed < 0 and obj.pos[0] < -self._buffer*GRID_SIZE:
-                    d = obj.pos[0] - (-self._buffer*GRID_SIZE)
-                    obj.pos = (self._width+self._buffer*GRID_SIZE + d, obj.pos[1])
-
-
-    def draw(self,canvas):
-        """
-        Draws the game objects to the canvas.
-
-        Parameter canvas: The root object used for drawing by a Widget
-        Precondition: canvas is a root object used for drawing by a Widget
-        """
-        for tile in self._tiles:
-            canvas.add(tile)
-        for obj in self._objs:
-            if isinstance(obj,Turtle):
-                obj.draw(canvas)
-            else:
-                canvas.add(obj)
+        xs = self._xs
+        xs += dt*self._speed
+        if self._speed > 0:
+            numpy.subtract(xs, self._width + self._buffer*3*GRID_SIZE, out=xs,
+                where=xs > self._width)
+        elif self._speed < 0:
+            numpy.add(xs, self._width + self._buffer*2*GRID_SIZE, out=xs,
+                where=xs < -self._buffer*GRID_SIZE)
+        self._clock.tick(dt)
+
+    def advance(self,dt,steps):
+        """
+        Moves the lane forward by several steps at once.
 
-    def collides(self,obj1,obj2):
+        The level uses this for a lane that was not updated while it was out
+        of view. The objects are moved by the whole time and wrapped around
+        as many times as they need, so this costs about as much as a single
+        update however long the lane was left. The clock of the turtles
+        jumps forward by the steps, so they are in the frame they would
+        have been in.
+
+        Parameter dt: The time in seconds of each step
+        Precondition: dt is a number (int or float) > 0
+
+        Parameter steps: The number of steps
+        Precondition: steps is an int > 0
         """
-        Returns True if obj1 and obj2 collide and False otherwise
+        xs = self._xs
+        xs += dt*steps*self._speed
+        if self._speed > 0:
+            period = self._width + self._buffer*3*GRID_SIZE
+            wraps = numpy.ceil((xs - self._width)/period)
+            numpy.subtract(xs, wraps*period, out=xs, where=xs > self._width)
+        elif self._speed < 0:
+            period = self._width + self._buffer*2*GRID_SIZE
+            wraps = numpy.ceil((-self._buffer*GRID_SIZE - xs)/period)
+            numpy.add(xs, wraps*period, out=xs, where=xs < -self._buffer*GRID_SIZE)
+        self._clock.advance(dt,steps)
+
+    def getTurtleFrames(self):
+        """
+        Returns the frames of every turtle in the lane, in the order of
+        getTurtles(), as a numpy array.
 
-        Parameter obj1: The first object
-        Precondition: obj1 is a kivy graphics rectangle
+        The frames are worked out together from the clock of the lane. The
+        array is reused by the next call, so copy it to keep it.
+        """
+        if len(self._turtles) > 0 and not self._clock.getDt() is None:
+            numpy.subtract(self._clock.getSteps(),self._phases,out=self._ages)
+            TURTLE_DIVE.getFrames(self._ages,self._clock.getDt(),self._frames)
+        return self._frames
 
-        Parameter obj2: The second object
-        Precondition: obj2 is a tuple in the form of ((x,y),(width,height),(hitbox))
+    def collides(self,obj,frog,dy=0):
         """
-        obj1x = obj1.pos[0]
-        obj1y = obj1.pos[1]
-        obj1w = obj1.size[0]
-        obj1h = obj1.size[1]
+        Returns True if obj collides with the hitbox of the frog and False otherwise
 
-        obj2x = obj2[0][0]
-        obj2y = obj2[0][1]
-        obj2w = obj2[1][0]
-        obj2h = obj2[1][1]
-        left =  obj2[2][0]
-        top =  obj2[2][1]
-        right =  obj2[2][2]
-        bottom =  obj2[2][3]
+        The frog keeps the edges of its hitbox up to date as it moves, so
+        the test does not build any tuples.
 
-        return (obj1x < obj2x+obj2w-right) and (obj1x+obj1w > obj2x+left) and \
-            (obj1y < obj2y+obj2h-top) and (obj1y+obj1h > obj2y+bottom)
+        Parameter obj: The object
+        Precondition: obj is an Obstacle or Turtle
+
+        Parameter frog: The frog
+        Precondition: frog is a Frog object that is not dead
+
+        Parameter dy: How far above the frog (in pixels) to test
+        Precondition: dy is a number (int or float)
+        """
+        objx = obj.x
+        return (objx < frog.right) and (objx+obj.w > frog.left) and \
+            (obj.y < frog.top+dy) and (obj.y+obj.h > frog.bottom+dy)
 
-    def contains(self,obj1,obj2):
+    def contains(self,obj,frog,dy=0):
         """
-        Returns True if obj1 contains the center of obj2 and False otherwise
+        Returns True if obj contains the center of the frog and False otherwise
 
-        Parameter obj1: The first object
-        Precondition: obj1 is a kivy graphics rectangle or Turtle
+        Parameter obj: The object
+        Precondition: obj is an Obstacle or Turtle
 
-        Parameter obj2: The second object
-        Precondition: obj2 is a tuple in the form of ((x,y),(width,height),(hitbox))
+        Parameter frog: The frog
+        Precondition: frog is a Frog object
+
+        Parameter dy: How far above the frog (in pixels) to test
+        Precondition: dy is a number (int or float)
         """
-        if isinstance(obj1,Turtle):
-            obj1x = obj1.x
-            obj1y = obj1.y
-            obj1w = obj1.w
-            obj1h = obj1.h
-        else:
-            obj1x = obj1.pos[0]
-            obj1y = obj1.pos[1]
-            obj1w = obj1.size[0]
-            obj1h = obj1.size[1]
+        objx = obj.x
+        centerx = frog.x + GRID_SIZE/2
+        centery = frog.y + dy + GRID_SIZE/2
+        return (centerx < objx+obj.w) and (centerx > objx) and \
+            (centery < obj.y+obj.h) and (centery > obj.y)
+
+    def collidesTiles(self,frog,dy=0):
+        """
+        Returns True if any tile collides with the hitbox of the frog and False
+        otherwise
+
+        The tiles sit side by side across the lane, so the frog collides
+        with one of them exactly when it collides with the whole row.
 
-        obj2x = obj2[0][0] + GRID_SIZE/2
-        obj2y = obj2[0][1] + GRID_SIZE/2
-        return (obj2x < obj1x+obj1w) and (obj2x > obj1x) and \
-            (obj2y < obj1y+obj1h) and (obj2y > obj1y)
+        Parameter frog: The frog
+        Precondition: frog is a Frog object that is not dead
+
+        Parameter dy: How far above the frog (in pixels) to test
+        Precondition: dy is a number (int or float)
+        """
+        return (0 < frog.right) and (self._tilesWidth > frog.left) and \
+            (self._y < frog.top+dy) and (self._y+GRID_SIZE > frog.bottom+dy)
 
 
 class Grass(Lane):
@@ -196,15 +374,15 @@ class Road(Lane):
     """
     def roadCollision(self,frog):
         """
-        Returns True if the frog collides with a hedge.
+        Returns True if the frog collides with a car.
 
         Parameter frog: the frog
         Precondition: frog is a Frog object
         """
-        tuple = ((frog.x,frog.y),(frog.w,frog.h),(frog.hitbox))
         for obj in self._objs:
-            if self.collides(obj,tuple):
+            if self.collides(obj,frog):
                 return True
+        return False
 
 
 class Water(Lane):
@@ -221,15 +399,15 @@ class Water(Lane):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        tuple = ((frog.x,frog.y),(frog.w,frog.h),(frog.hitbox))
         for obj in self._objs:
-            if isinstance(obj,Turtle):
-                if self.contains(obj,tuple) and obj.frame < 8:
+            if obj.tag == TAG_TURTLE:
+                if self.contains(obj,frog) and obj.frame < TURTLE_FRAMES:
                     frog.x += dt*self._speed
                     return True
-            elif self.contains(obj,tuple):
+            elif self.contains(obj,frog):
                 frog.x += dt*self._speed
                 return True
+        return False
 
     def waterCollision(self,frog):
         """
@@ -238,84 +416,141 @@ class Water(Lane):
         Parameter frog: the frog
         Precondition: frog is a Frog object
         """
-        tuple = ((frog.x,frog.y),(frog.w,frog.h),(frog.hitbox))
-        for tile in self._tiles:
-            if self.collides(tile,tuple):
+        return self.collidesTiles(frog)
+
+    def turtleUnder(self,frog):
+        """
+        Returns True if a turtle (above or under the water) contains the frog.
+
+        Parameter frog: the frog
+        Precondition: frog is a Frog object
+        """
+        for turtle in self._turtles:
+            if self.contains(turtle,frog):
                 return True
+        return False
 
     def flyCollision(self,frog):
         """
         Returns True if the frog collides with a fly.
 
+        Only the flies are checked. A fly that is eaten is taken out of the
+        lane by building a new list of objects, so no list is changed while
+        it is being iterated over.
+
         Parameter frog: the frog
         Precondition: frog is a Frog object
         """
-        tuple = ((frog.x,frog.y),(frog.w,frog.h),(frog.hitbox))
-        for obj in self._objs:
-            if not isinstance(obj,Turtle):
-                pos = obj.source.find('Images')
-                source = obj.source[pos+7:]
-                if source == 'fly.png' and self.collides(obj,tuple):
-                    self._objs.remove(obj)
-                    return True
+        for pos in range(len(self._flies)):
+            fly = self._flies[pos]
+            if self.collides(fly,frog):
+                del self._flies[pos]
+                self._present[fly.index] = False
+                objs = []
+                for obj in self._objs:
+                    if not obj is fly:
+                        objs.append(obj)
+                self._objs = objs
+                return True
+        return False
 
 
 class Hedge(Lane):
     """
     A class representing the exit hedge.
+
+    Exits and openings sit on whole grid squares, so the hedge keeps a slot
+    table that says what each column holds. The frog can then be checked
+    against the column under it instead of against every object.
     """
+    # Attribute _slots: what each column of the hedge holds
+    # Invariant: _slots is a list of SLOT constants, one per grid square
+    #
+    # Attribute _numExits: the number of exits in the hedge
+    # Invariant: _numExits is an int >= 0
+    #
+
+    def __init__(self,width,leveldict,imagespath,pos):
+        """
+        Initializes the hedge and its slot table.
+
+        Parameter width: The width of the window to animate in
+        Precondition : width is a number (int or float) > 0
+
+        Parameter leveldict: A dictionary containing level information
+        Precondition: leveldict is a dictionary
+
+        Parameter imagespath: The path to the Images folder
+        Precondition: imagespath is a valid path
+
+        Parameter pos: the position in the leveldict['lanes'] list
+        Precondition: pos is an int
+        """
+        super(Hedge, self).__init__(width,leveldict,imagespath,pos)
+        self._slots = [SLOT_HEDGE]*leveldict['size'][0]
+        self._numExits = 0
+        for obj in self._objs:
+            col = int(obj.x // GRID_SIZE)
+            if obj.tag == TAG_EXIT:
+                self._numExits += 1
+                if col >= 0 and col < len(self._slots):
+                    self._slots[col] = SLOT_EXIT
+            elif obj.tag == TAG_OPEN and col >= 0 and col < len(self._slots):
+                self._slots[col] = SLOT_OPEN
+
     def getNumExits(self):
         """
         Returns the number of exits in the lane.
         """
-        numExits = 0
-        for obj in self._objs:
-            pos = obj.source.find('Images')
-            source = obj.source[pos+7:]
-            if source == 'exit.png':
-                numExits += 1
-        return numExits
+        return self._numExits
+
+    def getSlots(self):
+        """
+        Returns the slot table (a list of SLOT constants, one per column)
+        """
+        return self._slots
 
-    def hedgeCollision(self,frog,safeFrogs):
+    def hedgeCollision(self,frog):
         """
         Returns True if the frog collides with a hedge or safe frog and False
         otherwise.
 
-        Parameter frog: the frog
-        Precondition: frog is a Frog object
+        A safe frog blocks the frog if its column overlaps the hitbox. An
+        exit or opening lets the frog through if its column contains the
+        center of the frog. Anything else is hedge.
 
-        Parameter safeFrogs: the safe frogs
-        Precondition: safeFrogs is a list of of kivy.graphics Rectangles
+        Parameter frog: the frog
+        Precondition: frog is a Frog object in the row below the hedge
         """
-        tuple = tuple = ((frog.x,frog.y+GRID_SIZE),(frog.w,frog.h),(frog.hitbox))
-        for safeFrog in safeFrogs:
-            if self.collides(safeFrog,tuple):
-                return True
-        for obj in self._objs:
-            pos = obj.source.find('Images')
-            source = obj.source[pos+7:]
-            if source == 'exit.png' or source == 'open.png':
-                if self.contains(obj,tuple):
-                    return False
-        for tile in self._tiles:
-            if self.collides(tile,tuple):
-                return True
+        first = int(frog.left // GRID_SIZE)
+        for col in range(first,first+2):
+            if col >= 0 and col < len(self._slots) and self._slots[col] == SLOT_OCCUPIED:
+                if frog.left < (col+1)*GRID_SIZE and frog.right > col*GRID_SIZE:
+                    return True
+        col = self._columnOf(frog)
+        if not col is None:
+            if self._slots[col] == SLOT_EXIT or self._slots[col] == SLOT_OPEN:
+                return False
+        return self.collidesTiles(frog,GRID_SIZE)
 
     def frogSafe(self,frog):
         """
         Returns True if the frog is safe.
 
+        The frog is moved onto the exit and the exit is marked as occupied.
+
         Parameter frog: the frog
-        Precondition: frog is a Frog object
+        Precondition: frog is a Frog object in the row of the hedge
         """
-        tuple = ((frog.x,frog.y),(frog.w,frog.h),(frog.hitbox))
-        for obj in self._objs:
-            pos = obj.source.find('Images')
-            source = obj.source[pos+7:]
-            if source == 'exit.png' and self.contains(obj,tuple):
-                frog.x = obj.pos[0]
-                frog.y = obj.pos[1]
-                return True
+        col = self._columnOf(frog)
+        if col is None:
+            return False
+        if self._slots[col] == SLOT_EXIT or self._slots[col] == SLOT_OCCUPIED:
+            frog.x = float(col*GRID_SIZE)
+            frog.y = self._y
+            self._slots[col] = SLOT_OCCUPIED
+            return True
+        return False
 
     def enterFromNorth(self,frog):
         """
@@ -324,21 +559,28 @@ class Hedge(Lane):
         Parameter frog: the frog
         Precondition: frog is a Frog object
         """
-        tuple = ((frog.x,frog.y-GRID_SIZE),(frog.w,frog.h),(frog.hitbox))
-        for tile in self._tiles:
-            if self.collides(tile,tuple):
-                return True
+        return self.collidesTiles(frog,-GRID_SIZE)
 
     def enterFromSide(self,frog):
         """
         Returns True if the frog enters hedge from the East or West.
 
+        Parameter frog: the frog
+        Precondition: frog is a Frog object in the row of the hedge
+        """
+        col = self._columnOf(frog)
+        return not col is None and self._slots[col] == SLOT_OPEN
+
+    def _columnOf(self,frog):
+        """
+        Returns the column whose square strictly contains the center of the
+        frog, or None if there is no such column.
+
         Parameter frog: the frog
         Precondition: frog is a Frog object
         """
-        tuple = ((frog.x,frog.y),(frog.w,frog.h),(frog.hitbox))
-        for obj in self._objs:
-            pos = obj.source.find('Images')
-            source = obj.source[pos+7:]
-            if source == 'open.png' and self.contains(obj,tuple):
-                return True
+        center = frog.x + GRID_SIZE/2
+        col = int(center // GRID_SIZE)
+        if col*GRID_SIZE == center or col < 0 or col >= len(self._slots):
+            return None
+        return col
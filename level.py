@@ -1,11 +1,14 @@
 """
 Subcontroller module for Froggo
 
+The level only holds the simulation state and does not import kivy, so it
+can be stepped without a window. The view module mirrors it on the canvas.
+
 Author: Lucy Beck
 Date: January 2, 2021
 """
-from kivy.graphics import *
 from lanes import *
+from animation import *
 from models import *
 from constants import *
 
@@ -21,25 +24,66 @@ class Level(object):
     # Invariant: _height is a number (int or float) > 0
     #
     # Attribute _lanes: The list of horizontal lanes that the frog has to cross
-    # Invariant: _lanes is a list of Lane objects
+    # Invariant: _lanes is a list of Lane objects, where the lane at position
+    #            row is the one whose y-coordinate is row*GRID_SIZE
+    #
+    # Attribute _moving: Whether each lane has objects that move
+    # Invariant: _moving is a list of bools, the same length as _lanes
     #
     # Attribute _frog: The frog
     # Invariant: _frog is a Frog object or None or string
     #
-    # Attribute _lives: The list of frog heads that represent the number of lives
-    # Invariant: _lives is a list of kivy.graphics Rectangles
+    # Attribute _lives: The number of lives
+    # Invariant: _lives is an int >= 0 and <= 3
     #
     # Attribute _coolDown: the amount of time before the player can move again
     # Invariant: _coolDown is a number (int or float)
     #
     # Attribute _safeFrogs: The list of safe frogs
-    # Invariant: _safeFrogs is a list of kivy.graphics Rectangles
+    # Invariant: _safeFrogs is a list of Obstacle objects
     #
     # Attribute _numExits: The number of exits in a level
     # Invariant: _numExits is an int
     #
-    # Attribute _animator: A coroutine for performing an animation
-    # Invariant: _animator is a generator-based coroutine or None
+    # Attribute _clock: The clock of the level, ticked every update, that
+    #                   animates the death of the frog
+    # Invariant: _clock is a Clock object
+    #
+    # Attribute _cause: What killed the frog most recently
+    # Invariant: _cause is one of the CAUSE constants or None
+    #
+    # Attribute _camera: The y-coordinate of the bottom of the window in the level
+    # Invariant: _camera is a number (int or float) >= 0
+    #
+    # Attribute _first: The first lane that is updated every step
+    # Invariant: _first is an int >= 0 and <= _last
+    #
+    # Attribute _last: The lane after the last lane that is updated every step
+    # Invariant: _last is an int >= _first and <= len(_lanes)
+    #
+    # Attribute _laneSteps: The number of steps that the lanes have been updated for
+    # Invariant: _laneSteps is an int >= 0
+    #
+    # Attribute _since: The value of _laneSteps when each lane was last updated
+    #                   (only kept up to date for lanes outside _first.._last)
+    # Invariant: _since is a list of ints, the same length as _lanes
+    #
+    # Attribute _stops: The steps in which the lanes after the frog's row were
+    #                   not updated, as (step, row) pairs in order
+    # Invariant: _stops is a list of tuples of two ints
+    #
+    # Attribute _buffered: Whether a move pressed during the cooldown is made
+    #                      when the cooldown ends
+    # Invariant: _buffered is a bool
+    #
+    # Attribute _queued: The move key pressed during the cooldown, if buffered
+    # Invariant: _queued is one of MOVE_KEYS or None
+    #
+    # Attribute _held: Whether each move key was held in the last step
+    # Invariant: _held is a dictionary mapping each of MOVE_KEYS to a bool
+    #
+    # Attribute _moves: The number of times the frog has moved
+    # Invariant: _moves is an int >= 0
     #
 
     def getFrog(self):
@@ -50,17 +94,73 @@ class Level(object):
 
     def getLives(self):
         """
-        Returns the list of lives
+        Returns the number of lives
         """
         return self._lives
 
+    def getLanes(self):
+        """
+        Returns the list of lanes
+        """
+        return self._lanes
+
+    def getSafeFrogs(self):
+        """
+        Returns the list of safe frogs
+        """
+        return self._safeFrogs
+
+    def getWidth(self):
+        """
+        Returns the width of the window to animate in
+        """
+        return self._width
+
+    def getHeight(self):
+        """
+        Returns the height of the window to animate in
+        """
+        return self._height
+
+    def getCamera(self):
+        """
+        Returns the y-coordinate of the bottom of the window in the level
+        """
+        return self._camera
+
+    def getRows(self):
+        """
+        Returns the rows (first, last) of the lanes that are updated every
+        step, not including last
+        """
+        return (self._first,self._last)
+
+    def getCoolDown(self):
+        """
+        Returns the time in seconds before the frog can move again
+        """
+        return self._coolDown
+
+    def getMoves(self):
+        """
+        Returns the number of times the frog has moved
+        """
+        return self._moves
+
+    def getCause(self):
+        """
+        Returns what killed the frog most recently (one of the CAUSE
+        constants), or None if the frog has not died
+        """
+        return self._cause
+
     def getWon(self):
         """
         Returns True if the player won the game and False otherwise
         """
         return self._numExits == len(self._safeFrogs)
 
-    def __init__(self,width,height,leveldict,imagespath):
+    def __init__(self,width,height,leveldict,imagespath,buffered=False):
         """
         Initializes the level.
 
@@ -75,25 +175,42 @@ class Level(object):
 
         Parameter imagespath: The path to the Images folder
         Precondition: imagespath is a valid path
+
+        Parameter buffered: Whether a move pressed during the cooldown is made
+        when the cooldown ends (otherwise the key must still be held then)
+        Precondition: buffered is a bool
         """
         self._width = width
         self._height = height
         self._lanes = []
         self._laneHelper(leveldict,imagespath)
+        self._moving = []
+        for lane in self._lanes:
+            self._moving.append(isinstance(lane,Road) or isinstance(lane,Water))
 
         self._frog = Frog(leveldict)
-        self._lives = []
-        for x in range(1,4):
-            image = Rectangle(source=FROG_HEAD, size=(GRID_SIZE, GRID_SIZE), \
-            pos=(width-GRID_SIZE*x, height-GRID_SIZE))
-            self._lives.append(image)
+        self._lives = 3
         self._coolDown = 0
         self._safeFrogs = []
         self._numExits = 0
         for lane in self._lanes:
             if isinstance(lane,Hedge):
                 self._numExits += lane.getNumExits()
-        self._animator = None
+        self._clock = Clock()
+        self._cause = None
+        self._camera = 0
+        self._first = 0
+        self._last = 0
+        self._laneSteps = 0
+        self._since = [0]*len(self._lanes)
+        self._stops = []
+        self._follow(0)
+        self._buffered = buffered
+        self._queued = None
+        self._held = {}
+        for key in MOVE_KEYS:
+            self._held[key] = False
+        self._moves = 0
 
     def update(self,dt,keydict,leveldict,sounddict,reset=False):
         """
@@ -109,13 +226,18 @@ class Level(object):
         Precondition: leveldict is a dictionary
 
         Parameter sounddict: a dictionary containing sounds to play
-        Precondition: sounddict is a dictionary of Sound objects
+        Precondition: sounddict is a dictionary of Sound objects (it may be
+        empty when the level is simulated without a window)
 
         Parameter reset: True if the level needs to be reset and False otherwise
         Precondition: reset is a bool
         """
+        self._clock.tick(dt)
         if reset == True:
             self._frog = Frog(leveldict)
+            self._queued = None
+        if self._buffered:
+            self._bufferMove(keydict)
         if not self._frog.dead:
             if self._coolDown > 0:
                 self._coolDown -= dt
@@ -125,35 +247,47 @@ class Level(object):
             lasty = self._frog.y
             self._updateLanes(dt,sounddict)
             if self._frog == 'dead':
-                sounddict['squish'].play()
-                self._frog = Frog(leveldict,True,lastx,lasty)
-        else:
-            if not self._animator is None:
-                try:
-                    self._animator.send(dt)
-                except:
-                    self._animator = None
-                    self._frog = None
-                    self._lives.pop()
-            else:
-                self._animator = self._frog.animateDeath()
-                next(self._animator)
+                self._play(sounddict,'squish')
+                self._frog = Frog(leveldict,True,lastx,lasty,self._clock)
+        elif self._frog.gone:
+            self._frog = None
+            self._lives -= 1
 
-    def draw(self,canvas):
+    def play(self,state,dt,keydict,leveldict,sounddict):
         """
-        Draws the game objects to the view.
+        Returns the state of the game after one step of play.
+
+        This is the part of the game's state machine that runs while the
+        level is played, so the game and a replay step the level the same way.
+        The frog is only reset after it is lost once 'c' is pressed.
+
+        Parameter state: The state of the game before the step
+        Precondition: state is one of STATE_ACTIVE, STATE_PAUSED or STATE_CONTINUE
 
-        Parameter canvas: The root object used for drawing by a Widget
-        Precondition: canvas is a root object used for drawing by a Widget
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+
+        Parameter keydict: A dictionary containing keyboard keys
+        Precondition: keydict is a dictionary
+
+        Parameter leveldict: A dictionary containing level information
+        Precondition: leveldict is a dictionary
+
+        Parameter sounddict: a dictionary containing sounds to play
+        Precondition: sounddict is a dictionary of Sound objects (or empty)
         """
-        for lane in self._lanes:
-            lane.draw(canvas)
-        for safeFrog in self._safeFrogs:
-            canvas.add(safeFrog)
-        for life in self._lives:
-            canvas.add(life)
-        if not self._frog is None:
-            self._frog.draw(canvas)
+        if state == STATE_ACTIVE:
+            self.update(dt,keydict,leveldict,sounddict)
+            if self._lives == 0 or self.getWon():
+                return STATE_COMPLETE
+            elif self._frog is None:
+                state = STATE_PAUSED
+        if state == STATE_PAUSED and 'c' in keydict and keydict['c']:
+            state = STATE_CONTINUE
+        if state == STATE_CONTINUE:
+            self.update(dt,keydict,leveldict,sounddict,True)
+            state = STATE_ACTIVE
+        return state
 
     def _laneHelper(self,leveldict,imagespath):
         """
@@ -184,91 +318,222 @@ class Level(object):
         Precondition: leveldict is a dictionary
 
         Parameter sounddict: a dictionary containing sounds to play
-        Precondition: sounddict is a dictionary of Sound objects
+        Precondition: sounddict is a dictionary of Sound objects (or empty)
         """
+        if not self._queued is None:
+            keydict = {self._queued: True}
+            self._queued = None
+        lastx = self._frog.x
+        lasty = self._frog.y
         if 'up' in keydict and keydict['up']:
             self._frog.direction = 'north'
-            if self._frog.y + 3*GRID_SIZE <= self._height and not self._hedgePresent('up'):
+            if self._frog.y + 2*GRID_SIZE <= len(self._lanes)*GRID_SIZE and not self._hedgePresent('up'):
                 self._frog.y += GRID_SIZE
-                sounddict['ribbit'].play()
+                self._play(sounddict,'ribbit')
             self._coolDown = FROG_SPEED
         elif 'down' in keydict and keydict['down']:
             self._frog.direction = 'south'
             if self._frog.y - GRID_SIZE >= 0 and not self._hedgePresent('down'):
                 self._frog.y -= GRID_SIZE
-                sounddict['ribbit'].play()
+                self._play(sounddict,'ribbit')
             self._coolDown = FROG_SPEED
         elif 'right' in keydict and keydict['right']:
             self._frog.direction = 'east'
             if self._frog.x + 2*GRID_SIZE <= self._width and not self._hedgePresent('east'):
                 self._frog.x += GRID_SIZE
-                sounddict['ribbit'].play()
+                self._play(sounddict,'ribbit')
             self._coolDown = FROG_SPEED
         elif 'left' in keydict and keydict['left']:
             self._frog.direction = 'west'
             if self._frog.x - GRID_SIZE >= 0 and not self._hedgePresent('west'):
                 self._frog.x -= GRID_SIZE
-                sounddict['ribbit'].play()
+                self._play(sounddict,'ribbit')
             self._coolDown = FROG_SPEED
+        if self._frog.x != lastx or self._frog.y != lasty:
+            self._moves += 1
+
+    def _bufferMove(self,keydict):
+        """
+        Keeps the move key that went down while the frog cannot move, so that
+        the move is made as soon as the cooldown ends.
+
+        Only one move is kept: a later press replaces it. Presses while the
+        frog is dead are dropped.
+
+        Parameter keydict: A dictionary containing keyboard keys
+        Precondition: keydict is a dictionary
+        """
+        waiting = not self._frog.dead and self._coolDown > 0
+        pressed = None
+        for key in MOVE_KEYS:
+            down = key in keydict and keydict[key]
+            if down and not self._held[key] and waiting and pressed is None:
+                pressed = key
+            self._held[key] = down
+        if not pressed is None:
+            self._queued = pressed
 
     def _updateLanes(self,dt,sounddict):
         """
         Updates the lanes each frame.
 
+        Every moving lane near the window is updated, but only the lane in
+        the frog's row is checked for collisions, since the frog's hitbox
+        cannot reach any other lane. Lanes after the frog's row are not
+        updated in a frame where the frog dies or reaches an exit.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
 
         Parameter sounddict: a dictionary containing sounds to play
-        Precondition: sounddict is a dictionary of Sound objects
+        Precondition: sounddict is a dictionary of Sound objects (or empty)
         """
-        for lane in self._lanes:
-            if not self._frog is None and self._frog != 'dead':
-                if isinstance(lane,Road) or isinstance(lane,Water):
-                    lane.update(dt)
-                if isinstance(lane,Road) and lane.roadCollision(self._frog):
+        self._follow(dt)
+        self._laneSteps += 1
+        row = self._rowOf(self._frog)
+        for pos in range(self._first,self._last):
+            if self._frog is None or self._frog == 'dead':
+                break
+            if self._moving[pos]:
+                self._lanes[pos].update(dt)
+            if pos == row:
+                self._collideLane(self._lanes[pos],dt,sounddict)
+        if self._frog is None or self._frog == 'dead':
+            self._stops.append((self._laneSteps,row))
+
+    def _follow(self,dt):
+        """
+        Moves the camera to the frog and changes the lanes that are updated
+        every step to the ones near the window.
+
+        The camera keeps the frog in the middle of the window, but does not go
+        past the bottom of the level or the row above the last lane. Only the
+        lanes in the window, and CAMERA_MARGIN lanes above and below it, are
+        updated every step. A lane that leaves them stops, and is moved
+        forward by all the steps it missed at once when it comes back, so a
+        frame costs the same however many lanes the level has. A level that
+        fits in the window updates every lane.
+
+        The lanes after the frog's row miss the step in which it dies or
+        reaches an exit, so those steps are not counted for a lane that was
+        stopped above the frog's row at the time.
+
+        Parameter dt: The time in seconds of each step
+        Precondition: dt is a number (int or float) >= 0
+        """
+        top = (len(self._lanes)+1)*GRID_SIZE - self._height
+        self._camera = max(0,min(self._frog.y + GRID_SIZE/2 - self._height/2,top))
+        first = max(0,int(self._camera // GRID_SIZE) - CAMERA_MARGIN)
+        last = min(len(self._lanes),int((self._camera+self._height) // GRID_SIZE) + 1 + CAMERA_MARGIN)
+        if first == self._first and last == self._last:
+            return
+        for pos in range(self._first,self._last):
+            if pos < first or pos >= last:
+                self._since[pos] = self._laneSteps
+        for pos in range(first,last):
+            if pos < self._first or pos >= self._last:
+                missed = self._laneSteps - self._since[pos]
+                for step, row in reversed(self._stops):
+                    if step <= self._since[pos]:
+                        break
+                    if row < pos:
+                        missed -= 1
+                if self._moving[pos] and missed > 0:
+                    self._lanes[pos].advance(dt,missed)
+        self._first = first
+        self._last = last
+
+    def _collideLane(self,lane,dt,sounddict):
+        """
+        Checks the frog against the lane in its row.
+
+        Parameter lane: The lane in the frog's row
+        Precondition: lane is a Lane object
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+
+        Parameter sounddict: a dictionary containing sounds to play
+        Precondition: sounddict is a dictionary of Sound objects (or empty)
+        """
+        if isinstance(lane,Road) and lane.roadCollision(self._frog):
+            self._frog = 'dead'
+            self._cause = CAUSE_ROAD
+        elif isinstance(lane,Water):
+            if lane.flyCollision(self._frog):
+                if self._lives < 3:
+                    self._lives += 1
+                    self._play(sounddict,'activation')
+            if lane.logContains(self._frog,dt):
+                if self._frog.x+GRID_SIZE/2 < 0 or self._frog.x+GRID_SIZE/2 > self._width:
                     self._frog = 'dead'
-                if isinstance(lane,Water):
-                    if lane.flyCollision(self._frog):
-                        if len(self._lives) == 1:
-                            image = Rectangle(source=FROG_HEAD, size=(GRID_SIZE, GRID_SIZE), \
-                            pos=(self._width-GRID_SIZE*2, self._height-GRID_SIZE))
-                            self._lives.append(image)
-                            sounddict['activation'].play()
-                        elif len(self._lives) == 2:
-                            image = Rectangle(source=FROG_HEAD, size=(GRID_SIZE, GRID_SIZE), \
-                            pos=(self._width-GRID_SIZE*3, self._height-GRID_SIZE))
-                            self._lives.append(image)
-                            sounddict['activation'].play()
-                    if lane.logContains(self._frog,dt):
-                        if self._frog.x+GRID_SIZE/2 < 0 or self._frog.x+GRID_SIZE/2 > self._width:
-                            self._frog = 'dead'
-                    elif lane.waterCollision(self._frog):
-                        self._frog = 'dead'
-                if isinstance(lane,Hedge) and lane.frogSafe(self._frog):
-                    image = Rectangle(source=FROG_SAFE, pos=(self._frog.x,self._frog.y),\
-                        size=(GRID_SIZE,GRID_SIZE))
-                    self._safeFrogs.append(image)
-                    self._frog = None
-                    sounddict['activation'].play()
+                    self._cause = CAUSE_OFFSCREEN
+            elif lane.waterCollision(self._frog):
+                if lane.turtleUnder(self._frog):
+                    self._cause = CAUSE_TURTLE
+                else:
+                    self._cause = CAUSE_WATER
+                self._frog = 'dead'
+        elif isinstance(lane,Hedge) and lane.frogSafe(self._frog):
+            image = Obstacle('safe', TAG_SAFE, self._frog.x, self._frog.y, GRID_SIZE, GRID_SIZE)
+            self._safeFrogs.append(image)
+            self._frog = None
+            self._play(sounddict,'activation')
+
+    def _rowOf(self,frog):
+        """
+        Returns the row (the position in the list of lanes) that the frog is in.
+
+        Parameter frog: the frog
+        Precondition: frog is a Frog object
+        """
+        return int(frog.y // GRID_SIZE)
+
+    def _laneAt(self,row):
+        """
+        Returns the lane in the given row or None if there is no such lane.
+
+        Parameter row: the row
+        Precondition: row is an int
+        """
+        if row >= 0 and row < len(self._lanes):
+            return self._lanes[row]
+        return None
 
     def _hedgePresent(self,direction):
         """
         Returns True if the next move is a hedge, False otherwise
 
+        Only the hedge in the row that the move would enter (or, for moves
+        to the side, the row the frog is in) can block the frog.
+
         Parameter direction: The direction to move.
-        Precondition: direction is a string and one of 'up' or 'down'.
+        Precondition: direction is a string and one of 'up', 'down', 'east'
+        or 'west'.
         """
-        lst = []
+        if self._frog is None:
+            return False
+        row = self._rowOf(self._frog)
         if direction == 'up':
-            for lane in self._lanes:
-                if not self._frog is None and isinstance(lane,Hedge):
-                    lst.append(lane.hedgeCollision(self._frog,self._safeFrogs))
+            lane = self._laneAt(row+1)
+            return isinstance(lane,Hedge) and lane.hedgeCollision(self._frog)
         elif direction == 'down':
-            for lane in self._lanes:
-                if not self._frog is None and isinstance(lane,Hedge):
-                    lst.append(lane.enterFromNorth(self._frog))
+            lane = self._laneAt(row-1)
+            return isinstance(lane,Hedge) and lane.enterFromNorth(self._frog)
         elif direction == 'east' or direction == 'west':
-            for lane in self._lanes:
-                if not self._frog is None and isinstance(lane,Hedge):
-                    lst.append(lane.enterFromSide(self._frog))
-        return True in lst
+            lane = self._laneAt(row)
+            return isinstance(lane,Hedge) and lane.enterFromSide(self._frog)
+        return False
+
+    def _play(self,sounddict,name):
+        """
+        Plays the sound with the given name if it is in the dictionary.
+
+        Parameter sounddict: a dictionary containing sounds to play
+        Precondition: sounddict is a dictionary of Sound objects (or empty)
+
+        Parameter name: the name of the sound
+        Precondition: name is a string
+        """
+        if name in sounddict and not sounddict[name] is None:
+            sounddict[name].play()
@@ -0,0 +1,181 @@
+"""
+Loader module for Froggo
+
+Levels are built on a background thread, so that the game keeps drawing
+while the compiled levels are read or compiled. The recordings are written
+on the same thread, so no file is written in a frame. This module does not
+import kivy; the textures are made on the main thread by the view.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from concurrent.futures import ThreadPoolExecutor
+from level import *
+from compiler import *
+from constants import *
+import os
+
+
+class LevelLoader(object):
+    """
+    A class that builds levels on a single background thread.
+
+    A level is requested by the name of its JSON file and the size of the
+    window. The result can be taken once it is done; until then take returns
+    None, so the caller can keep drawing a loading message.
+    """
+    # Attribute _jsonpath: The path to the JSON folder
+    # Invariant: _jsonpath is a valid path
+    #
+    # Attribute _imagespath: The path to the Images folder
+    # Invariant: _imagespath is a valid path
+    #
+    # Attribute _cachepath: The path to the Cache folder for compiled levels
+    # Invariant: _cachepath is a string
+    #
+    # Attribute _executor: The thread that builds the levels
+    # Invariant: _executor is a ThreadPoolExecutor with one worker
+    #
+    # Attribute _pending: The levels requested but not taken yet
+    # Invariant: _pending is a dictionary mapping JSON file names to tuples
+    #            (width, height, Future)
+    #
+    # Attribute _dicts: The levels already compiled (only used by the worker)
+    # Invariant: _dicts is a dictionary mapping JSON file names to dictionaries
+    #
+
+    def __init__(self,jsonpath,imagespath,cachepath):
+        """
+        Initializes the loader and starts its worker thread.
+
+        Parameter jsonpath: The path to the JSON folder
+        Precondition: jsonpath is a valid path
+
+        Parameter imagespath: The path to the Images folder
+        Precondition: imagespath is a valid path
+
+        Parameter cachepath: The path to the Cache folder
+        Precondition: cachepath is a string
+        """
+        self._jsonpath = jsonpath
+        self._imagespath = imagespath
+        self._cachepath = cachepath
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = {}
+        self._dicts = {}
+
+    def request(self,name,width,height):
+        """
+        Starts building the level in the background if it is not already
+        being built for this window size.
+
+        Parameter name: The JSON file of the level
+        Precondition: name is a valid file name in the JSON folder
+
+        Parameter width: The width of the window to animate in
+        Precondition : width is a number (int or float) > 0
+
+        Parameter height: The height of the window to animate in
+        Precondition: height is a number (int or float) > 0
+        """
+        if name in self._pending:
+            pending = self._pending[name]
+            if pending[0] == width and pending[1] == height:
+                return
+        future = self._executor.submit(self._build,name,width,height)
+        self._pending[name] = (width,height,future)
+
+    def take(self,name,width,height):
+        """
+        Returns the tuple (leveldict, level) if the level is built, and None
+        otherwise.
+
+        The level is requested if it was not already. A level is only
+        returned once; it has to be requested again to play it again. Any
+        error raised while building the level is raised here.
+
+        Parameter name: The JSON file of the level
+        Precondition: name is a valid file name in the JSON folder
+
+        Parameter width: The width of the window to animate in
+        Precondition : width is a number (int or float) > 0
+
+        Parameter height: The height of the window to animate in
+        Precondition: height is a number (int or float) > 0
+        """
+        self.request(name,width,height)
+        future = self._pending[name][2]
+        if not future.done():
+            return None
+        del self._pending[name]
+        return future.result()
+
+    def write(self,path,data):
+        """
+        Writes data to a file on the worker thread, after the work already
+        given to it.
+
+        The folder of the file is made if it does not exist. A file that
+        cannot be written is skipped.
+
+        Parameter path: The file to write
+        Precondition: path is a string
+
+        Parameter data: The contents of the file
+        Precondition: data is a bytes object
+        """
+        self._executor.submit(self._write,path,data)
+
+    def shutdown(self):
+        """
+        Stops the worker thread without waiting for it.
+
+        The levels that are waiting to be built are dropped, so only the one
+        being built (if any) is finished before the thread ends. The files
+        that are waiting to be written are still written.
+        """
+        for pending in self._pending.values():
+            pending[2].cancel()
+        self._pending = {}
+        self._executor.shutdown(wait=False)
+
+    def _build(self,name,width,height):
+        """
+        Returns the tuple (leveldict, level) for a new level.
+
+        This runs on the worker thread.
+
+        Parameter name: The JSON file of the level
+        Precondition: name is a valid file name in the JSON folder
+
+        Parameter width: The width of the window to animate in
+        Precondition : width is a number (int or float) > 0
+
+        Parameter height: The height of the window to animate in
+        Precondition: height is a number (int or float) > 0
+        """
+        if not name in self._dicts:
+            path = os.path.join(self._jsonpath,name)
+            self._dicts[name] = loadLevel(path,self._imagespath,self._cachepath)
+        leveldict = self._dicts[name]
+        level = Level(width,height,leveldict,self._imagespath,INPUT_BUFFER)
+        return (leveldict,level)
+
+    def _write(self,path,data):
+        """
+        Writes data to a file, or does nothing if it cannot be written.
+
+        This runs on the worker thread.
+
+        Parameter path: The file to write
+        Precondition: path is a string
+
+        Parameter data: The contents of the file
+        Precondition: data is a bytes object
+        """
+        try:
+            os.makedirs(os.path.dirname(path),exist_ok=True)
+            with open(path,'wb') as file:
+                file.write(data)
+        except OSError:
+            pass
@@ -1,13 +1,22 @@
 """
 Models module for Froggo
 
+The models only hold positions, sizes, hitboxes and the clocks of their
+animations (see the animation module). They do not import kivy, so a level
+can be simulated without a window. The view module mirrors them on the canvas.
+
 Author: Lucy Beck
 Date: January 2, 2021
 """
-from kivy.graphics import *
+from animation import *
 from constants import *
 
 
+# The animations of a turtle dive and of a frog death, shared by every object
+TURTLE_DIVE = Animation(TURTLE_SPEED,TURTLE_FRAMES)
+FROG_DEATH = Animation(DEATH_SPEED,DEATH_FRAMES)
+
+
 class Frog(object):
     """
     A class representing the frog
@@ -27,8 +36,11 @@ class Frog(object):
     # Attribute _h: The height of the frog
     # Invariant: _h is a number (int or float) > 0
     #
-    # Attribute _frame: The current animation frame of the filmstrip
-    # Invariant: _frame is a number > 0 and < number of animation frames or None
+    # Attribute _clock: The clock of the death animation
+    # Invariant: _clock is a Clock object
+    #
+    # Attribute _phase: The steps of _clock when the frog was made
+    # Invariant: _phase is an int >= 0
     #
     # Attribute _direction: The direction of the frog
     # Invariant: _direction is a string of either 'north', 'south', 'east', or 'west' or None
@@ -36,6 +48,18 @@ class Frog(object):
     # Attribute _hitbox: The hitbox for the frog
     # Invariant: _hitbox is a 4-element list of numbers or None
     #
+    # Attribute _left: The left edge of the hitbox
+    # Invariant: _left is a number (int or float) or None
+    #
+    # Attribute _right: The right edge of the hitbox
+    # Invariant: _right is a number (int or float) or None
+    #
+    # Attribute _bottom: The bottom edge of the hitbox
+    # Invariant: _bottom is a number (int or float) or None
+    #
+    # Attribute _top: The top edge of the hitbox
+    # Invariant: _top is a number (int or float) or None
+    #
     @property
     def x(self):
         """
@@ -49,6 +73,7 @@ class Frog(object):
     def x(self,value):
         assert type(value) == int or type(value) == float
         self._x = value
+        self._setBox()
 
     @property
     def y(self):
@@ -63,6 +88,7 @@ class Frog(object):
     def y(self,value):
         assert type(value) == int or type(value) == float
         self._y = value
+        self._setBox()
 
     @property
     def w(self):
@@ -95,6 +121,32 @@ class Frog(object):
     def direction(self,value):
         assert type(value) == str and value in ['north', 'south', 'east', 'west'] or value is None
         self._direction = value
+        if value == 'north' or value == 'south':
+            self._hitbox = [2,14,2,14]
+        elif value == 'east' or value == 'west':
+            self._hitbox = [14,2,14,2]
+        self._setBox()
+
+    @property
+    def frame(self):
+        """
+        The current frame of the death animation, or None if the frog is alive
+
+        Invariant: value is an int > 0 and <= DEATH_FRAMES or None
+        """
+        if not self._dead:
+            return None
+        return FROG_DEATH.frameAt(self._clock.getSteps()-self._phase,self._clock.getDt())
+
+    @property
+    def gone(self):
+        """
+        True if the frog is dead and its death animation has finished, False otherwise
+
+        Invariant: value is a bool
+        """
+        return self._dead and FROG_DEATH.isOver(self._clock.getSteps()-self._phase,
+            self._clock.getDt())
 
     @property
     def dead(self):
@@ -114,7 +166,45 @@ class Frog(object):
         """
         return self._hitbox
 
-    def __init__(self,leveldict,dead=False,lastx=None,lasty=None):
+    @property
+    def left(self):
+        """
+        The left edge of the hitbox (the x-coordinate plus the hitbox offset)
+
+        Invariant: value is a number (int or float) or None
+        """
+        return self._left
+
+    @property
+    def right(self):
+        """
+        The right edge of the hitbox (the x-coordinate plus the width less the
+        hitbox offset)
+
+        Invariant: value is a number (int or float) or None
+        """
+        return self._right
+
+    @property
+    def bottom(self):
+        """
+        The bottom edge of the hitbox (the y-coordinate plus the hitbox offset)
+
+        Invariant: value is a number (int or float) or None
+        """
+        return self._bottom
+
+    @property
+    def top(self):
+        """
+        The top edge of the hitbox (the y-coordinate plus the height less the
+        hitbox offset)
+
+        Invariant: value is a number (int or float) or None
+        """
+        return self._top
+
+    def __init__(self,leveldict,dead=False,lastx=None,lasty=None,clock=None):
         """
         Initializes the frog
 
@@ -129,15 +219,22 @@ class Frog(object):
 
         Parameter deady: The y-coordinate of where the frog died
         Precondition: deady is a number (int or float) or None
+
+        Parameter clock: The clock of the death animation, which starts now,
+        or None for a clock of its own
+        Precondition: clock is a Clock object or None
         """
         self._dead = dead
+        if clock is None:
+            clock = Clock()
+        self._clock = clock
+        self._phase = clock.getSteps()
         if dead:
             self._x = lastx
             self._y = lasty
             self._w = GRID_SIZE
             self._h = GRID_SIZE
             self._direction = None
-            self._frame = 1
             self._hitbox = None
         else:
             self._x = leveldict['start'][0]*GRID_SIZE
@@ -145,61 +242,41 @@ class Frog(object):
             self._w = GRID_SIZE
             self._h = GRID_SIZE
             self._direction = 'north'
-            self._frame = None
             self._hitbox = [2,14,2,14]
+        self._setBox()
+
+    def _setBox(self):
+        """
+        Computes the edges of the hitbox from the position and the hitbox.
 
-    def draw(self,canvas):
-        if self._dead:
-            source = "atlas://skulls/frame" + str(self._frame)
-            skulls = Rectangle(source=source, pos=(self._x,self._y), size=(self._w, self._h))
-            canvas.add(skulls)
+        The edges are kept up to date whenever the frog moves or turns, so
+        the lanes can test collisions without building tuples.
+        """
+        if self._hitbox is None:
+            self._left = None
+            self._right = None
+            self._bottom = None
+            self._top = None
         else:
-            if self._direction == 'north':
-                source = FROG_NORTH
-                self._hitbox = [2,14,2,14]
-            elif self._direction == 'south':
-                source = FROG_SOUTH
-                self._hitbox = [2,14,2,14]
-            elif self._direction == 'east':
-                source = FROG_EAST
-                self._hitbox = [14,2,14,2]
-            elif self._direction == 'west':
-                source = FROG_WEST
-                self._hitbox = [14,2,14,2]
-            frog = Rectangle(source=source, pos=(self._x,self._y), size=(self._w, self._h))
-            canvas.add(frog)
-
-    def animateDeath(self):
-        """
-        Animates a frog death over DEATH_SPEED seconds.
-
-        This method is a coroutine that takes a break (so that the game
-        can redraw the image) every time it moves it. The coroutine takes
-        the dt as periodic input so it knows how many (parts of) seconds
-        to animate.
-
-        Parameter dt: The time since the last animation frame.
-        Precondition: dt is a float.
-        """
-        time = 0
-        animating = True
-        while animating:
-            if time >= DEATH_SPEED:
-                animating = False
-            dt = (yield)
-            time += dt
-            frame = round(time/DEATH_SPEED*7)
-            if frame == 0:
-                frame = 1
-            self._frame = frame
+            self._left = self._x + self._hitbox[0]
+            self._right = self._x + self._w - self._hitbox[2]
+            self._bottom = self._y + self._hitbox[3]
+            self._top = self._y + self._h - self._hitbox[1]
+
 
 class Turtle(object):
     """
     A class representing the turtle
     """
-    # Attribute _x: The x-coordinate of the turtle
+    # Attribute _x: The x-coordinate of the turtle (until it is attached to a lane)
     # Invariant: _x is a number (int or float)
     #
+    # Attribute _xs: The array shared by a lane that holds the x-coordinate
+    # Invariant: _xs is a 1-dimensional numpy array of floats or None
+    #
+    # Attribute _index: The position of the x-coordinate in _xs
+    # Invariant: _index is an int >= 0 or None
+    #
     # Attribute _y: The y-coordinate of the turtle
     # Invariant: _y is a number (int or float)
     #
@@ -209,14 +286,14 @@ class Turtle(object):
     # Attribute _h: The height of the turtle
     # Invariant: _h is a number (int or float) > 0
     #
-    # Attribute _frame: The current animation frame of the filmstrip
-    # Invariant: _frame is a number > 0 and < number of animation frames
-    #
     # Attribute _direction: The direction of the turtle
     # Invariant: _direction is a string of either 'east' or 'west'
     #
-    # Attribute _animator: A coroutine for performing an animation
-    # Invariant: _animator is a generator-based coroutine or None
+    # Attribute _clock: The clock of the dive animation, its own or its lane's
+    # Invariant: _clock is a Clock object
+    #
+    # Attribute _phase: The steps of _clock when the turtle started diving
+    # Invariant: _phase is an int >= 0
     #
 
     @property
@@ -226,12 +303,26 @@ class Turtle(object):
 
         Invariant: value is a number (int or float)
         """
-        return self._x
+        if self._xs is None:
+            return self._x
+        return float(self._xs[self._index])
 
     @x.setter
     def x(self,value):
         assert type(value) == int or type(value) == float
-        self._x = value
+        if self._xs is None:
+            self._x = value
+        else:
+            self._xs[self._index] = value
+
+    @property
+    def index(self):
+        """
+        The position of the x-coordinate in the array of its lane
+
+        Invariant: value is an int >= 0 or None
+        """
+        return self._index
 
     @property
     def y(self):
@@ -265,9 +356,36 @@ class Turtle(object):
         """
         The frame of the turtle
 
-        Invariant: value is a number > 0 and < number of animation frames
+        Invariant: value is an int > 0 and <= TURTLE_FRAMES
         """
-        return self._frame
+        return TURTLE_DIVE.frameAt(self._clock.getSteps()-self._phase,self._clock.getDt())
+
+    @property
+    def phase(self):
+        """
+        The steps of the clock of the turtle when it started diving
+
+        Invariant: value is an int >= 0
+        """
+        return self._phase
+
+    @property
+    def direction(self):
+        """
+        The direction of the turtle
+
+        Invariant: value is a string of either 'east' or 'west'
+        """
+        return self._direction
+
+    @property
+    def tag(self):
+        """
+        The type of object, shared by every turtle
+
+        Invariant: value is TAG_TURTLE
+        """
+        return TAG_TURTLE
 
     def __init__(self,direction,x,y):
         """
@@ -286,60 +404,201 @@ class Turtle(object):
         self._y = y
         self._w = GRID_SIZE
         self._h = GRID_SIZE
-        self._frame = 1
         self._direction = direction
-        self._animator = None
+        self._clock = Clock()
+        self._phase = 0
+        self._xs = None
+        self._index = None
+
+    def attach(self,xs,index):
+        """
+        Moves the x-coordinate into an array shared by every object in a lane.
+
+        Once attached, the lane can move all of its objects with a single
+        array operation.
+
+        Parameter xs: The array of x-coordinates for the lane
+        Precondition: xs is a 1-dimensional numpy array of floats
+
+        Parameter index: The position of this turtle in xs
+        Precondition: index is an int >= 0 and < len(xs)
+        """
+        xs[index] = self._x
+        self._xs = xs
+        self._index = index
+
+    def animate(self,clock):
+        """
+        Moves the dive animation onto a clock shared by every turtle in a lane.
+
+        The turtle starts diving at the current steps of the clock, and the
+        lane then ticks the clock once for all of its turtles.
+
+        Parameter clock: The clock of the lane
+        Precondition: clock is a Clock object
+        """
+        self._clock = clock
+        self._phase = clock.getSteps()
 
     def update(self,dt):
         """
         Updates the game objects each frame.
 
+        This only ticks the clock of a turtle on its own. A turtle in a lane
+        is animated by the clock of the lane instead.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        if not self._animator is None:
-            try:
-                self._animator.send(dt)
-            except:
-                self._animator = None
+        self._clock.tick(dt)
+
+
+class Obstacle(object):
+    """
+    A class representing a car, log, fly, exit or lane tile
+    """
+    # Attribute _kind: The kind of obstacle (the name of its image without .png)
+    # Invariant: _kind is a nonempty string
+    #
+    # Attribute _tag: The type of obstacle, used by the lanes instead of _kind
+    # Invariant: _tag is one of the TAG constants
+    #
+    # Attribute _x: The x-coordinate of the obstacle (until it is attached to a lane)
+    # Invariant: _x is a number (int or float)
+    #
+    # Attribute _xs: The array shared by a lane that holds the x-coordinate
+    # Invariant: _xs is a 1-dimensional numpy array of floats or None
+    #
+    # Attribute _index: The position of the x-coordinate in _xs
+    # Invariant: _index is an int >= 0 or None
+    #
+    # Attribute _y: The y-coordinate of the obstacle
+    # Invariant: _y is a number (int or float)
+    #
+    # Attribute _w: The width of the obstacle
+    # Invariant: _w is a number (int or float) > 0
+    #
+    # Attribute _h: The height of the obstacle
+    # Invariant: _h is a number (int or float) > 0
+    #
+
+    @property
+    def kind(self):
+        """
+        The kind of obstacle (the name of its image without .png)
+
+        Invariant: value is a nonempty string
+        """
+        return self._kind
+
+    @property
+    def tag(self):
+        """
+        The type of obstacle, used by the lanes instead of its kind
+
+        Invariant: value is one of the TAG constants
+        """
+        return self._tag
+
+    @property
+    def x(self):
+        """
+        The x-coordinate of the obstacle
+
+        Invariant: value is a number (int or float)
+        """
+        if self._xs is None:
+            return self._x
+        return float(self._xs[self._index])
+
+    @x.setter
+    def x(self,value):
+        assert type(value) == int or type(value) == float
+        if self._xs is None:
+            self._x = value
         else:
-            self._animator = self._animateTurtle()
-            next(self._animator)
-
-    def draw(self,canvas):
-        """
-        Draws the game objects to the canvas.
-
-        Parameter canvas: The root object used for drawing by a Widget
-        Precondition: canvas is a root object used for drawing by a Widget
-        """
-        if self._direction == 'east':
-            source = "atlas://turtle_east/frame" + str(self._frame)
-        elif self._direction == 'west':
-            source = "atlas://turtle_west/frame" + str(self._frame)
-        turtle = Rectangle(source=source, pos=(self._x,self._y), size=(self._w, self._h))
-        canvas.add(turtle)
-
-    def _animateTurtle(self):
-        """
-        Animates a sprite move over TURTLE_SPEED seconds.
-
-        This method is a coroutine that takes a break (so that the game
-        can redraw the image) every time it moves it. The coroutine takes
-        the dt as periodic input so it knows how many (parts of) seconds
-        to animate.
-
-        Parameter dt: The time since the last animation frame.
-        Precondition: dt is a float.
-        """
-        time = 0
-        animating = True
-        while animating:
-            if time >= TURTLE_SPEED:
-                animating = False
-            dt = (yield)
-            time += dt
-            frame = round(time/TURTLE_SPEED*8)
-            if frame == 0:
-                frame = 1
-            self._frame = frame
+            self._xs[self._index] = value
+
+    @property
+    def index(self):
+        """
+        The position of the x-coordinate in the array of its lane
+
+        Invariant: value is an int >= 0 or None
+        """
+        return self._index
+
+    @property
+    def y(self):
+        """
+        The y-coordinate of the obstacle
+
+        Invariant: value is a number (int or float)
+        """
+        return self._y
+
+    @property
+    def w(self):
+        """
+        The width of the obstacle
+
+        Invariant: value is a number (int or float) > 0
+        """
+        return self._w
+
+    @property
+    def h(self):
+        """
+        The height of the obstacle
+
+        Invariant: value is a number (int or float) > 0
+        """
+        return self._h
+
+    def __init__(self,kind,tag,x,y,w,h):
+        """
+        Initializes the obstacle
+
+        Parameter kind: The kind of obstacle (the name of its image without .png)
+        Precondition: kind is a nonempty string
+
+        Parameter tag: The type of obstacle
+        Precondition: tag is one of the TAG constants
+
+        Parameter x: The x-coordinate of the obstacle
+        Precondition: x is a number (int or float)
+
+        Parameter y: The y-coordinate of the obstacle
+        Precondition: y is a number (int or float)
+
+        Parameter w: The width of the obstacle
+        Precondition: w is a number (int or float) > 0
+
+        Parameter h: The height of the obstacle
+        Precondition: h is a number (int or float) > 0
+        """
+        self._kind = kind
+        self._tag = tag
+        self._x = x
+        self._y = y
+        self._w = w
+        self._h = h
+        self._xs = None
+        self._index = None
+
+    def attach(self,xs,index):
+        """
+        Moves the x-coordinate into an array shared by every object in a lane.
+
+        Once attached, the lane can move all of its objects with a single
+        array operation.
+
+        Parameter xs: The array of x-coordinates for the lane
+        Precondition: xs is a 1-dimensional numpy array of floats
+
+        Parameter index: The position of this obstacle in xs
+        Precondition: index is an int >= 0 and < len(xs)
+        """
+        xs[index] = self._x
+        self._xs = xs
+        self._index = index
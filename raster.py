@@ -0,0 +1,241 @@
+"""
+Occupancy grid module for Froggo
+
+A Rasterizer turns the state of a level into a compact numpy array, for
+analysis and as the input of an agent. The array has one channel per kind of
+thing on the board (see RASTER_CHANNELS), one row per lane (the first row is
+the bottom lane) and one column per grid square. With a scale above 1 every
+grid square is split into scale by scale cells.
+
+The objects are written as intervals: each object adds 1 where it starts and
+takes away 1 where it ends, and a running sum along each row fills in the
+cells in between. So the cost does not depend on how wide the objects are,
+and there is no Python loop over the objects or over the games of a batch.
+
+This module does not import kivy.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from level import *
+from constants import *
+import numpy
+
+
+class Rasterizer(object):
+    """
+    A class that draws the state of a level into occupancy grids.
+
+    A Rasterizer is made for one level and can draw a Level, a list of
+    Levels, or every game of a VecFroggoEnv, into the same kind of array.
+    """
+    # Attribute _scale: The number of cells across (and up) a grid square
+    # Invariant: _scale is an int > 0
+    #
+    # Attribute _rows: The number of lanes
+    # Invariant: _rows is an int > 0
+    #
+    # Attribute _cols: The number of grid squares across the level
+    # Invariant: _cols is an int > 0
+    #
+    # Attribute _lane: The lane of every object, in the order of the lanes
+    #                  and of the objects in each lane
+    # Invariant: _lane is a numpy array of ints
+    #
+    # Attribute _w: The width of every object
+    # Invariant: _w is a numpy array of floats, one per object
+    #
+    # Attribute _channel: The channel of every object (the channel of a
+    #                     turtle above the water), or -1 for exits and openings
+    # Invariant: _channel is a numpy array of CHANNEL constants or -1
+    #
+    # Attribute _turtle: Whether every object is a turtle
+    # Invariant: _turtle is a numpy array of bools, one per object
+    #
+    # Attribute _water: Whether each lane is water
+    # Invariant: _water is a numpy array of bools, one per lane
+    #
+    # Attribute _hedge: Whether each lane is a hedge
+    # Invariant: _hedge is a numpy array of bools, one per lane
+    #
+
+    def getShape(self):
+        """
+        Returns the shape of the grid of one state (channels, rows, columns)
+        """
+        return (len(RASTER_CHANNELS),self._rows*self._scale,self._cols*self._scale)
+
+    def __init__(self,leveldict,scale=1):
+        """
+        Initializes a rasterizer for the level.
+
+        Parameter leveldict: A compiled level dictionary
+        Precondition: leveldict is a dictionary with the width of every object
+
+        Parameter scale: The number of cells across (and up) a grid square
+        Precondition: scale is an int > 0
+        """
+        self._scale = scale
+        size = leveldict['size']
+        self._rows = len(leveldict['lanes'])
+        self._cols = size[0]
+        level = Level(size[0]*GRID_SIZE,(size[1]+1)*GRID_SIZE,leveldict,'')
+        channels = {TAG_CAR: CHANNEL_CAR, TAG_LOG: CHANNEL_LOG,
+            TAG_TURTLE: CHANNEL_TURTLE, TAG_FLY: CHANNEL_FLY}
+        lane = []
+        w = []
+        channel = []
+        self._water = numpy.zeros(self._rows,dtype=bool)
+        self._hedge = numpy.zeros(self._rows,dtype=bool)
+        lanes = level.getLanes()
+        for row in range(self._rows):
+            self._water[row] = isinstance(lanes[row],Water)
+            self._hedge[row] = isinstance(lanes[row],Hedge)
+            objs = [None]*len(lanes[row].getXs())
+            for obj in lanes[row].getObjs():
+                objs[obj.index] = obj
+            for obj in objs:
+                lane.append(row)
+                w.append(obj.w)
+                channel.append(channels.get(obj.tag,-1))
+        self._lane = numpy.array(lane,dtype=int)
+        self._w = numpy.array(w,dtype=float)
+        self._channel = numpy.array(channel,dtype=int)
+        self._turtle = self._channel == CHANNEL_TURTLE
+
+    def newBuffer(self,count=None):
+        """
+        Returns a new grid of zeros to draw into.
+
+        Parameter count: The number of states in a batch, or None for one
+        Precondition: count is an int > 0 or None
+        """
+        if count is None:
+            return numpy.zeros(self.getShape(),dtype=numpy.uint8)
+        return numpy.zeros((count,)+self.getShape(),dtype=numpy.uint8)
+
+    def render(self,level,out=None):
+        """
+        Returns the grid of a Level, drawn into out.
+
+        Parameter level: The level to draw
+        Precondition: level is a Level object of the level of this rasterizer
+
+        Parameter out: The grid to draw into, or None for a new one
+        Precondition: out is None or a numpy array returned by newBuffer()
+        """
+        if out is None:
+            out = self.newBuffer()
+        self.renderLevels([level],out[None])
+        return out
+
+    def renderLevels(self,levels,out=None):
+        """
+        Returns the grids of a list of Levels, drawn into out.
+
+        Parameter levels: The levels to draw
+        Precondition: levels is a nonempty list of Level objects of the level
+        of this rasterizer
+
+        Parameter out: The grids to draw into, or None for new ones
+        Precondition: out is None or a numpy array returned by
+        newBuffer(len(levels))
+        """
+        states = [self._levelState(level) for level in levels]
+        state = {}
+        for key in states[0]:
+            state[key] = numpy.array([s[key] for s in states])
+        return self.renderState(state,out)
+
+    def renderEnv(self,env,out=None):
+        """
+        Returns the grids of every game of a VecFroggoEnv, drawn into out.
+
+        Parameter env: The environment to draw
+        Precondition: env is a VecFroggoEnv playing the level of this
+        rasterizer
+
+        Parameter out: The grids to draw into, or None for new ones
+        Precondition: out is None or a numpy array returned by
+        newBuffer(env.getCount())
+        """
+        return self.renderState(env.getState(),out)
+
+    def renderState(self,state,out=None):
+        """
+        Returns the grids of a batch of states, drawn into out.
+
+        Parameter state: The states, in the form of VecFroggoEnv.getState
+        Precondition: state is a dictionary of numpy arrays with one row per
+        state
+
+        Parameter out: The grids to draw into, or None for new ones
+        Precondition: out is None or a numpy array returned by newBuffer,
+        with one grid per state
+        """
+        xs = state['xs']
+        count = len(xs)
+        if out is None:
+            out = self.newBuffer(count)
+        scale = self._scale
+        cell = GRID_SIZE/scale
+        width = self._cols*scale
+        channels = len(RASTER_CHANNELS)
+
+        # The cells each object covers (in part) are [start, end)
+        start = numpy.clip(numpy.floor(xs/cell),0,width).astype(int)
+        end = numpy.clip(numpy.ceil((xs+self._w)/cell),0,width).astype(int)
+        channel = numpy.where(self._turtle & state['submerged'],CHANNEL_SUBMERGED,self._channel)
+        shown = state['present'] & (channel >= 0) & (end > start)
+        game = numpy.broadcast_to(numpy.arange(count)[:,None],xs.shape)[shown]
+        rowstart = ((game*channels + channel[shown])*self._rows + self._lane[numpy.nonzero(shown)[1]])*(width+1)
+        size = count*channels*self._rows*(width+1)
+        edges = numpy.bincount(rowstart+start[shown],minlength=size)
+        edges -= numpy.bincount(rowstart+end[shown],minlength=size)
+        grid = numpy.cumsum(edges.reshape(count,channels,self._rows,width+1),axis=3)[...,:width] > 0
+
+        # The lanes themselves: the water, and the hedge by slot
+        grid[:,CHANNEL_WATER,self._water] = True
+        slots = numpy.repeat(state['slots'],scale,axis=2)
+        hedge = self._hedge[None,:,None]
+        grid[:,CHANNEL_HEDGE] = hedge & (slots == SLOT_HEDGE)
+        grid[:,CHANNEL_EXIT] = hedge & (slots == SLOT_EXIT)
+        grid[:,CHANNEL_OCCUPIED] = hedge & (slots == SLOT_OCCUPIED)
+
+        # The frog covers one grid square (scale+1 cells if it is between squares)
+        alive = numpy.nonzero(state['alive'])[0]
+        x = state['x'][alive]
+        first = numpy.floor(x/cell).astype(int)
+        cells = first[:,None] + numpy.arange(scale+1)
+        inside = (cells < numpy.ceil((x+GRID_SIZE)/cell)[:,None]) & (cells >= 0) & (cells < width)
+        games = numpy.broadcast_to(alive[:,None],cells.shape)[inside]
+        rows = numpy.broadcast_to(state['row'][alive][:,None],cells.shape)[inside]
+        grid[games,CHANNEL_FROG,rows,cells[inside]] = True
+
+        view = out.reshape(count,channels,self._rows,scale,width)
+        view[:] = grid[:,:,:,None,:]
+        return out
+
+    def _levelState(self,level):
+        """
+        Returns the state of a Level in the form of VecFroggoEnv.getState,
+        without the rows for games.
+
+        Parameter level: The level
+        Precondition: level is a Level object of the level of this rasterizer
+        """
+        lanes = level.getLanes()
+        xs = numpy.concatenate([lane.getXs() for lane in lanes])
+        present = numpy.concatenate([lane.getPresent() for lane in lanes])
+        # The turtles of each lane are in the order of its objects, as in _turtle
+        frames = numpy.concatenate([lane.getTurtleFrames() for lane in lanes])
+        submerged = numpy.zeros(len(self._channel),dtype=bool)
+        submerged[self._turtle] = frames >= TURTLE_FRAMES
+        slots = numpy.full((self._rows,self._cols),SLOT_HEDGE)
+        for row in numpy.nonzero(self._hedge)[0]:
+            slots[row] = lanes[row].getSlots()
+        frog = level.getFrog()
+        alive = isinstance(frog,Frog) and not frog.dead
+        return {'xs': xs, 'present': present, 'submerged': submerged,
+            'slots': slots, 'x': frog.x if alive else 0.0,
+            'row': int(frog.y // GRID_SIZE) if alive else 0, 'alive': alive}
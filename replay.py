@@ -0,0 +1,391 @@
+"""
+Replay module for Froggo
+
+A Recorder logs every change to the keys that steer the frog, with the
+simulation step it happened on, while a level is played. A recording can be
+played back without a window, as fast as the computer allows, to see how the
+level ended. This module does not import kivy. It can be run as a script:
+
+    python replay.py Recordings/level5-20210102-101500.frec
+
+A recording file starts with RECORD_MAGIC and then holds varints (7 bits per
+byte, low bits first): the length and UTF-8 bytes of the level file name,
+the window width and height, the flags (RECORD_BUFFERED if moves pressed in
+the cooldown were buffered), the number of steps played, the keys held when
+the level started, and then one pair per key change. The first number of a
+pair is the steps since the last change and the second is the index of the
+key in RECORD_KEYS times two, plus one if the key went down. A recording
+that starts with RECORD_MAGIC_V1 has no flags.
+
+The key changes are the keys held in each step, as the level saw them after
+the InputQueue, so a tap shorter than a step is a change down and then up on
+the next step.
+
+With --check, the script instead plays each level with random keys, saving
+the recording whenever a life is lost as the game does, and makes sure that
+every saved recording replays to the same state.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from compiler import compileLevel
+from level import *
+from constants import *
+import argparse
+import random
+import time
+import json
+import os
+
+
+def encodeVarint(value,out):
+    """
+    Appends value to out as a varint.
+
+    Parameter value: The number to encode
+    Precondition: value is an int >= 0
+
+    Parameter out: The bytes to append to
+    Precondition: out is a bytearray
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decodeVarint(data,pos):
+    """
+    Returns the tuple (value, next position) for the varint at data[pos].
+
+    Parameter data: The encoded bytes
+    Precondition: data is a bytes object
+
+    Parameter pos: The position of the varint
+    Precondition: pos is an int >= 0 and < len(data)
+    """
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError('recording ends in the middle of a number')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (value,pos)
+        shift += 7
+
+
+class Recorder(object):
+    """
+    A class that records the key changes while a level is played.
+    """
+    # Attribute _level: The JSON file of the level being played
+    # Invariant: _level is a string
+    #
+    # Attribute _width: The width of the window the level was built for
+    # Invariant: _width is an int > 0
+    #
+    # Attribute _height: The height of the window the level was built for
+    # Invariant: _height is an int > 0
+    #
+    # Attribute _buffered: Whether the level buffered moves pressed in the cooldown
+    # Invariant: _buffered is a bool
+    #
+    # Attribute _start: The step of the game the level started on
+    # Invariant: _start is an int >= 0
+    #
+    # Attribute _held: The keys held when the level started
+    # Invariant: _held is a list of indices in RECORD_KEYS
+    #
+    # Attribute _keys: Whether each recorded key is held now
+    # Invariant: _keys is a dictionary mapping RECORD_KEYS to bools
+    #
+    # Attribute _last: The step (from _start) of the last key change
+    # Invariant: _last is an int >= 0
+    #
+    # Attribute _events: The encoded key changes
+    # Invariant: _events is a bytearray
+    #
+    # Attribute _name: The file name to save the recording as
+    # Invariant: _name is a string
+    #
+
+    def getName(self):
+        """
+        Returns the file name to save the recording as
+        """
+        return self._name
+
+    def __init__(self,level,width,height,keydict,tick,buffered=False):
+        """
+        Initializes a recording of a level that starts on the given step.
+
+        Parameter level: The JSON file of the level
+        Precondition: level is a string
+
+        Parameter width: The width of the window the level was built for
+        Precondition: width is a number (int or float) > 0
+
+        Parameter height: The height of the window the level was built for
+        Precondition: height is a number (int or float) > 0
+
+        Parameter keydict: The keys held when the level starts
+        Precondition: keydict is a dictionary
+
+        Parameter tick: The step of the game the level starts on
+        Precondition: tick is an int >= 0
+
+        Parameter buffered: Whether the level buffers moves pressed in the cooldown
+        Precondition: buffered is a bool
+        """
+        self._level = level
+        self._width = int(round(width))
+        self._height = int(round(height))
+        self._buffered = buffered
+        self._start = tick
+        self._held = []
+        self._keys = {}
+        for index in range(len(RECORD_KEYS)):
+            key = RECORD_KEYS[index]
+            self._keys[key] = key in keydict and keydict[key]
+            if self._keys[key]:
+                self._held.append(index)
+        self._last = 0
+        self._events = bytearray()
+        stem = os.path.splitext(level)[0]
+        self._name = stem + '-' + time.strftime('%Y%m%d-%H%M%S') + '.frec'
+
+    def record(self,tick,key,down):
+        """
+        Records that a key went down or up on the given step.
+
+        Keys that do not steer the frog, and key repeats, are not recorded.
+
+        Parameter tick: The step of the game that the key changed before
+        Precondition: tick is an int >= the tick of the last change
+
+        Parameter key: The name of the key
+        Precondition: key is a string
+
+        Parameter down: True if the key went down and False if it went up
+        Precondition: down is a bool
+        """
+        if not key in self._keys or self._keys[key] == down:
+            return
+        self._keys[key] = down
+        tick -= self._start
+        encodeVarint(tick-self._last,self._events)
+        encodeVarint(RECORD_KEYS.index(key)*2 + (1 if down else 0),self._events)
+        self._last = tick
+
+    def getBytes(self,tick):
+        """
+        Returns the recording, played up to the given step, as bytes.
+
+        Parameter tick: The step of the game after the last step played, so
+        that every step before it is replayed
+        Precondition: tick is an int > the tick of the last change
+        """
+        out = bytearray(RECORD_MAGIC)
+        name = self._level.encode('utf-8')
+        encodeVarint(len(name),out)
+        out.extend(name)
+        encodeVarint(self._width,out)
+        encodeVarint(self._height,out)
+        encodeVarint(RECORD_BUFFERED if self._buffered else 0,out)
+        encodeVarint(tick-self._start,out)
+        encodeVarint(len(self._held),out)
+        for index in self._held:
+            encodeVarint(index,out)
+        out.extend(self._events)
+        return bytes(out)
+
+    def save(self,path,tick):
+        """
+        Writes the recording, played up to the given step, to a file.
+
+        Parameter path: The file to write
+        Precondition: path is a string in a folder that exists
+
+        Parameter tick: The step of the game after the last step played, so
+        that every step before it is replayed
+        Precondition: tick is an int > the tick of the last change
+        """
+        with open(path,'wb') as file:
+            file.write(self.getBytes(tick))
+
+
+def readRecording(data):
+    """
+    Returns the recording in data as a dictionary.
+
+    The dictionary has the level file name 'level', the window 'width' and
+    'height', whether moves were 'buffered', the number of steps played
+    'ticks', the keys 'held' at the start, and the key changes 'events' as a
+    list of (step, key, down).
+
+    Parameter data: The bytes of a recording
+    Precondition: data is a bytes object
+    """
+    magic = data[:len(RECORD_MAGIC)]
+    if magic != RECORD_MAGIC and magic != RECORD_MAGIC_V1:
+        raise ValueError('not a Froggo recording')
+    pos = len(RECORD_MAGIC)
+    length, pos = decodeVarint(data,pos)
+    level = data[pos:pos+length].decode('utf-8')
+    pos += length
+    width, pos = decodeVarint(data,pos)
+    height, pos = decodeVarint(data,pos)
+    flags = 0
+    if magic == RECORD_MAGIC:
+        flags, pos = decodeVarint(data,pos)
+    ticks, pos = decodeVarint(data,pos)
+    count, pos = decodeVarint(data,pos)
+    held = []
+    for i in range(count):
+        index, pos = decodeVarint(data,pos)
+        held.append(RECORD_KEYS[index])
+    events = []
+    tick = 0
+    while pos < len(data):
+        delta, pos = decodeVarint(data,pos)
+        code, pos = decodeVarint(data,pos)
+        tick += delta
+        events.append((tick,RECORD_KEYS[code//2],code % 2 == 1))
+    return {'level': level, 'width': width, 'height': height,
+        'buffered': (flags & RECORD_BUFFERED) != 0, 'ticks': ticks,
+        'held': held, 'events': events}
+
+
+def replay(recording,jsonpath,imagespath):
+    """
+    Returns a dictionary describing how the recorded level ended.
+
+    The level is played without a window, one SIM_STEP at a time, applying
+    each key change before the step it was recorded on, until the recording
+    ends or the level is over.
+
+    Parameter recording: The recording to play
+    Precondition: recording is a dictionary returned by readRecording
+
+    Parameter jsonpath: The path to the JSON folder
+    Precondition: jsonpath is a valid path
+
+    Parameter imagespath: The path to the Images folder
+    Precondition: imagespath is a valid path
+    """
+    start = time.perf_counter()
+    leveldict = compileLevel(os.path.join(jsonpath,recording['level']),imagespath)
+    level = Level(recording['width'],recording['height'],leveldict,imagespath,recording['buffered'])
+    keydict = {}
+    for key in recording['held']:
+        keydict[key] = True
+    events = recording['events']
+    pos = 0
+    state = STATE_ACTIVE
+    tick = 0
+    while tick < recording['ticks'] and state != STATE_COMPLETE:
+        while pos < len(events) and events[pos][0] <= tick:
+            keydict[events[pos][1]] = events[pos][2]
+            pos += 1
+        state = level.play(state,SIM_STEP,keydict,leveldict,{})
+        tick += 1
+    frog = level.getFrog()
+    if frog is None or frog == 'dead':
+        frog = None
+    else:
+        frog = [frog.x,frog.y]
+    return {'level': recording['level'], 'ticks': tick, 'seconds': tick*SIM_STEP,
+        'state': STATE_NAMES[state], 'lives': level.getLives(),
+        'safe': len(level.getSafeFrogs()), 'won': level.getWon(), 'frog': frog,
+        'replay_seconds': time.perf_counter() - start}
+
+
+def checkLevel(level,jsonpath,imagespath,seed,steps):
+    """
+    Returns a list of the recordings of a random play-through that did not
+    replay to the state the game was in when they were saved.
+
+    The level is played as the game plays it: the keys are recorded before
+    each step, and the recording is saved after a step that lost a life or
+    ended the level. Each item of the list is a dictionary with the step
+    it was saved after and the 'game' and 'replay' states and lives.
+
+    Parameter level: The JSON file of the level
+    Precondition: level is a string
+
+    Parameter jsonpath: The path to the JSON folder
+    Precondition: jsonpath is a valid path
+
+    Parameter imagespath: The path to the Images folder
+    Precondition: imagespath is a valid path
+
+    Parameter seed: The seed of the random keys
+    Precondition: seed is an int
+
+    Parameter steps: The most steps to play
+    Precondition: steps is an int > 0
+    """
+    rand = random.Random(seed)
+    width = 704
+    height = 640
+    leveldict = compileLevel(os.path.join(jsonpath,level),imagespath)
+    game = Level(width,height,leveldict,imagespath)
+    keydict = {}
+    recorder = Recorder(level,width,height,keydict,0)
+    state = STATE_ACTIVE
+    failures = []
+    for tick in range(steps):
+        if rand.random() < 0.2:
+            key = rand.choice(RECORD_KEYS)
+            keydict[key] = not (key in keydict and keydict[key])
+        for key in RECORD_KEYS:
+            recorder.record(tick,key,key in keydict and keydict[key])
+        lives = game.getLives()
+        state = game.play(state,SIM_STEP,keydict,leveldict,{})
+        if state == STATE_COMPLETE or game.getLives() < lives:
+            result = replay(readRecording(recorder.getBytes(tick+1)),jsonpath,imagespath)
+            if result['state'] != STATE_NAMES[state] or result['lives'] != game.getLives():
+                failures.append({'tick': tick, 'game': [STATE_NAMES[state],game.getLives()],
+                    'replay': [result['state'],result['lives']]})
+        if state == STATE_COMPLETE:
+            break
+    return failures
+
+
+def main(argv=None):
+    """
+    Replays the recordings given on the command line and prints the results
+    as JSON.
+
+    Parameter argv: The command line arguments, or None for sys.argv
+    Precondition: argv is a list of strings or None
+    """
+    parser = argparse.ArgumentParser(description='Replay Froggo recordings without a window.')
+    parser.add_argument('recordings', nargs='*', help='recording files to replay')
+    parser.add_argument('--check', action='store_true',
+        help='check that recordings saved at a lost life replay correctly')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the random keys for --check')
+    args = parser.parse_args(argv)
+    root = os.path.dirname(os.path.abspath(__file__))
+    if args.check:
+        results = {}
+        for level in LEVELS:
+            results[level] = checkLevel(level,os.path.join(root,'JSON'),
+                os.path.join(root,'Images'),args.seed,60*SIM_RATE)
+        print(json.dumps(results,indent=2))
+        return
+    results = []
+    for path in args.recordings:
+        with open(path,'rb') as file:
+            recording = readRecording(file.read())
+        result = replay(recording,os.path.join(root,'JSON'),os.path.join(root,'Images'))
+        result['file'] = path
+        results.append(result)
+    print(json.dumps(results,indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,748 @@
+"""
+Level solvability verifier for Froggo
+
+This script checks that every exit of a level can be reached, and that the
+level can be won, without playing it:
+
+    python solver.py level7.json
+
+It searches over every way the frog can move, one simulation step at a
+time. A state of the search is a frog that is still alive: its row, its
+x-coordinate, the way it faces and how much of its FROG_SPEED cooldown is
+left. All the states of a step share the real lanes of one Level, which are
+stepped once for all of them, so the cars, logs, the offscreen wrap and the
+turtle dives are exactly those of the game. The states are kept in numpy
+arrays, so each step tests every state against its lane at once.
+
+For each exit it reports the shortest sequence of key presses that reaches
+it, and for the whole level a sequence that fills every exit, which is
+checked by playing it back through Level.play. The exits are filled nearest
+first, and if that order leads to a dead end, every other order is tried.
+An exit that is not reached is proved unreachable when the search runs out
+of states, when its states repeat after a period of the lanes, or when a
+lane can never be stood on. Otherwise the search gives up after --horizon
+game seconds, and the result says why there is no proof: most often the
+lanes only repeat after more than --max-period steps, which is too long to
+search. A level is only reported as not winnable when every order of the
+exits was proved to fail.
+
+Looking for a proof searches --periods lane periods for each frog, which is
+slow: on a level like level1 with an exit that cannot be reached it takes
+from 20 seconds to a minute. A smaller --max-period skips it.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from compiler import compileLevel
+from level import *
+from constants import *
+import argparse
+import numpy
+import math
+import json
+import time
+import os
+
+
+# The largest lane period (in steps) that the search checks for repeats
+MAX_PERIOD = 40000
+
+# The number of lane periods that the search runs for to look for a proof
+PROOF_PERIODS = 4
+
+# The keys that move the frog, with its direction and move for each
+KEYS = ['up', 'down', 'right', 'left']
+DIRECTIONS = ['north', 'south', 'east', 'west']
+MOVES = [(0,1), (0,-1), (1,0), (-1,0)]
+
+
+def lanePeriod(leveldict,width):
+    """
+    Returns the number of steps after which every lane is back where it
+    started, or None if a lane does not repeat in a whole number of steps.
+
+    A lane moving right wraps around every width plus 3 offscreen buffers,
+    and a lane moving left every width plus 2, as in Lane.update. The
+    turtles dive every TURTLE_DIVE.getSteps(SIM_STEP) steps.
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+
+    Parameter width: The width of the window to animate in
+    Precondition: width is an int > 0
+    """
+    period = 1
+    buffer = leveldict['offscreen']*GRID_SIZE
+    turtles = False
+    for lane in leveldict['lanes']:
+        speed = lane.get('speed')
+        if speed is None or speed == 0:
+            continue
+        if type(speed) != int:
+            return None
+        length = width + (3*buffer if speed > 0 else 2*buffer)
+        distance = length*SIM_RATE
+        steps = distance // math.gcd(distance,abs(speed))
+        period = period*steps // math.gcd(period,steps)
+        for obj in lane.get('objects',[]):
+            turtles = turtles or obj['type'].startswith('turtle')
+    if turtles:
+        cycle = TURTLE_DIVE.getSteps(SIM_STEP)
+        period = period*cycle // math.gcd(period,cycle)
+    return period
+
+
+def blockedLane(leveldict):
+    """
+    Returns the row of a lane that the frog can never stand on, or None.
+
+    A water lane with nothing but flies (or nothing at all) in it cannot be
+    crossed, and a hedge without exits cannot be entered.
+
+    Parameter leveldict: A dictionary containing level information
+    Precondition: leveldict is a dictionary
+    """
+    lanes = leveldict['lanes']
+    for row in range(leveldict['start'][1]+1,len(lanes)):
+        types = []
+        for obj in lanes[row].get('objects',[]):
+            types.append(obj['type'])
+        if lanes[row]['type'] == 'water' and len([t for t in types if t != 'fly']) == 0:
+            return row
+        if lanes[row]['type'] == 'hedge' and not 'exit' in types:
+            return row
+    return None
+
+
+class Search(object):
+    """
+    A class that searches for the shortest ways from the start to the exits.
+
+    The key presses are kept as a tree: every state points at the last key
+    press that led to it, and every press at the one before it.
+    """
+    # Attribute _leveldict: The level being searched
+    # Invariant: _leveldict is a compiled level dictionary
+    #
+    # Attribute _width: The width of the window the level is built for
+    # Invariant: _width is an int > 0
+    #
+    # Attribute _height: The height of the window the level is built for
+    # Invariant: _height is an int > 0
+    #
+    # Attribute _tiles: The width of the tiles of every lane side by side
+    # Invariant: _tiles is an int > 0
+    #
+    # Attribute _lanes: The lanes of the level, at step _tick
+    # Invariant: _lanes is a list of Lane objects
+    #
+    # Attribute _widths: The width of every object in each lane, by index
+    # Invariant: _widths is a list of numpy arrays, one per lane
+    #
+    # Attribute _floats: Whether each object in each lane can carry the frog
+    # Invariant: _floats is a list of numpy arrays of bools, one per lane
+    #
+    # Attribute _tick: The number of times the lanes have been stepped
+    # Invariant: _tick is an int >= 0
+    #
+    # Attribute _edges: The left and right edges of the hitbox of the frog
+    #                   facing each way, from its x-coordinate
+    # Invariant: _edges is a numpy array of shape (4, 2)
+    #
+    # Attribute _parents: The press before each key press, or -1
+    # Invariant: _parents is a list of ints
+    #
+    # Attribute _presses: The step and key of each key press
+    # Invariant: _presses is a list of (int, int) tuples
+    #
+
+    def getExits(self):
+        """
+        Returns the exits that are not filled as a list of (row, column).
+        """
+        exits = []
+        for pos in range(len(self._lanes)):
+            if isinstance(self._lanes[pos],Hedge):
+                slots = self._lanes[pos].getSlots()
+                for col in range(len(slots)):
+                    if slots[col] == SLOT_EXIT:
+                        exits.append((pos,col))
+        return exits
+
+    def __init__(self,leveldict,width,height,tick,occupied):
+        """
+        Initializes a search that starts after tick steps of the game, with
+        the given exits already filled (in order).
+
+        Parameter leveldict: A compiled level dictionary
+        Precondition: leveldict is a dictionary with the width of every object
+
+        Parameter width: The width of the window to animate in
+        Precondition: width is an int > 0
+
+        Parameter height: The height of the window to animate in
+        Precondition: height is an int > 0
+
+        Parameter tick: The number of steps before the frog starts
+        Precondition: tick is an int >= 0
+
+        Parameter occupied: The exits already filled
+        Precondition: occupied is a list of (row, column) tuples
+        """
+        self._leveldict = leveldict
+        self._width = width
+        self._height = height
+        self._tiles = leveldict['size'][0]*GRID_SIZE
+        self._lanes = Level(width,height,leveldict,'').getLanes()
+        self._widths = []
+        self._floats = []
+        for row, col in occupied:
+            self._lanes[row].getSlots()[col] = SLOT_OCCUPIED
+        for lane in self._lanes:
+            widths = numpy.zeros(len(lane.getXs()))
+            floats = numpy.zeros(len(lane.getXs()),dtype=bool)
+            for obj in lane.getObjs():
+                widths[obj.index] = obj.w
+                floats[obj.index] = obj.tag != TAG_FLY
+            self._widths.append(widths)
+            self._floats.append(floats)
+        # The lanes after the row of an exit are not stepped when it is filled
+        for pos in range(len(self._lanes)):
+            lane = self._lanes[pos]
+            if isinstance(lane,Road) or isinstance(lane,Water):
+                skipped = len([goal for goal in occupied if goal[0] < pos])
+                for step in range(tick-skipped):
+                    lane.update(SIM_STEP)
+        self._tick = tick
+        probe = Frog(leveldict)
+        self._edges = numpy.zeros((4,2))
+        for pos in range(4):
+            probe.direction = DIRECTIONS[pos]
+            probe.x = 0
+            self._edges[pos] = (probe.left,probe.right)
+        self._parents = []
+        self._presses = []
+
+    def run(self,cool,horizon,period,first):
+        """
+        Returns the tuple (found, proved).
+
+        found maps each exit reached, as (row, column), to the tuple (tick, cool,
+        press): the step it was reached on, the cooldown of the frog then and
+        the last key press on the way (or -1). proved is True if the exits
+        not found can never be reached.
+
+        Parameter cool: The cooldown of the frog when it starts
+        Precondition: cool is a number (int or float)
+
+        Parameter horizon: The largest number of steps to search
+        Precondition: horizon is an int > 0
+
+        Parameter period: The period of the lanes in steps, or None
+        Precondition: period is an int > 0 or None
+
+        Parameter first: True to stop at the first exit reached
+        Precondition: first is a bool
+        """
+        start = self._leveldict['start']
+        xs = numpy.array([float(start[0]*GRID_SIZE)])
+        rows = numpy.array([start[1]])
+        dirs = numpy.array([0])
+        cools = numpy.array([float(cool)])
+        nodes = numpy.array([-1])
+        exits = len(self.getExits())
+        found = {}
+        history = []
+        end = self._tick + horizon
+        while self._tick < end:
+            tick = self._tick
+            xs, rows, dirs, cools, nodes, keys = self._expand(xs,rows,dirs,cools,nodes)
+            self._step()
+            xs, alive, goals = self._collide(xs,rows,dirs)
+            for pos in numpy.nonzero(goals >= 0)[0]:
+                goal = (int(rows[pos]),int(goals[pos]))
+                if not goal in found:
+                    found[goal] = (tick,float(cools[pos]),self._press(nodes[pos],keys[pos],tick))
+            keep = numpy.nonzero(alive)[0]
+            keep = keep[self._dedup(xs[keep],rows[keep],dirs[keep],cools[keep])]
+            xs, rows, dirs, cools = xs[keep], rows[keep], dirs[keep], cools[keep]
+            nodes, keys = nodes[keep], keys[keep]
+            for pos in numpy.nonzero(keys >= 0)[0]:
+                nodes[pos] = self._press(nodes[pos],keys[pos],tick)
+            if len(found) == exits or (first and len(found) > 0):
+                return (found,False)
+            if len(xs) == 0:
+                return (found,True)
+            if not period is None:
+                # Once the states repeat a period later, nothing new can happen
+                history.append(hash((numpy.round(xs).tobytes(),rows.tobytes(),
+                    dirs.tobytes(),numpy.round(cools*SIM_RATE).tobytes())))
+                if len(history) > period and history[-1] == history[-1-period]:
+                    return (found,True)
+        return (found,False)
+
+    def unpack(self,press):
+        """
+        Returns the key presses up to the given one as a list of (tick, key),
+        in order.
+
+        Parameter press: The last key press, or -1
+        Precondition: press is an int returned by run
+        """
+        result = []
+        while press >= 0:
+            tick, key = self._presses[press]
+            result.append((tick,KEYS[key]))
+            press = self._parents[press]
+        result.reverse()
+        return result
+
+    def _press(self,parent,key,tick):
+        """
+        Returns the key press that leads to a state.
+
+        A new press is added after parent if a key was pressed, and
+        otherwise the state keeps the press of the state it came from.
+
+        Parameter parent: The last press before this step, or -1
+        Precondition: parent is an int
+
+        Parameter key: The key pressed, or -1 if no key was pressed
+        Precondition: key is an int >= -1 and < 4
+
+        Parameter tick: The step the key was pressed on
+        Precondition: tick is an int >= 0
+        """
+        if key < 0:
+            return int(parent)
+        self._parents.append(int(parent))
+        self._presses.append((tick,int(key)))
+        return len(self._presses)-1
+
+    def _step(self):
+        """
+        Moves every lane forward by one step.
+        """
+        for lane in self._lanes:
+            if isinstance(lane,Road) or isinstance(lane,Water):
+                lane.update(SIM_STEP)
+        self._tick += 1
+
+    def _expand(self,xs,rows,dirs,cools,nodes):
+        """
+        Returns the states after the keys are read, as in Level.update, as
+        the tuple (xs, rows, dirs, cools, nodes, keys).
+
+        A frog still cooling down only waits. A frog that can move may also
+        press any key, which turns it (even if it cannot move) and starts
+        its cooldown, as in Level._keysDown. keys is the key pressed by each
+        new state, or -1.
+
+        Parameter xs, rows, dirs, cools, nodes: The states
+        Precondition: They are numpy arrays of the same length
+        """
+        waiting = cools > 0
+        parts = [(xs,rows,dirs,numpy.where(waiting,cools-SIM_STEP,cools),nodes,
+            numpy.full(len(xs),-1))]
+        ready = numpy.nonzero(~waiting)[0]
+        x = xs[ready]
+        row = rows[ready]
+        for key in range(4):
+            dx, dy = MOVES[key]
+            left = x + self._edges[key][0]
+            right = x + self._edges[key][1]
+            if dy > 0:
+                moves = (row+3)*GRID_SIZE <= self._height
+                moves &= ~self._hedge(row+1,x,left,right,'north')
+            elif dy < 0:
+                moves = (row-1)*GRID_SIZE >= 0
+                moves &= ~self._hedge(row-1,x,left,right,'south')
+            else:
+                if dx > 0:
+                    moves = x + 2*GRID_SIZE <= self._width
+                else:
+                    moves = x - GRID_SIZE >= 0
+                moves &= ~self._hedge(row,x,left,right,'side')
+            parts.append((x+dx*GRID_SIZE*moves,row+dy*moves,numpy.full(len(x),key),
+                numpy.full(len(x),FROG_SPEED),nodes[ready],numpy.full(len(x),key)))
+        return tuple(numpy.concatenate(part) for part in zip(*parts))
+
+    def _hedge(self,row,x,left,right,side):
+        """
+        Returns a numpy array of bools, True where a hedge stops the frog
+        from moving into the given row, as in Level._hedgePresent.
+
+        Parameter row: The rows being moved into
+        Precondition: row is a numpy array of ints
+
+        Parameter x: The x-coordinates of the frogs
+        Precondition: x is a numpy array of floats of the length of row
+
+        Parameter left: The left edges of the hitboxes of the frogs
+        Precondition: left is a numpy array of floats of the length of row
+
+        Parameter right: The right edges of the hitboxes of the frogs
+        Precondition: right is a numpy array of floats of the length of row
+
+        Parameter side: 'north' for hedgeCollision, 'south' for enterFromNorth
+        or 'side' for enterFromSide
+        Precondition: side is one of those strings
+        """
+        blocked = numpy.zeros(len(x),dtype=bool)
+        tiles = (0 < right) & (self._tiles > left)
+        for pos in range(len(self._lanes)):
+            lane = self._lanes[pos]
+            if not isinstance(lane,Hedge):
+                continue
+            here = row == pos
+            if side == 'south':
+                blocked |= here & tiles
+                continue
+            slots = numpy.array(lane.getSlots())
+            col, inside = self._columns(x,len(slots))
+            slot = numpy.where(inside,slots[col],-1)
+            if side == 'side':
+                blocked |= here & (slot == SLOT_OPEN)
+                continue
+            # A safe frog blocks any hitbox it overlaps
+            hit = numpy.zeros(len(x),dtype=bool)
+            first = numpy.floor(left/GRID_SIZE).astype(int)
+            for near in [first,first+1]:
+                valid = (near >= 0) & (near < len(slots))
+                slot2 = numpy.where(valid,slots[numpy.clip(near,0,len(slots)-1)],-1)
+                hit |= (slot2 == SLOT_OCCUPIED) & (left < (near+1)*GRID_SIZE) & \
+                    (right > near*GRID_SIZE)
+            through = (slot == SLOT_EXIT) | (slot == SLOT_OPEN)
+            blocked |= here & (hit | (~through & tiles))
+        return blocked
+
+    def _columns(self,x,count):
+        """
+        Returns the tuple (columns, inside): the column whose square strictly
+        contains the center of each frog, as in Hedge._columnOf, and whether
+        there is such a column.
+
+        Parameter x: The x-coordinates of the frogs
+        Precondition: x is a numpy array of floats
+
+        Parameter count: The number of columns
+        Precondition: count is an int > 0
+        """
+        center = x + GRID_SIZE/2
+        col = numpy.floor(center/GRID_SIZE).astype(int)
+        inside = (col*GRID_SIZE != center) & (col >= 0) & (col < count)
+        return (numpy.clip(col,0,count-1),inside)
+
+    def _collide(self,xs,rows,dirs):
+        """
+        Returns the states after the lanes moved, as in Level._collideLane,
+        as the tuple (xs, alive, goals).
+
+        alive is False where the frog died or reached an exit, and goals is
+        the column of the exit reached, or -1. As in Hedge.frogSafe, a frog
+        that lands on a filled exit is safe too, but it fills no exit, so it
+        is no goal (the hedge stops a frog from moving onto a filled exit, so
+        this does not happen in the levels). A fly is eaten as soon as the
+        frog touches it, so it never carries the frog and is left out here.
+
+        Parameter xs, rows, dirs: The states
+        Precondition: They are numpy arrays of the same length
+        """
+        xs = xs.copy()
+        alive = numpy.ones(len(xs),dtype=bool)
+        goals = numpy.full(len(xs),-1)
+        for pos in range(len(self._lanes)):
+            lane = self._lanes[pos]
+            here = numpy.nonzero(rows == pos)[0]
+            if len(here) == 0 or isinstance(lane,Grass):
+                continue
+            x = xs[here]
+            left = x + self._edges[dirs[here],0]
+            right = x + self._edges[dirs[here],1]
+            objx = lane.getXs()
+            objw = self._widths[pos]
+            if isinstance(lane,Road):
+                hits = (objx < right[:,None]) & (objx+objw > left[:,None])
+                alive[here] = ~hits.any(axis=1)
+            elif isinstance(lane,Water):
+                floats = self._floats[pos].copy()
+                for obj in lane.getObjs():
+                    if obj.tag == TAG_TURTLE and obj.frame >= TURTLE_FRAMES:
+                        floats[obj.index] = False
+                center = (x + GRID_SIZE/2)[:,None]
+                carried = ((center < objx+objw) & (center > objx) & floats).any(axis=1)
+                x = numpy.where(carried,x+SIM_STEP*lane.getSpeed(),x)
+                center = x + GRID_SIZE/2
+                offscreen = (center < 0) | (center > self._width)
+                water = (0 < right) & (self._tiles > left)
+                alive[here] = numpy.where(carried,~offscreen,~water)
+                xs[here] = x
+            elif isinstance(lane,Hedge):
+                slots = numpy.array(lane.getSlots())
+                col, inside = self._columns(x,len(slots))
+                safe = inside & ((slots[col] == SLOT_EXIT) | (slots[col] == SLOT_OCCUPIED))
+                goals[here] = numpy.where(safe & (slots[col] == SLOT_EXIT),col,-1)
+                alive[here] = ~safe
+        return (xs,alive,goals)
+
+    def _dedup(self,xs,rows,dirs,cools):
+        """
+        Returns the indices of the states to keep.
+
+        States in the same row, at the same x-coordinate (to the nearest
+        pixel) and facing the same way are the same state, and only the one
+        that can move soonest is kept, since it can do anything the others
+        can.
+
+        Parameter xs, rows, dirs, cools: The states
+        Precondition: They are numpy arrays of the same length
+        """
+        if len(xs) == 0:
+            return numpy.zeros(0,dtype=int)
+        span = self._width + 8*GRID_SIZE
+        keys = (rows*span + numpy.round(xs).astype(int) + 4*GRID_SIZE)*4 + dirs
+        order = numpy.lexsort((cools,keys))
+        keys = keys[order]
+        first = numpy.ones(len(keys),dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        return order[first]
+
+
+def noProof(period,limit,maxPeriod=MAX_PERIOD):
+    """
+    Returns why an exit that was not reached could not be proved unreachable.
+
+    Parameter period: The period of the lanes in steps, or None
+    Precondition: period is an int > 0 or None
+
+    Parameter limit: The number of steps that were searched
+    Precondition: limit is an int > 0
+
+    Parameter maxPeriod: The largest lane period that was checked for repeats
+    Precondition: maxPeriod is an int >= 0
+    """
+    if period is None:
+        return 'the lanes never repeat, so no proof is possible for this level'
+    if period > maxPeriod:
+        return ('the lanes only repeat every %d steps (more than %d), so no proof '
+            'is possible for this level' % (period,maxPeriod))
+    return 'the states did not repeat within the %d steps searched' % limit
+
+
+def fillExits(leveldict,width,height,limit,period,count,tick,cool,occupied,legs):
+    """
+    Returns the tuple (path, proved) for filling the exits left, one frog at
+    a time.
+
+    path is a list with the tuple (search, landed, press) for each frog: its
+    Search, the step it fills its exit on and its last key press, or None if
+    no order of the exits was found that fills them all. The nearest exit is tried first, and the others in turn if it
+    leads to a dead end. proved is True if path is not None, or if every
+    dead end was proved.
+
+    The search for each frog is kept in legs, by the step it starts on, its
+    cooldown and the exits already filled, so it is only made once.
+
+    Parameter leveldict: A compiled level dictionary
+    Precondition: leveldict is a dictionary with the width of every object
+
+    Parameter width: The width of the window to animate in
+    Precondition: width is an int > 0
+
+    Parameter height: The height of the window to animate in
+    Precondition: height is an int > 0
+
+    Parameter limit: The largest number of steps to search for each frog
+    Precondition: limit is an int > 0
+
+    Parameter period: The period of the lanes in steps, or None not to check
+    Precondition: period is an int > 0 or None
+
+    Parameter count: The number of exits in the level
+    Precondition: count is an int >= 0
+
+    Parameter tick: The number of steps before the next frog starts
+    Precondition: tick is an int >= 0
+
+    Parameter cool: The cooldown of the next frog when it starts
+    Precondition: cool is a number (int or float)
+
+    Parameter occupied: The exits already filled, in order
+    Precondition: occupied is a list of (row, column) tuples
+
+    Parameter legs: The searches made so far
+    Precondition: legs is a dictionary mapping (tick, cool, exits) to the
+    tuple (search, found, proved) of Search.run
+    """
+    if len(occupied) == count:
+        return ([],True)
+    key = (tick,cool,tuple(sorted(occupied)))
+    if not key in legs:
+        search = Search(leveldict,width,height,tick,occupied)
+        found, proved = search.run(cool,limit,period,False)
+        legs[key] = (search,found,proved)
+    search, found, proved = legs[key]
+    proved = proved or len(found) == count-len(occupied)
+    for goal in sorted(found,key=lambda g: found[g][0]):
+        landed, after, press = found[goal]
+        path, sure = fillExits(leveldict,width,height,limit,period,count,
+            landed+1,after,occupied+[goal],legs)
+        if not path is None:
+            return ([(search,landed,press)]+path,True)
+        proved = proved and sure
+    return (None,proved)
+
+
+def playInputs(leveldict,width,height,inputs,steps):
+    """
+    Returns True if playing the inputs through Level.play wins the level.
+
+    Parameter leveldict: A compiled level dictionary
+    Precondition: leveldict is a dictionary with the width of every object
+
+    Parameter width: The width of the window to animate in
+    Precondition: width is an int > 0
+
+    Parameter height: The height of the window to animate in
+    Precondition: height is an int > 0
+
+    Parameter inputs: The keys pressed at each step
+    Precondition: inputs is a dictionary mapping ints to lists of keys
+
+    Parameter steps: The number of steps to play
+    Precondition: steps is an int >= 0
+    """
+    level = Level(width,height,leveldict,'')
+    state = STATE_ACTIVE
+    for step in range(steps):
+        keydict = {}
+        for key in inputs.get(step,[]):
+            keydict[key] = True
+        state = level.play(state,SIM_STEP,keydict,leveldict,{})
+        if state == STATE_COMPLETE:
+            break
+    return state == STATE_COMPLETE and level.getWon()
+
+
+def verifyLevel(leveldict,name,horizon,maxPeriod=MAX_PERIOD,periods=PROOF_PERIODS):
+    """
+    Returns a dictionary describing how each exit, and the whole level, can
+    be reached (or why it cannot).
+
+    When the lanes repeat within maxPeriod steps, each search runs for at
+    least periods lane periods, so that it can prove that an exit cannot be
+    reached. With the defaults that is up to about 160000 steps for each
+    frog, which takes from 20 seconds to a minute when an exit of a level
+    like level1 cannot be reached.
+
+    Parameter leveldict: A compiled level dictionary
+    Precondition: leveldict is a dictionary with the width of every object
+
+    Parameter name: The name of the level
+    Precondition: name is a string
+
+    Parameter horizon: The largest number of steps to search for each frog
+    when there is no proof to look for
+    Precondition: horizon is an int > 0
+
+    Parameter maxPeriod: The largest lane period that is checked for repeats
+    Precondition: maxPeriod is an int >= 0
+
+    Parameter periods: The number of lane periods to search for a proof
+    Precondition: periods is an int >= 0
+    """
+    started = time.perf_counter()
+    width = leveldict['size'][0]*GRID_SIZE
+    height = (len(leveldict['lanes'])+1)*GRID_SIZE
+    period = lanePeriod(leveldict,width)
+    checked = period
+    if not period is None and period > maxPeriod:
+        checked = None
+    limit = horizon if checked is None else max(horizon,periods*checked)
+    blocked = blockedLane(leveldict)
+
+    search = Search(leveldict,width,height,0,[])
+    found, proved = search.run(0,limit,checked,False)
+    exits = []
+    for goal in search.getExits():
+        result = {'row': goal[0], 'column': goal[1], 'reachable': goal in found}
+        if goal in found:
+            result['seconds'] = (found[goal][0]+1)*SIM_STEP
+            result['presses'] = [[tick,key] for tick, key in search.unpack(found[goal][2])]
+        elif proved:
+            result['proof'] = 'the search ran out of new states'
+        elif not blocked is None and goal[0] > blocked:
+            result['proof'] = 'lane %d can never be stood on' % blocked
+        else:
+            result['proof'] = None
+            result['unproved'] = noProof(period,limit,maxPeriod)
+        exits.append(result)
+
+    # The search above is the one for the first frog
+    legs = {(0,0,()): (search,found,proved)}
+    path, proved = fillExits(leveldict,width,height,limit,checked,len(exits),0,0,[],legs)
+    result = {'level': name, 'period': period, 'exits': exits,
+        'winnable': not path is None}
+    # Every exit has to be filled, so one past a blocked lane is a proof
+    for goal in exits:
+        proved = proved or (not blocked is None and goal['row'] > blocked)
+    if path is None and not proved:
+        result['winnable'] = None
+        result['unproved'] = noProof(period,limit,maxPeriod)
+    elif not path is None:
+        inputs = {}
+        continues = 0
+        steps = 0
+        for pos in range(len(path)):
+            search, landed, press = path[pos]
+            for step, key in search.unpack(press):
+                inputs.setdefault(step-continues,[]).append(key)
+            if pos < len(path)-1:
+                # 'c' brings the next frog in the same step, which steps the lanes again
+                inputs.setdefault(landed-continues,[]).append('c')
+                continues += 1
+            steps = landed+1-continues
+        presses = []
+        for step in sorted(inputs):
+            for key in inputs[step]:
+                presses.append([step,key])
+        result['win'] = {'seconds': steps*SIM_STEP, 'presses': presses,
+            'verified': playInputs(leveldict,width,height,inputs,steps)}
+    result['search_seconds'] = time.perf_counter() - started
+    return result
+
+
+def main(argv=None):
+    """
+    Verifies the levels given on the command line (or every level) and prints
+    the results as JSON.
+
+    Parameter argv: The command line arguments, or None for sys.argv
+    Precondition: argv is a list of strings or None
+    """
+    parser = argparse.ArgumentParser(description='Check that Froggo levels can be won.')
+    parser.add_argument('levels', nargs='*', default=LEVELS, help='JSON files of the levels')
+    parser.add_argument('--horizon', type=float, default=120, help='game seconds to search for each frog')
+    parser.add_argument('--max-period', type=int, default=MAX_PERIOD,
+        help='largest lane period in steps to check for repeats (0 to never look for a proof)')
+    parser.add_argument('--periods', type=int, default=PROOF_PERIODS,
+        help='lane periods to search for each frog when looking for a proof')
+    parser.add_argument('--output', help='file to write the JSON to (default: print it)')
+    args = parser.parse_args(argv)
+    root = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for name in args.levels:
+        path = name if os.path.exists(name) else os.path.join(root,'JSON',name)
+        leveldict = compileLevel(path,os.path.join(root,'Images'))
+        results.append(verifyLevel(leveldict,os.path.basename(path),int(args.horizon/SIM_STEP),
+            args.max_period,args.periods))
+    text = json.dumps(results,indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output,'w') as file:
+            file.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
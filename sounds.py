@@ -0,0 +1,155 @@
+"""
+Sound module for Froggo
+
+Every sound effect is loaded once when the game starts. Each effect has a
+few voices, so that a sound can start again while the last one is still
+playing instead of cutting it off. The plays and the time spent loading and
+starting the sounds are shown in the performance HUD.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from kivy.core.audio import SoundLoader
+from constants import *
+import time
+
+
+class VoicePool(object):
+    """
+    A class representing the voices that play a single sound effect.
+
+    It has a play method, so it can be used wherever a Sound is played.
+    """
+    # Attribute _voices: The loaded copies of the sound
+    # Invariant: _voices is a nonempty list of kivy Sound objects
+    #
+    # Attribute _next: The voice to try first on the next play
+    # Invariant: _next is an int >= 0 and < len(_voices)
+    #
+    # Attribute _plays: The number of times the sound was played
+    # Invariant: _plays is an int >= 0
+    #
+    # Attribute _stolen: The number of plays that had to stop a playing voice
+    # Invariant: _stolen is an int >= 0
+    #
+    # Attribute _total: The total time in seconds spent starting the sound
+    # Invariant: _total is a float >= 0
+    #
+    # Attribute _worst: The longest time in seconds spent starting the sound
+    # Invariant: _worst is a float >= 0
+    #
+    # Attribute _load: The time in seconds spent loading the voices
+    # Invariant: _load is a float >= 0
+    #
+
+    def __init__(self,source,voices):
+        """
+        Initializes the pool by loading the sound once for each voice.
+
+        A kivy Sound is a single playback: it has one state, and playing or
+        stopping it again restarts or stops that playback. Kivy cannot make
+        a Sound from a file that is already loaded, so each voice loads (and
+        keeps) its own copy of the file. The sound effects are short WAV
+        files (460 KB in all), so with SOUND_VOICES voices this is about 1.4
+        MB, and the time it takes is kept and shown in the HUD.
+
+        Parameter source: The sound file
+        Precondition: source is a string naming a sound in a resource path
+
+        Parameter voices: The number of voices
+        Precondition: voices is an int > 0
+        """
+        start = time.perf_counter()
+        self._voices = []
+        for i in range(voices):
+            sound = SoundLoader.load(source)
+            if not sound is None:
+                self._voices.append(sound)
+        self._next = 0
+        self._plays = 0
+        self._stolen = 0
+        self._total = 0.0
+        self._worst = 0.0
+        self._load = time.perf_counter() - start
+
+    def play(self):
+        """
+        Plays the sound on a voice that is not playing.
+
+        If every voice is playing, the oldest one is started again.
+        """
+        if len(self._voices) == 0:
+            return
+        start = time.perf_counter()
+        voice = None
+        for i in range(len(self._voices)):
+            pos = (self._next + i) % len(self._voices)
+            if self._voices[pos].state != 'play':
+                voice = self._voices[pos]
+                break
+        if voice is None:
+            pos = self._next
+            voice = self._voices[pos]
+            voice.stop()
+            self._stolen += 1
+        voice.play()
+        self._next = (pos + 1) % len(self._voices)
+        elapsed = time.perf_counter() - start
+        self._plays += 1
+        self._total += elapsed
+        self._worst = max(self._worst,elapsed)
+
+    def getStats(self):
+        """
+        Returns a dictionary with the number of plays, the number of plays
+        that stopped a playing voice, the mean and worst time in seconds
+        spent starting the sound, and the time in seconds spent loading it.
+        """
+        mean = 0.0
+        if self._plays > 0:
+            mean = self._total/self._plays
+        return {'plays': self._plays, 'stolen': self._stolen,\
+            'mean': mean, 'worst': self._worst, 'load': self._load}
+
+
+class SoundBank(object):
+    """
+    A class that loads every sound effect of the game once.
+    """
+    # Attribute _sounds: The voice pool for each sound effect
+    # Invariant: _sounds is a dictionary mapping names to VoicePool objects
+    #
+
+    def getSounds(self):
+        """
+        Returns the dictionary mapping the name of each sound effect to its
+        voice pool.
+
+        This dictionary can be passed to a level as its sound dictionary.
+        """
+        return self._sounds
+
+    def __init__(self,voices=SOUND_VOICES):
+        """
+        Initializes the bank by loading every sound effect.
+
+        This must be called after the Sounds folder has been added to the
+        kivy resource paths.
+
+        Parameter voices: The number of voices for each sound effect
+        Precondition: voices is an int > 0
+        """
+        self._sounds = {}
+        self._sounds['ribbit'] = VoicePool(RIBBIT_SOUND,voices)
+        self._sounds['squish'] = VoicePool(SQUISH_SOUND,voices)
+        self._sounds['activation'] = VoicePool(ACTIVATION_SOUND,voices)
+
+    def getStats(self):
+        """
+        Returns a dictionary mapping the name of each sound effect to its
+        play counters (see VoicePool.getStats).
+        """
+        stats = {}
+        for name in self._sounds:
+            stats[name] = self._sounds[name].getStats()
+        return stats
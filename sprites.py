@@ -0,0 +1,142 @@
+"""
+Sprite module for Froggo
+
+This module resolves every sprite image (and every frame of the animated
+sprites) to a kivy Texture once, so that the models only swap textures
+instead of looking up image files every frame. The messages shown to the
+player are rendered to textures once in the same way.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from kivy.core.image import Image as CoreImage
+from kivy.core.text import Label as CoreLabel
+from constants import *
+
+
+# The number of frames in the skull and turtle atlases
+NUM_FRAMES = 8
+
+# A dictionary mapping image files and atlas URIs to textures
+_textures = {}
+# A dictionary mapping image files to the same textures rotated by 180 degrees
+_flipped = {}
+# A dictionary mapping frog directions to textures
+_frogs = {}
+# A list of skull textures, indexed by frame number
+_skulls = []
+# A dictionary mapping turtle directions to lists of textures, indexed by frame number
+_turtles = {}
+# A dictionary mapping (text, font size, color) to rendered text textures
+_texts = {}
+
+
+def getTexture(source):
+    """
+    Returns the texture for the given image, loading it the first time.
+
+    Parameter source: The image file or atlas URI
+    Precondition: source is a string naming an image in a resource path
+    """
+    if not source in _textures:
+        _textures[source] = CoreImage(source).texture
+    return _textures[source]
+
+
+def getFlipped(source):
+    """
+    Returns the texture for the given image rotated by 180 degrees.
+
+    The flipped texture is a region of the original texture with its texture
+    coordinates reversed, so the image is only decoded once and nothing is
+    written to disk.
+
+    Parameter source: The image file
+    Precondition: source is a string naming an image in a resource path
+    """
+    if not source in _flipped:
+        texture = getTexture(source)
+        region = texture.get_region(0,0,texture.width,texture.height)
+        region.flip_horizontal()
+        region.flip_vertical()
+        _flipped[source] = region
+    return _flipped[source]
+
+
+def loadSprites():
+    """
+    Loads the textures for every frog direction, skull frame and turtle frame.
+
+    This must be called once at startup, after the Images folder has been
+    added to the kivy resource paths.
+    """
+    _frogs['north'] = getTexture(FROG_NORTH)
+    _frogs['south'] = getTexture(FROG_SOUTH)
+    _frogs['east'] = getTexture(FROG_EAST)
+    _frogs['west'] = getTexture(FROG_WEST)
+    # Index 0 is unused so that the lists can be indexed by frame number
+    _skulls[:] = [None]
+    _turtles['east'] = [None]
+    _turtles['west'] = [None]
+    for frame in range(1,NUM_FRAMES+1):
+        _skulls.append(getTexture("atlas://skulls/frame" + str(frame)))
+        _turtles['east'].append(getTexture("atlas://turtle_east/frame" + str(frame)))
+        _turtles['west'].append(getTexture("atlas://turtle_west/frame" + str(frame)))
+
+
+def frogTexture(direction):
+    """
+    Returns the texture for a frog facing the given direction.
+
+    Parameter direction: The direction of the frog
+    Precondition: direction is a string of either 'north', 'south', 'east', or 'west'
+    """
+    return _frogs[direction]
+
+
+def skullTexture(frame):
+    """
+    Returns the texture for the given frame of the death animation.
+
+    Parameter frame: The animation frame
+    Precondition: frame is an int > 0
+    """
+    return _skulls[min(frame,NUM_FRAMES)]
+
+
+def turtleTexture(direction,frame):
+    """
+    Returns the texture for the given frame of a turtle.
+
+    Parameter direction: The direction of the turtle
+    Precondition: direction is a string of either 'east' or 'west'
+
+    Parameter frame: The animation frame
+    Precondition: frame is an int > 0
+    """
+    return _turtles[direction][min(frame,NUM_FRAMES)]
+
+
+def textTexture(text,size,color):
+    """
+    Returns a texture with the text rendered in OFFICIAL_FONT.
+
+    Each message is laid out and rendered the first time it is asked for,
+    and the same texture is returned every time after that.
+
+    Parameter text: The text, with one line per line of the message
+    Precondition: text is a nonempty string
+
+    Parameter size: The font size
+    Precondition: size is an int > 0
+
+    Parameter color: The color of the text (red, green, blue, alpha)
+    Precondition: color is a tuple of 4 numbers >= 0 and <= 1
+    """
+    key = (text,size,color)
+    if not key in _texts:
+        label = CoreLabel(text=text, font_size=size, font_name=OFFICIAL_FONT,\
+            color=color, halign='center', strip=True)
+        label.refresh()
+        _texts[key] = label.texture
+    return _texts[key]
@@ -0,0 +1,522 @@
+"""
+View module for Froggo
+
+The level, lanes and models do not import kivy. The classes in this module
+mirror them on the canvas: they build the instructions for a level once and
+then only move them or change their textures each frame.
+
+Author: Lucy Beck
+Date: January 2, 2021
+"""
+from kivy.graphics import *
+from level import *
+from sprites import *
+from constants import *
+import numpy
+
+
+def interpolate(prev,value,alpha):
+    """
+    Returns the position alpha of the way from prev to value.
+
+    Jumps of half a grid square or more (a frog hop or an object wrapping
+    around the lane) are not interpolated, so they are drawn at value.
+
+    Parameter prev: The position before the last simulation step
+    Precondition: prev is a number (int or float)
+
+    Parameter value: The position after the last simulation step
+    Precondition: value is a number (int or float)
+
+    Parameter alpha: How far the drawing is between the two steps
+    Precondition: alpha is a number (int or float) >= 0 and <= 1
+    """
+    if abs(value-prev) >= GRID_SIZE/2:
+        return value
+    return prev + (value-prev)*alpha
+
+
+class LaneView(object):
+    """
+    A class that draws a single lane.
+    """
+    # Attribute _lane: The lane to draw
+    # Invariant: _lane is a Lane object
+    #
+    # Attribute _group: The instructions used to draw the objects in the lane
+    # Invariant: _group is a kivy.graphics InstructionGroup
+    #
+    # Attribute _objs: The objects that currently have a rectangle
+    # Invariant: _objs is a list of Obstacle or Turtle objects
+    #
+    # Attribute _rects: The rectangles for the objects in _objs
+    # Invariant: _rects is a list of kivy.graphics Rectangles, the same length as _objs
+    #
+    # Attribute _frames: The animation frame shown by each rectangle
+    # Invariant: _frames is a list of ints or None, the same length as _objs
+    #
+    # Attribute _turtles: The position of each object in the lane's list of
+    #                     turtles, or -1 if it is not a turtle
+    # Invariant: _turtles is a list of ints, the same length as _objs
+    #
+    # Attribute _indices: The position of each object in the lane's array
+    # Invariant: _indices is a numpy array of ints, the same length as _objs
+    #
+    # Attribute _widths: The width of each object
+    # Invariant: _widths is a numpy array of floats, the same length as _objs
+    #
+    # Attribute _shown: Whether the rectangle of each object is in _group
+    # Invariant: _shown is a numpy array of bools, the same length as _objs
+    #
+    # Attribute _prev: The x-coordinates of the lane before the last step
+    # Invariant: _prev is a numpy array, the same length as the lane's array
+    #
+    # Attribute _canvas: The canvas that _group has been added to
+    # Invariant: _canvas is a kivy.graphics Canvas or InstructionGroup or None
+    #
+
+    def __init__(self,lane,imagespath):
+        """
+        Initializes the view of the lane.
+
+        Parameter lane: The lane to draw
+        Precondition: lane is a Lane object
+
+        Parameter imagespath: The path to the Images folder
+        Precondition: imagespath is a valid path
+        """
+        self._lane = lane
+        self._group = InstructionGroup()
+        self._objs = []
+        self._rects = []
+        self._frames = []
+        self._turtles = []
+        self._prev = numpy.array(lane.getXs())
+        speed = lane.getSpeed()
+        for obj in lane.getObjs():
+            if obj.tag == TAG_TURTLE:
+                rect = Rectangle(size=(obj.w, obj.h), pos=(obj.x,obj.y))
+            else:
+                image = obj.kind + '.png'
+                if not speed is None and speed < 0:
+                    texture = getFlipped(image)
+                else:
+                    texture = getTexture(image)
+                rect = Rectangle(texture=texture, size=(obj.w, obj.h), pos=(obj.x,obj.y))
+            self._objs.append(obj)
+            self._rects.append(rect)
+            self._frames.append(None)
+            if obj.tag == TAG_TURTLE:
+                self._turtles.append(lane.getTurtles().index(obj))
+            else:
+                self._turtles.append(-1)
+        self._indices = numpy.array([obj.index for obj in self._objs],dtype=int)
+        self._widths = numpy.array([obj.w for obj in self._objs],dtype=float)
+        self._shown = numpy.zeros(len(self._objs),dtype=bool)
+        self._canvas = None
+
+    def snapshot(self):
+        """
+        Records the x-coordinate of every object before a simulation step.
+        """
+        numpy.copyto(self._prev,self._lane.getXs())
+
+    def draw(self,canvas,alpha=1.0):
+        """
+        Draws the objects in the lane to the canvas.
+
+        The first call adds the instructions to the canvas. Every later call
+        only moves them, changes the turtle frames and drops the rectangles
+        of objects (such as flies) that left the lane. The positions are
+        computed for the whole lane at once from its array of x-coordinates.
+        Each object is drawn between its position before and after the last
+        step, unless it wrapped around.
+
+        Only the objects that are at least partly inside the window have a
+        rectangle in the group. The objects waiting outside it to wrap
+        around are taken out of the group, and are not moved or given new
+        turtle frames until they come back in. The turtle frames are read
+        for the whole lane at once (see Lane.getTurtleFrames).
+
+        Parameter canvas: The object used for drawing the lane
+        Precondition: canvas is a kivy.graphics Canvas or InstructionGroup
+
+        Parameter alpha: How far the drawing is between the last two steps
+        Precondition: alpha is a number (int or float) >= 0 and <= 1
+        """
+        if not self._canvas is canvas:
+            canvas.add(self._group)
+            self._canvas = canvas
+        objs = self._lane.getObjs()
+        if len(objs) != len(self._objs):
+            self._removeGone(objs)
+        xs = self._lane.getXs()
+        moved = xs - self._prev
+        drawn = numpy.where(numpy.abs(moved) >= GRID_SIZE/2, xs, self._prev + moved*alpha)
+        drawn = drawn[self._indices]
+        visible = (drawn + self._widths > 0) & (drawn < self._lane.getWidth())
+        for pos in numpy.flatnonzero(visible != self._shown).tolist():
+            if visible[pos]:
+                self._group.add(self._rects[pos])
+            else:
+                self._group.remove(self._rects[pos])
+        self._shown = visible
+        drawn = drawn.tolist()
+        frames = None
+        if len(self._lane.getTurtles()) > 0:
+            frames = self._lane.getTurtleFrames().tolist()
+        for pos in numpy.flatnonzero(visible).tolist():
+            obj = self._objs[pos]
+            rect = self._rects[pos]
+            rect.pos = (drawn[pos],obj.y)
+            turtle = self._turtles[pos]
+            if turtle >= 0 and frames[turtle] != self._frames[pos]:
+                rect.texture = turtleTexture(obj.direction,frames[turtle])
+                self._frames[pos] = frames[turtle]
+
+    def hide(self):
+        """
+        Takes the instructions of the lane off the canvas they were added to.
+
+        The next call to draw adds them again.
+        """
+        if not self._canvas is None:
+            self._canvas.remove(self._group)
+            self._canvas = None
+
+    def drawTiles(self,canvas):
+        """
+        Draws the tiles of the lane to the canvas.
+
+        The tiles never move, so they are only drawn when the level view bakes
+        its background texture.
+
+        Parameter canvas: The object used for drawing the tiles
+        Precondition: canvas is a kivy.graphics Canvas, Fbo or InstructionGroup
+        """
+        for tile in self._lane.getTiles():
+            canvas.add(Rectangle(texture=getTexture(tile.kind + '.png'),\
+                size=(tile.w, tile.h), pos=(tile.x,tile.y)))
+
+    def _removeGone(self,objs):
+        """
+        Removes the rectangles of the objects that are no longer in the lane.
+
+        Parameter objs: The objects currently in the lane
+        Precondition: objs is a list of Obstacle or Turtle objects
+        """
+        gone = []
+        for pos in range(len(self._objs)-1,-1,-1):
+            if not self._objs[pos] in objs:
+                if self._shown[pos]:
+                    self._group.remove(self._rects[pos])
+                del self._objs[pos]
+                del self._rects[pos]
+                del self._frames[pos]
+                del self._turtles[pos]
+                gone.append(pos)
+        self._indices = numpy.delete(self._indices,gone)
+        self._widths = numpy.delete(self._widths,gone)
+        self._shown = numpy.delete(self._shown,gone)
+
+
+class LevelView(object):
+    """
+    A class that draws a single level.
+    """
+    # Attribute _level: The level to draw
+    # Invariant: _level is a Level object
+    #
+    # Attribute _lanes: The views of the lanes in the level
+    # Invariant: _lanes is a list of LaneView objects
+    #
+    # Attribute _cols: The number of grid squares in each lane
+    # Invariant: _cols is an int > 0
+    #
+    # Attribute _first: The first lane that is drawn
+    # Invariant: _first is an int >= 0 and <= _last
+    #
+    # Attribute _last: The lane after the last lane that is drawn
+    # Invariant: _last is an int >= _first and <= len(_lanes)
+    #
+    # Attribute _fbo: The offscreen framebuffer holding the tiles of the
+    #                 lanes that are drawn
+    # Invariant: _fbo is a kivy.graphics Fbo or None
+    #
+    # Attribute _fboSize: The size of _fbo, tall enough for the most lanes
+    #                     that the level updates at once
+    # Invariant: _fboSize is a tuple of two ints, or None if _fbo is None
+    #
+    # Attribute _background: The rectangle that draws the baked lane tiles
+    # Invariant: _background is a kivy.graphics Rectangle
+    #
+    # Attribute _lanesGroup: The instructions used to draw the lanes
+    # Invariant: _lanesGroup is a kivy.graphics InstructionGroup
+    #
+    # Attribute _safeGroup: The instructions used to draw the safe frogs
+    # Invariant: _safeGroup is a kivy.graphics InstructionGroup
+    #
+    # Attribute _numSafe: The number of safe frogs in _safeGroup
+    # Invariant: _numSafe is an int >= 0
+    #
+    # Attribute _lives: The rectangles for the frog heads, one per possible life
+    # Invariant: _lives is a list of kivy.graphics Rectangles
+    #
+    # Attribute _livesGroup: The instructions used to draw the lives
+    # Invariant: _livesGroup is a kivy.graphics InstructionGroup
+    #
+    # Attribute _numLives: The number of lives in _livesGroup
+    # Invariant: _numLives is an int >= 0
+    #
+    # Attribute _frogGroup: The instructions used to draw the frog
+    # Invariant: _frogGroup is a kivy.graphics InstructionGroup
+    #
+    # Attribute _frogRect: The rectangle used to draw the frog
+    # Invariant: _frogRect is a kivy.graphics Rectangle
+    #
+    # Attribute _frogTexture: The texture currently shown by _frogRect
+    # Invariant: _frogTexture is a kivy Texture or None
+    #
+    # Attribute _frogShown: True if _frogRect is in _frogGroup
+    # Invariant: _frogShown is a bool
+    #
+    # Attribute _prevFrog: The frog before the last simulation step
+    # Invariant: _prevFrog is a Frog object or None or string
+    #
+    # Attribute _prevX: The x-coordinate of the frog before the last step
+    # Invariant: _prevX is a number (int or float)
+    #
+    # Attribute _prevY: The y-coordinate of the frog before the last step
+    # Invariant: _prevY is a number (int or float)
+    #
+    # Attribute _prevCamera: The camera of the level before the last step
+    # Invariant: _prevCamera is a number (int or float)
+    #
+    # Attribute _translate: The instruction that scrolls the level with the camera
+    # Invariant: _translate is a kivy.graphics Translate
+    #
+    # Attribute _group: The instructions used to draw the level
+    # Invariant: _group is a kivy.graphics InstructionGroup
+    #
+    # Attribute _canvas: The canvas that _group has been added to
+    # Invariant: _canvas is a kivy.graphics Canvas or InstructionGroup or None
+    #
+
+    def getLevel(self):
+        """
+        Returns the level drawn by this view
+        """
+        return self._level
+
+    def __init__(self,level,leveldict,imagespath):
+        """
+        Initializes the view of the level.
+
+        Parameter level: The level to draw
+        Precondition: level is a Level object
+
+        Parameter leveldict: A dictionary containing level information
+        Precondition: leveldict is a dictionary
+
+        Parameter imagespath: The path to the Images folder
+        Precondition: imagespath is a valid path
+        """
+        self._level = level
+        self._cols = leveldict['size'][0]
+        self._lanes = []
+        self._lanesGroup = InstructionGroup()
+        for lane in level.getLanes():
+            self._lanes.append(LaneView(lane,imagespath))
+        self._first = 0
+        self._last = 0
+
+        self._fbo = None
+        self._fboSize = None
+        self._background = Rectangle(pos=(0,0))
+        self._showLanes()
+
+        self._safeGroup = InstructionGroup()
+        self._numSafe = 0
+
+        width = level.getWidth()
+        height = level.getHeight()
+        self._lives = []
+        for x in range(1,4):
+            image = Rectangle(texture=getTexture(FROG_HEAD), size=(GRID_SIZE, GRID_SIZE), \
+            pos=(width-GRID_SIZE*x, height-GRID_SIZE))
+            self._lives.append(image)
+        self._livesGroup = InstructionGroup()
+        self._numLives = 0
+
+        self._frogGroup = InstructionGroup()
+        self._frogRect = Rectangle(size=(GRID_SIZE, GRID_SIZE))
+        self._frogTexture = None
+        self._frogShown = False
+        self._prevFrog = None
+        self._prevX = 0
+        self._prevY = 0
+        self._prevCamera = level.getCamera()
+        self._translate = Translate(0,-self._prevCamera)
+
+        # The lives stay at the top of the window, so they are not scrolled
+        self._group = InstructionGroup()
+        self._group.add(PushMatrix())
+        self._group.add(self._translate)
+        self._group.add(self._background)
+        self._group.add(self._lanesGroup)
+        self._group.add(self._safeGroup)
+        self._group.add(self._frogGroup)
+        self._group.add(PopMatrix())
+        self._group.add(self._livesGroup)
+        self._canvas = None
+
+    def snapshot(self):
+        """
+        Records the positions of everything that moves before a simulation step.
+
+        The view draws between these positions and the ones after the step,
+        so motion stays smooth when the frame rate is not a multiple of
+        the simulation rate. Only the lanes that are drawn are recorded.
+        """
+        for pos in range(self._first,self._last):
+            self._lanes[pos].snapshot()
+        self._prevCamera = self._level.getCamera()
+        frog = self._level.getFrog()
+        self._prevFrog = frog
+        if not frog is None:
+            self._prevX = frog.x
+            self._prevY = frog.y
+
+    def draw(self,canvas,alpha=1.0):
+        """
+        Draws the level to the canvas.
+
+        The instructions for the level are built once in __init__. The first
+        call adds them to the canvas and every later call only updates the
+        instructions that already exist. Only the lanes that the level
+        updates every step (the ones near the window) are drawn, and the
+        level is scrolled so that the camera is at the bottom of the window.
+
+        Parameter canvas: The object used for drawing the level
+        Precondition: canvas is a kivy.graphics Canvas or InstructionGroup
+
+        Parameter alpha: How far the drawing is between the last two steps
+        Precondition: alpha is a number (int or float) >= 0 and <= 1
+        """
+        if not self._canvas is canvas:
+            canvas.add(self._group)
+            self._canvas = canvas
+        if self._level.getRows() != (self._first,self._last):
+            self._showLanes()
+        self._translate.y = -interpolate(self._prevCamera,self._level.getCamera(),alpha)
+        for pos in range(self._first,self._last):
+            self._lanes[pos].draw(self._lanesGroup,alpha)
+        self._drawSafeFrogs()
+        self._drawLives()
+        self._drawFrog(alpha)
+
+    def bakeBackground(self):
+        """
+        Renders the tiles of the lanes that are drawn into a single texture.
+
+        The grass, road, water and hedge tiles never move, so they are rendered
+        once into an offscreen framebuffer and drawn each frame as one
+        rectangle. This is called when the view is created, when the window
+        size changes, and when the level scrolls to other lanes.
+
+        The framebuffer is made once, tall enough for the most lanes that the
+        level updates at once (the window, one more lane and CAMERA_MARGIN
+        lanes above and below it). After that it is cleared and drawn again
+        in place, so scrolling does not make a new texture.
+        """
+        first, last = self._level.getRows()
+        rows = int(self._level.getHeight() // GRID_SIZE) + 2 + 2*CAMERA_MARGIN
+        rows = max(1,last-first,min(len(self._lanes),rows))
+        size = (self._cols*GRID_SIZE, rows*GRID_SIZE)
+        if self._fboSize != size:
+            self._fbo = Fbo(size=size)
+            self._fboSize = size
+        else:
+            self._fbo.clear()
+        self._fbo.add(ClearColor(0,0,0,0))
+        self._fbo.add(ClearBuffers())
+        self._fbo.add(Translate(0,-first*GRID_SIZE))
+        for pos in range(first,last):
+            self._lanes[pos].drawTiles(self._fbo)
+        self._fbo.draw()
+        self._background.texture = self._fbo.texture
+        self._background.size = size
+        self._background.pos = (0,first*GRID_SIZE)
+
+    def _showLanes(self):
+        """
+        Changes the lanes that are drawn to the ones the level updates every
+        step.
+
+        A lane that comes into view is recorded first, so that it is not
+        drawn sliding from where it was when it went out of view.
+        """
+        first, last = self._level.getRows()
+        for pos in range(self._first,self._last):
+            if pos < first or pos >= last:
+                self._lanes[pos].hide()
+        for pos in range(first,last):
+            if pos < self._first or pos >= self._last:
+                self._lanes[pos].snapshot()
+        self._first = first
+        self._last = last
+        self.bakeBackground()
+
+    def _drawSafeFrogs(self):
+        """
+        Adds a rectangle for every frog that reached an exit since the last frame.
+        """
+        safeFrogs = self._level.getSafeFrogs()
+        while self._numSafe < len(safeFrogs):
+            frog = safeFrogs[self._numSafe]
+            self._safeGroup.add(Rectangle(texture=getTexture(FROG_SAFE),\
+                pos=(frog.x,frog.y), size=(frog.w,frog.h)))
+            self._numSafe += 1
+
+    def _drawLives(self):
+        """
+        Adds or removes frog heads so that they match the number of lives.
+        """
+        lives = self._level.getLives()
+        while self._numLives < lives:
+            self._livesGroup.add(self._lives[self._numLives])
+            self._numLives += 1
+        while self._numLives > lives:
+            self._numLives -= 1
+            self._livesGroup.remove(self._lives[self._numLives])
+
+    def _drawFrog(self,alpha):
+        """
+        Moves the frog rectangle and changes its texture if the frog changed.
+
+        Parameter alpha: How far the drawing is between the last two steps
+        Precondition: alpha is a number (int or float) >= 0 and <= 1
+        """
+        frog = self._level.getFrog()
+        if frog is None:
+            if self._frogShown:
+                self._frogGroup.remove(self._frogRect)
+                self._frogShown = False
+            return
+        if frog.dead:
+            texture = skullTexture(frog.frame)
+        else:
+            texture = frogTexture(frog.direction)
+        if not texture is self._frogTexture:
+            self._frogRect.texture = texture
+            self._frogTexture = texture
+        if frog is self._prevFrog:
+            x = interpolate(self._prevX,frog.x,alpha)
+            y = interpolate(self._prevY,frog.y,alpha)
+        else:
+            x = frog.x
+            y = frog.y
+        self._frogRect.pos = (x,y)
+        if not self._frogShown:
+            self._frogGroup.add(self._frogRect)
+            self._frogShown = True